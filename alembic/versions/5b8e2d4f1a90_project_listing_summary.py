@@ -0,0 +1,60 @@
+"""project listing summary
+
+Revision ID: 5b8e2d4f1a90
+Revises: a3f1c9d2e7b4
+Create Date: 2026-10-18 11:21:37.845120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2d4f1a90'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c9d2e7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('project_listing_summary',
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('starting_price', sa.Float(), nullable=True),
+    sa.Column('max_price', sa.Float(), nullable=True),
+    sa.Column('min_super_area', sa.Float(), nullable=True),
+    sa.Column('max_super_area', sa.Float(), nullable=True),
+    sa.Column('configuration', postgresql.ARRAY(sa.String()), nullable=True),
+    sa.Column('total_units', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+    op.create_index('ix_project_listing_summary_starting_price', 'project_listing_summary', ['starting_price'], unique=False)
+    op.create_index('ix_project_listing_summary_super_area', 'project_listing_summary', ['min_super_area', 'max_super_area'], unique=False)
+    op.create_index('ix_project_listing_summary_configuration', 'project_listing_summary', ['configuration'], unique=False, postgresql_using='gin')
+
+    # backfill existing projects
+    op.execute("""
+        INSERT INTO project_listing_summary
+            (project_id, starting_price, max_price, min_super_area, max_super_area, configuration, total_units)
+        SELECT p.id,
+               min(u.base_price), max(u.base_price),
+               min(u.super_area_value), max(u.super_area_value),
+               array_remove(array_agg(DISTINCT u.unit_type), NULL),
+               count(u.id)
+        FROM projects p
+        LEFT OUTER JOIN project_units u ON u.project_id = p.id
+        GROUP BY p.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_listing_summary_configuration', table_name='project_listing_summary', postgresql_using='gin')
+    op.drop_index('ix_project_listing_summary_super_area', table_name='project_listing_summary')
+    op.drop_index('ix_project_listing_summary_starting_price', table_name='project_listing_summary')
+    op.drop_table('project_listing_summary')
@@ -0,0 +1,41 @@
+"""project media timestamps and child project_id indexes
+
+Revision ID: 9c1e5a7b3d62
+Revises: e7d04b6c3f21
+Create Date: 2026-10-18 15:12:48.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e5a7b3d62'
+down_revision: Union[str, Sequence[str], None] = 'e7d04b6c3f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHILD_TABLES = (
+    'project_units', 'project_media', 'project_commissions', 'nearby_landmarks', 'project_amenities',
+    'parking_charges', 'payment_plans', 'additional_charges',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('project_media', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('project_media', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    for table in CHILD_TABLES:
+        op.create_index(op.f(f'ix_{table}_project_id'), table, ['project_id'], unique=False)
+    op.create_index(op.f('ix_payment_plan_breakups_payment_plan_id'), 'payment_plan_breakups', ['payment_plan_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_payment_plan_breakups_payment_plan_id'), table_name='payment_plan_breakups')
+    for table in CHILD_TABLES:
+        op.drop_index(op.f(f'ix_{table}_project_id'), table_name=table)
+    op.drop_column('project_media', 'updated_at')
+    op.drop_column('project_media', 'created_at')
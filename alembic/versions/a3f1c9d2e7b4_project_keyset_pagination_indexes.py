@@ -0,0 +1,30 @@
+"""project keyset pagination indexes
+
+Revision ID: a3f1c9d2e7b4
+Revises: c5fdf39861cd
+Create Date: 2026-10-18 10:04:11.302114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2e7b4'
+down_revision: Union[str, Sequence[str], None] = 'c5fdf39861cd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_projects_created_at_id', 'projects', ['created_at', 'id'], unique=False)
+    op.create_index('ix_projects_updated_at_id', 'projects', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_updated_at_id', table_name='projects')
+    op.drop_index('ix_projects_created_at_id', table_name='projects')
@@ -0,0 +1,32 @@
+"""geo hierarchy updated_at
+
+Revision ID: a4d9e2c7b518
+Revises: c8a2f5e7d913
+Create Date: 2026-10-19 10:04:31.208114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d9e2c7b518'
+down_revision: Union[str, Sequence[str], None] = 'c8a2f5e7d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GEO_TABLES = ('countries', 'states', 'cities', 'areas', 'localities')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in GEO_TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in GEO_TABLES:
+        op.drop_column(table, 'updated_at')
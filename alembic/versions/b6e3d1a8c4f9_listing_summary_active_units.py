@@ -0,0 +1,54 @@
+"""listing summary from active units only
+
+Revision ID: b6e3d1a8c4f9
+Revises: f41b8c6a2d07
+Create Date: 2026-10-18 21:07:43.218650
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e3d1a8c4f9'
+down_revision: Union[str, Sequence[str], None] = 'f41b8c6a2d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # summaries aggregated inactive and deleted units too; recompute them like
+    # listing_summary_select does now
+    op.execute("""
+        UPDATE project_listing_summary s
+        SET starting_price = a.starting_price,
+            max_price = a.max_price,
+            min_super_area = a.min_super_area,
+            max_super_area = a.max_super_area,
+            min_price_per_sqft = a.min_price_per_sqft,
+            max_price_per_sqft = a.max_price_per_sqft,
+            configuration = a.configuration,
+            total_units = a.total_units,
+            updated_at = now()
+        FROM (
+            SELECT p.id AS project_id,
+                   min(u.base_price) AS starting_price, max(u.base_price) AS max_price,
+                   min(u.super_area_sqft) AS min_super_area, max(u.super_area_sqft) AS max_super_area,
+                   min(u.price_per_sqft) AS min_price_per_sqft, max(u.price_per_sqft) AS max_price_per_sqft,
+                   array_remove(array_agg(DISTINCT u.unit_type), NULL) AS configuration,
+                   count(u.id) AS total_units
+            FROM projects p
+            LEFT OUTER JOIN project_units u
+                ON u.project_id = p.id AND u.is_active IS true AND u.is_deleted IS NOT true
+            GROUP BY p.id
+        ) a
+        WHERE a.project_id = s.project_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # summaries are derived data; the previous aggregation isn't restored
+    pass
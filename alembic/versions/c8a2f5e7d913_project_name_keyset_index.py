@@ -0,0 +1,28 @@
+"""project name keyset index
+
+Revision ID: c8a2f5e7d913
+Revises: b6e3d1a8c4f9
+Create Date: 2026-10-18 21:26:05.417392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8a2f5e7d913'
+down_revision: Union[str, Sequence[str], None] = 'b6e3d1a8c4f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the listing sorts and seeks names under COLLATE "C"
+    op.execute('CREATE INDEX ix_projects_name_c_id ON projects (name COLLATE "C", id)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_name_c_id', table_name='projects')
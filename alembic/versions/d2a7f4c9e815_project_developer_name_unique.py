@@ -0,0 +1,30 @@
+"""project (developer_id, name) unique constraint
+
+Revision ID: d2a7f4c9e815
+Revises: 9c1e5a7b3d62
+Create Date: 2026-10-18 17:41:09.284163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7f4c9e815'
+down_revision: Union[str, Sequence[str], None] = '9c1e5a7b3d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # fails if duplicate (developer_id, name) pairs already exist; those have
+    # to be renamed or merged by hand first
+    op.create_unique_constraint('uq_projects_developer_id_name', 'projects', ['developer_id', 'name'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_projects_developer_id_name', 'projects', type_='unique')
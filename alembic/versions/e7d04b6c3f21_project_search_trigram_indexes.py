@@ -0,0 +1,33 @@
+"""project search trigram indexes
+
+Revision ID: e7d04b6c3f21
+Revises: 5b8e2d4f1a90
+Create Date: 2026-10-18 12:40:02.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7d04b6c3f21'
+down_revision: Union[str, Sequence[str], None] = '5b8e2d4f1a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX ix_projects_name_trgm ON projects USING gin (lower(name) gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_localities_name_trgm ON localities USING gin (lower(name) gin_trgm_ops)")
+    op.create_index('ix_projects_locality_id', 'projects', ['locality_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_locality_id', table_name='projects')
+    op.execute("DROP INDEX IF EXISTS ix_localities_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_projects_name_trgm")
@@ -0,0 +1,85 @@
+"""normalized sqft area and price per sqft columns
+
+Revision ID: f41b8c6a2d07
+Revises: d2a7f4c9e815
+Create Date: 2026-10-18 18:52:14.603917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f41b8c6a2d07'
+down_revision: Union[str, Sequence[str], None] = 'd2a7f4c9e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def sqft_factor(unit_column: str) -> str:
+    # same factors as SQFT_PER_AREA_UNIT; NULL for anything that isn't an AreaUnit
+    return f"""
+        CASE lower(coalesce({unit_column}, 'sqft'))
+            WHEN 'sqft' THEN 1.0
+            WHEN 'sqm' THEN 10.7639
+            WHEN 'acres' THEN 43560.0
+        END
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projects', sa.Column('project_size_sqft', sa.Float(), nullable=True))
+    op.add_column('project_units', sa.Column('super_area_sqft', sa.Float(), nullable=True))
+    op.add_column('project_units', sa.Column('carpet_area_sqft', sa.Float(), nullable=True))
+    op.add_column('project_units', sa.Column('price_per_sqft', sa.Float(), nullable=True))
+    op.add_column('project_listing_summary', sa.Column('min_price_per_sqft', sa.Float(), nullable=True))
+    op.add_column('project_listing_summary', sa.Column('max_price_per_sqft', sa.Float(), nullable=True))
+
+    # backfill existing rows
+    op.execute(f"""
+        UPDATE projects
+        SET project_size_sqft = project_size * {sqft_factor('project_size_unit')}
+    """)
+    op.execute(f"""
+        UPDATE project_units
+        SET super_area_sqft = super_area_value * {sqft_factor('area_unit')},
+            carpet_area_sqft = carpet_area_value * {sqft_factor('area_unit')}
+    """)
+    op.execute("""
+        UPDATE project_units
+        SET price_per_sqft = base_price / super_area_sqft
+        WHERE super_area_sqft > 0
+    """)
+    # summary areas were in whatever unit each unit used; recompute them in sqft
+    op.execute("""
+        UPDATE project_listing_summary s
+        SET min_super_area = a.min_super_area,
+            max_super_area = a.max_super_area,
+            min_price_per_sqft = a.min_price_per_sqft,
+            max_price_per_sqft = a.max_price_per_sqft
+        FROM (
+            SELECT project_id,
+                   min(super_area_sqft) AS min_super_area, max(super_area_sqft) AS max_super_area,
+                   min(price_per_sqft) AS min_price_per_sqft, max(price_per_sqft) AS max_price_per_sqft
+            FROM project_units
+            GROUP BY project_id
+        ) a
+        WHERE a.project_id = s.project_id
+    """)
+
+    op.create_index('ix_project_listing_summary_price_per_sqft', 'project_listing_summary', ['min_price_per_sqft', 'max_price_per_sqft'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_listing_summary_price_per_sqft', table_name='project_listing_summary')
+    op.drop_column('project_listing_summary', 'max_price_per_sqft')
+    op.drop_column('project_listing_summary', 'min_price_per_sqft')
+    op.drop_column('project_units', 'price_per_sqft')
+    op.drop_column('project_units', 'carpet_area_sqft')
+    op.drop_column('project_units', 'super_area_sqft')
+    op.drop_column('projects', 'project_size_sqft')
+    # summary areas stay in sqft; re-run the summary backfill for raw values
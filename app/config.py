@@ -17,12 +17,52 @@ class Config:
     GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
     GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI")
     DB_URL = f'postgresql+asyncpg://{os.getenv("DB_USERNAME")}:{quote_plus(os.getenv("DB_PASSWORD"))}@{os.getenv("DB_HOST")}:{os.getenv("DB_PORT")}/{os.getenv("DB_NAME")}'
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    # compiled statements per engine, and asyncpg prepared statements per connection
+    DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", 1000))
+    DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", 500))
+    # read replica, same credentials and database as the primary; reads use the primary when unset
+    DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST")
+    DB_REPLICA_URL = f'postgresql+asyncpg://{os.getenv("DB_USERNAME")}:{quote_plus(os.getenv("DB_PASSWORD"))}@{DB_REPLICA_HOST}:{os.getenv("DB_REPLICA_PORT", os.getenv("DB_PORT"))}/{os.getenv("DB_NAME")}' if DB_REPLICA_HOST else None
+    DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", 10))
+    DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", 20))
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+    REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", 5))
+    READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 10))
     OTP_EXPIRE_MINUTES = int(os.getenv("OTP_EXPIRE_MINUTES"))
     FILE_STORAGE_TYPE = os.getenv("IMAGE_STORAGE_TYPE")
     AWS_S3_BUCKET = os.getenv("AWS_S3_BUCKET")
     AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_S3_REGION = os.getenv("AWS_S3_REGION")
+    PROJECT_SEARCH_BACKEND = os.getenv("PROJECT_SEARCH_BACKEND", "pg_trgm")  # pg_trgm or memory
+    FACET_INDEX_ENABLED = os.getenv("FACET_INDEX_ENABLED", "true").lower() == "true"
+    FACET_INDEX_REFRESH_SECONDS = int(os.getenv("FACET_INDEX_REFRESH_SECONDS", 30))
+    PROJECT_GEO_INDEX_REFRESH_SECONDS = int(os.getenv("PROJECT_GEO_INDEX_REFRESH_SECONDS", 60))
+    UNIT_CATALOG_ENABLED = os.getenv("UNIT_CATALOG_ENABLED", "true").lower() == "true"
+    UNIT_CATALOG_REFRESH_SECONDS = int(os.getenv("UNIT_CATALOG_REFRESH_SECONDS", 30))
+    # full reloads drop hard deleted units, which incremental refreshes can't see
+    UNIT_CATALOG_FULL_RELOAD_SECONDS = int(os.getenv("UNIT_CATALOG_FULL_RELOAD_SECONDS", 3600))
+    MAP_TILE_CACHE_SIZE = int(os.getenv("MAP_TILE_CACHE_SIZE", 4096))
+    MAP_TILE_CACHE_TTL_SECONDS = int(os.getenv("MAP_TILE_CACHE_TTL_SECONDS", 300))
+    PROJECT_IMPORT_BATCH_SIZE = int(os.getenv("PROJECT_IMPORT_BATCH_SIZE", 200))
+    PROJECT_EXPORT_BATCH_SIZE = int(os.getenv("PROJECT_EXPORT_BATCH_SIZE", 500))
+    GEO_HIERARCHY_REFRESH_SECONDS = int(os.getenv("GEO_HIERARCHY_REFRESH_SECONDS", 600))
+    PROJECT_COUNT_CACHE_TTL_SECONDS = int(os.getenv("PROJECT_COUNT_CACHE_TTL_SECONDS", 30))
+    PROJECT_LIST_CACHE_TTL_SECONDS = int(os.getenv("PROJECT_LIST_CACHE_TTL_SECONDS", 30))
+    PROJECT_DETAIL_CACHE_SIZE = int(os.getenv("PROJECT_DETAIL_CACHE_SIZE", 2048))
+    PROJECT_DETAIL_CACHE_TTL_SECONDS = int(os.getenv("PROJECT_DETAIL_CACHE_TTL_SECONDS", 300))
+    PROJECT_STATEMENT_CACHE_SIZE = int(os.getenv("PROJECT_STATEMENT_CACHE_SIZE", 256))
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")  # shared response cache backend, optional
+    # shared by all workers of a multi-process server so /metrics covers all of them
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+    METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", 5))
+    METRICS_STALE_SECONDS = float(os.getenv("METRICS_STALE_SECONDS", 60))
+    # per-request statement counts/timings, Server-Timing header and N+1 warnings; off in production
+    SQL_PROFILING_ENABLED = os.getenv("SQL_PROFILING_ENABLED", "false").lower() == "true"
+    SQL_PROFILE_SLOWEST = int(os.getenv("SQL_PROFILE_SLOWEST", 5))
+    SQL_NPLUSONE_THRESHOLD = int(os.getenv("SQL_NPLUSONE_THRESHOLD", 5))
 
 
 config = Config()
@@ -1,28 +1,131 @@
-from typing import AsyncGenerator
+import asyncio
+import logging
+import time
+from typing import AsyncGenerator, Optional
+from fastapi import Request
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session
 from contextlib import asynccontextmanager
 from .base import Base
+from .pool_metrics import InstrumentedAsyncAdaptedQueuePool, instrument_engine, db_route
+from .sql_profiler import instrument_sql
 from ..config import config
 
+logger = logging.getLogger(__name__)
+
+# set after a write; reads from that client go to the primary until it expires
+PRIMARY_COOKIE = "db_primary_until"
+_REQUEST_STATE_KEY = "request_state"
+# session.info flags: the session reads from the replica / must see this client's writes
+_REPLICA_KEY = "replica"
+_READ_YOUR_WRITES_KEY = "read_your_writes"
+
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
 
 class DBConnection:
     def __init__(self):
         self._engine = create_async_engine(
             config.DB_URL,
             echo=False,
-            pool_size=10,
-            max_overflow=20,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            poolclass=InstrumentedAsyncAdaptedQueuePool,
+            pool_logging_name="primary",
+            query_cache_size=config.DB_QUERY_CACHE_SIZE,
+            connect_args={"prepared_statement_cache_size": config.DB_PREPARED_STATEMENT_CACHE_SIZE},
             future=True,
         )
+        instrument_engine(self._engine, "primary")
+        if config.SQL_PROFILING_ENABLED:
+            instrument_sql(self._engine)
         self._sessionmaker = async_sessionmaker(
             self._engine, expire_on_commit=False, class_=AsyncSession
         )
+        # reads get their own engine and pool when a replica is configured
+        self._read_engine = None
+        self._read_sessionmaker = None
+        if config.DB_REPLICA_URL:
+            self._read_engine = create_async_engine(
+                config.DB_REPLICA_URL,
+                echo=False,
+                pool_size=config.DB_READ_POOL_SIZE,
+                max_overflow=config.DB_READ_MAX_OVERFLOW,
+                poolclass=InstrumentedAsyncAdaptedQueuePool,
+                pool_logging_name="replica",
+                query_cache_size=config.DB_QUERY_CACHE_SIZE,
+                connect_args={"prepared_statement_cache_size": config.DB_PREPARED_STATEMENT_CACHE_SIZE},
+                future=True,
+            )
+            instrument_engine(self._read_engine, "replica")
+            if config.SQL_PROFILING_ENABLED:
+                instrument_sql(self._read_engine)
+            self._read_sessionmaker = async_sessionmaker(
+                self._read_engine, expire_on_commit=False, class_=AsyncSession
+            )
+        self._replica_lag: Optional[float] = None
+        self._replica_lag_checked_at = 0.0
+        self._lag_lock = asyncio.Lock()
 
     @asynccontextmanager
     async def get_session(self):
         async with self._sessionmaker() as session:
             yield session
 
+    @asynccontextmanager
+    async def get_read_session(self, primary: bool = False):
+        """
+        A session on the replica, or on the primary when there is no replica,
+        `primary` is set or the replica lags more than REPLICA_MAX_LAG_SECONDS.
+        """
+        replica = self._read_sessionmaker is not None and not primary and await self.replica_usable()
+        sessionmaker = self._read_sessionmaker if replica else self._sessionmaker
+        async with sessionmaker() as session:
+            session.info[_REPLICA_KEY] = replica
+            yield session
+
+    async def replica_lag(self) -> Optional[float]:
+        """
+        Replication lag in seconds, checked at most every
+        REPLICA_LAG_CHECK_SECONDS; None when the replica can't be reached.
+        """
+        if self._read_engine is None:
+            return 0.0
+        if time.monotonic() - self._replica_lag_checked_at < config.REPLICA_LAG_CHECK_SECONDS:
+            return self._replica_lag
+        if self._lag_lock.locked():
+            # someone is checking; keep serving the last result meanwhile
+            return self._replica_lag
+        async with self._lag_lock:
+            try:
+                async with self._read_engine.connect() as connection:
+                    self._replica_lag = float((await connection.execute(REPLICA_LAG_QUERY)).scalar())
+            except Exception:
+                logger.exception("Replica lag check failed")
+                self._replica_lag = None
+            self._replica_lag_checked_at = time.monotonic()
+        return self._replica_lag
+
+    async def replica_usable(self) -> bool:
+        lag = await self.replica_lag()
+        return lag is not None and lag <= config.REPLICA_MAX_LAG_SECONDS
+
+    @property
+    def has_replica(self) -> bool:
+        return self._read_engine is not None
+
+    @property
+    def replica_max_staleness(self) -> float:
+        # the lag allowed at the last check, plus what it may have grown since
+        return config.REPLICA_MAX_LAG_SECONDS + config.REPLICA_LAG_CHECK_SECONDS
+
     async def commit_and_close(self, session: AsyncSession):
         try:
             await session.commit()
@@ -34,11 +137,84 @@ class DBConnection:
 
     async def dispose(self):
         await self._engine.dispose()
+        if self._read_engine is not None:
+            await self._read_engine.dispose()
 
 
 db_connection = DBConnection()
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+@event.listens_for(Session, "after_commit")
+def _mark_primary_write(session: Session):
+    # picked up by ReadYourWritesMiddleware once the response starts
+    state = session.info.get(_REQUEST_STATE_KEY)
+    if state is not None:
+        state.db_committed = True
+
+
+def reads_from_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def reads_replica(session: AsyncSession) -> bool:
+    return session.info.get(_REPLICA_KEY, False)
+
+
+def reads_own_writes(session: AsyncSession) -> bool:
+    """
+    Whether the session serves a client that wrote within
+    READ_YOUR_WRITES_SECONDS. Such reads must skip the response caches and
+    per-worker indexes, which may predate the write.
+    """
+    return session.info.get(_READ_YOUR_WRITES_KEY, False)
+
+
+def _set_db_route(request: Request):
+    # labels pool hold times; the template keeps the label set bounded
+    route = request.scope.get("route")
+    db_route.set(getattr(route, "path", "unmatched"))
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    _set_db_route(request)
     async with db_connection.get_session() as session:
+        session.info[_REQUEST_STATE_KEY] = request.state
+        yield session
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only routes: the replica unless it lags or this client
+    wrote within the last READ_YOUR_WRITES_SECONDS.
+    """
+    _set_db_route(request)
+    primary = reads_from_primary(request)
+    async with db_connection.get_read_session(primary=primary) as session:
+        session.info[_READ_YOUR_WRITES_KEY] = primary
         yield session
+
+
+class ReadYourWritesMiddleware:
+    """
+    Sets PRIMARY_COOKIE on responses to requests that committed on the
+    primary, so the client's next reads see its own writes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not db_connection.has_replica:
+            return await self.app(scope, receive, send)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and scope.get("state", {}).get("db_committed"):
+                seconds = config.READ_YOUR_WRITES_SECONDS
+                cookie = f"{PRIMARY_COOKIE}={int(time.time()) + seconds}; Max-Age={seconds}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
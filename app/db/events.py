@@ -0,0 +1,32 @@
+import logging
+from typing import Callable
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_ON_COMMIT_KEY = "on_commit_callbacks"
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], None]):
+    """
+    Runs `callback` once the session's current transaction commits, and drops
+    it if the transaction rolls back. Used to keep per-worker indexes and
+    caches from observing uncommitted writes.
+    """
+    session.info.setdefault(_ON_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit_callbacks(session: Session):
+    for callback in session.info.pop(_ON_COMMIT_KEY, []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("on_commit callback %r failed", callback)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_commit_callbacks(session: Session):
+    session.info.pop(_ON_COMMIT_KEY, None)
@@ -0,0 +1,63 @@
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple, Type, get_args
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def _nested_model(annotation) -> Optional[Type[BaseModel]]:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        model = _nested_model(arg)
+        if model is not None:
+            return model
+    return None
+
+
+def _loader(parent, entity, relationship):
+    # collections load with one SELECT ... IN per level, scalars ride along as a join
+    attribute = getattr(entity, relationship.key)
+    if parent is None:
+        return selectinload(attribute) if relationship.uselist else joinedload(attribute)
+    return parent.selectinload(attribute) if relationship.uselist else parent.joinedload(attribute)
+
+
+def _model_options(entity, model: Type[BaseModel], parent=None, exclude: Iterable[str] = ()):
+    relationships = inspect(entity).relationships
+    options = []
+    for name, field in model.model_fields.items():
+        if name in exclude or name not in relationships:
+            continue
+        relationship = relationships[name]
+        loader = _loader(parent, entity, relationship)
+        nested = _nested_model(field.annotation)
+        children = _model_options(relationship.mapper.class_, nested, loader) if nested else []
+        options.extend(children or [loader])
+    return options
+
+
+def _path_option(entity, path: str):
+    loader = None
+    for key in path.split("."):
+        relationship = inspect(entity).relationships[key]
+        loader = _loader(loader, entity, relationship)
+        entity = relationship.mapper.class_
+    return loader
+
+
+@lru_cache(maxsize=None)
+def loader_options(
+    entity, response_model: Type[BaseModel], include: Tuple[str, ...] = (), exclude: Tuple[str, ...] = ()
+) -> tuple:
+    """
+    Eager-load options for exactly the relationships `response_model`
+    serializes, recursing into nested response models.
+
+    `include` adds dotted relationship paths for values the service derives
+    from relationships the model doesn't name (e.g. "locality.area.city"),
+    and `exclude` skips fields filled some other way.
+    """
+    options = _model_options(entity, response_model, exclude=exclude)
+    options.extend(_path_option(entity, path) for path in include)
+    return tuple(options)
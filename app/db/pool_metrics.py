@@ -0,0 +1,120 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, List
+from sqlalchemy import event, exc
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.utils.metrics import registry
+
+# route template of the request using the connection, set by get_db/get_read_db
+db_route: ContextVar[str] = ContextVar("db_route", default="background")
+
+_CHECKOUT_KEY = "metrics_checked_out_at"
+
+checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection, including connects.", ["pool"]
+)
+connection_hold = registry.histogram(
+    "db_pool_connection_hold_seconds", "Time a connection stays checked out, by route.", ["pool", "route"]
+)
+checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts", "Checkouts that gave up after the pool timeout.", ["pool"]
+)
+compiled_cache_lookups = registry.counter(
+    "db_compiled_cache_lookups", "SQL compilation cache lookups per statement executed, by result.", ["pool", "result"]
+)
+# cache_hit, cache_miss, caching_disabled, no_cache_key (plain driver SQL), no_dialect_support
+_CACHE_RESULTS = {stat: stat.name.lower() for stat in CacheStats}
+pool_size = registry.gauge("db_pool_size", "Configured pool size.", ["pool"])
+pool_max_overflow = registry.gauge("db_pool_max_overflow", "Configured overflow limit.", ["pool"])
+pool_checked_out = registry.gauge("db_pool_checked_out", "Connections currently checked out.", ["pool"])
+pool_checked_in = registry.gauge("db_pool_checked_in", "Idle connections in the pool.", ["pool"])
+pool_overflow = registry.gauge("db_pool_overflow", "Connections open beyond pool_size.", ["pool"])
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    The asyncio queue pool, timing how long each checkout waits for a
+    connection. The pool is named by the engine's pool_logging_name.
+    """
+
+    @property
+    def metrics_name(self) -> str:
+        return self._orig_logging_name or "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            checkout_timeouts.inc(self.metrics_name)
+            raise
+        finally:
+            checkout_wait.observe(time.perf_counter() - start, self.metrics_name)
+
+
+_pools: Dict[str, object] = {}
+
+
+def instrument_engine(engine, name: str):
+    """
+    Records hold times per route for the engine's pool and reports its state
+    at scrape time, and counts compiled cache hits of executed statements.
+    The engine must use InstrumentedAsyncAdaptedQueuePool with
+    pool_logging_name=name.
+    """
+    sync_engine = engine.sync_engine
+    _pools[name] = sync_engine
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info[_CHECKOUT_KEY] = (time.perf_counter(), db_route.get())
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out = connection_record.info.pop(_CHECKOUT_KEY, None)
+        if checked_out is not None:
+            started, route = checked_out
+            connection_hold.observe(time.perf_counter() - started, name, route)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        cache_hit = getattr(context, "cache_hit", None)
+        if cache_hit is not None:
+            compiled_cache_lookups.inc(name, _CACHE_RESULTS[cache_hit])
+
+
+def _collect_pool_state():
+    for name, sync_engine in _pools.items():
+        pool = sync_engine.pool
+        pool_size.set(pool.size(), name)
+        pool_max_overflow.set(pool._max_overflow, name)
+        pool_checked_out.set(pool.checkedout(), name)
+        pool_checked_in.set(pool.checkedin(), name)
+        pool_overflow.set(max(pool.overflow(), 0), name)
+
+
+registry.add_collector(_collect_pool_state)
+
+
+def pool_summary() -> List[dict]:
+    """
+    Current state and checkout statistics of every instrumented pool.
+    """
+    _collect_pool_state()
+    summary = []
+    for name in _pools:
+        wait_p95 = checkout_wait.quantile(0.95, name)
+        summary.append({
+            "pool": name,
+            "size": int(pool_size.value(name)),
+            "max_overflow": int(pool_max_overflow.value(name)),
+            "checked_out": int(pool_checked_out.value(name)),
+            "idle": int(pool_checked_in.value(name)),
+            "overflow": int(pool_overflow.value(name)),
+            "checkouts": checkout_wait.count(name),
+            "timeouts": int(checkout_timeouts.value(name)),
+            # bucket upper bound, capped at the last finite one; None before the first checkout
+            "checkout_wait_p95_ms": None if wait_p95 is None else min(wait_p95, checkout_wait.buckets[-1]) * 1000,
+        })
+    return summary
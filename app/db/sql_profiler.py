@@ -0,0 +1,127 @@
+import heapq
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+_STARTED_KEY = "sql_profiler_started_at"
+_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|\?")
+# an expanded IN list has one parameter per value; its shape shouldn't depend on the count
+_PARAMETER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def statement_shape(statement: str) -> str:
+    return _PARAMETER_LIST.sub("?...", _PARAMETER.sub("?", " ".join(statement.split())))
+
+
+class RequestSqlProfile:
+    """
+    Statements one request ran: count, total time, the slowest ones and how
+    often each statement shape repeated.
+    """
+
+    def __init__(self, slowest: int):
+        self.count = 0
+        self.seconds = 0.0
+        self._slowest_size = slowest
+        self._slowest: List[Tuple[float, int, str]] = []
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+        entry = (seconds, self.count, statement)
+        if len(self._slowest) < self._slowest_size:
+            heapq.heappush(self._slowest, entry)
+        elif self._slowest and entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        return [(seconds, statement) for seconds, _, statement in sorted(self._slowest, reverse=True)]
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Shapes run at least `threshold` times: a query per row of an earlier
+        result, the usual sign of an N+1 pattern.
+        """
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+_profile: ContextVar[Optional[RequestSqlProfile]] = ContextVar("sql_profile", default=None)
+
+
+def instrument_sql(engine):
+    """
+    Times every cursor execution of the engine into the current request's
+    profile. Only installed when SQL_PROFILING_ENABLED is set, so a disabled
+    profiler costs nothing.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info[_STARTED_KEY] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _profile.get()
+        started = conn.info.pop(_STARTED_KEY, None)
+        if profile is not None and started is not None:
+            profile.record(statement, time.perf_counter() - started)
+
+
+class SqlProfilingMiddleware:
+    """
+    Collects a RequestSqlProfile per request. Adds a Server-Timing header
+    (statements run before the response starts) and logs the slowest
+    statements at DEBUG, and repeated statement shapes at WARNING.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        profile = RequestSqlProfile(config.SQL_PROFILE_SLOWEST)
+        token = _profile.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and profile.count:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", profile.server_timing().encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _profile.reset(token)
+            self._log(scope, profile)
+
+    @staticmethod
+    def _log(scope, profile: RequestSqlProfile):
+        if not profile.count:
+            return
+        route = getattr(scope.get("route"), "path", scope.get("path"))
+        for shape, count in profile.repeated_shapes(config.SQL_NPLUSONE_THRESHOLD):
+            logger.warning("Possible N+1 in %s %s: %d x %s", scope["method"], route, count, shape[:500])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s %s ran %d statements in %.1fms; slowest: %s",
+                scope["method"], route, profile.count, profile.seconds * 1000,
+                "; ".join(f"{seconds * 1000:.1f}ms {' '.join(statement.split())[:200]}"
+                          for seconds, statement in profile.slowest),
+            )
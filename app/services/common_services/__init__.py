@@ -1 +1 @@
-from . import healthcheck, upload
\ No newline at end of file
+from . import healthcheck, upload, metrics
\ No newline at end of file
@@ -2,6 +2,7 @@ from fastapi import APIRouter
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 from app.db.connection import db_connection
+from app.db.pool_metrics import pool_summary
 
 router = APIRouter(tags=["reztic_healthcheck"])
 
@@ -11,15 +12,24 @@ async def healthcheck():
     db_status, db_message = await check_database()
 
     overall_status = "Healthy" if db_status == "Healthy" else "Unhealthy"
+    components = {
+        "database": {
+            "status": db_status,
+            "message": db_message,
+        }
+    }
+    if db_connection.has_replica:
+        # a lagging replica doesn't make the service unhealthy, reads fall back to the primary
+        replica_status, replica_message = await check_replica()
+        components["database_replica"] = {
+            "status": replica_status,
+            "message": replica_message,
+        }
 
     return {
         "status": overall_status,
-        "components": {
-            "database": {
-                "status": db_status,
-                "message": db_message,
-            }
-        }
+        "components": components,
+        "pools": pool_summary(),
     }
 
 
@@ -32,3 +42,12 @@ async def check_database():
         return "Unhealthy", f"Database connection failed: {str(e)}"
     except Exception as e:
         return "Unhealthy", f"Unexpected error: {str(e)}"
+
+
+async def check_replica():
+    lag = await db_connection.replica_lag()
+    if lag is None:
+        return "Unhealthy", "Replica connection failed, reads use the primary."
+    if not await db_connection.replica_usable():
+        return "Degraded", f"Replica lags {lag:.1f}s, reads use the primary."
+    return "Healthy", f"Replica lags {lag:.1f}s."
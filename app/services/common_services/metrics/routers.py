@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.utils.metrics import render_prometheus
+from app.utils.http_metrics import collect_metrics
+
+router = APIRouter(tags=["reztic_metrics"])
+
+
+@router.get("/metrics", summary="Prometheus metrics", include_in_schema=False)
+async def metrics():
+    # every worker's metrics when METRICS_MULTIPROC_DIR is set, this worker's otherwise
+    return Response(
+        content=render_prometheus(await collect_metrics()), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
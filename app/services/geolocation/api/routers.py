@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends
-from app.db.connection import get_db
+from app.db.connection import get_read_db
 from app.services.geolocation.schemas import LocalityFilters
 from app.services.geolocation.service.geolocation_service import GeolocationService
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,9 +10,11 @@ router = APIRouter(tags=["geolocation"], prefix="/api/v1")
 @router.get("/localities")
 async def get_localities(
         request: LocalityFilters = Depends(),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_read_db)
 ):
     geo_service = GeolocationService(db)
+    if request.q is not None:
+        return await geo_service.autocomplete(request)
     response = await geo_service.get_localities(request)
 
     return response
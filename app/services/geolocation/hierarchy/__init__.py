@@ -0,0 +1,5 @@
+from .geo_tree import GeoHierarchy, GeoNode, LEVELS, SUGGESTED_LEVELS
+from .prefix_index import PrefixIndex, normalize
+
+# per-worker copy of the geo hierarchy, see geo_hierarchy_service
+geo_hierarchy = GeoHierarchy()
@@ -0,0 +1,152 @@
+import heapq
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+from app.utils.cache_utils import TTLCache
+from .prefix_index import PrefixIndex, normalize
+
+LEVELS = ("country", "state", "city", "area", "locality")
+# levels offered by autocomplete
+SUGGESTED_LEVELS = ("city", "area", "locality")
+# queries this short match a large share of all names; their ranking is kept
+# until the tree is rebuilt
+BROAD_QUERY_LENGTH = 3
+
+
+@dataclass(frozen=True, slots=True)
+class GeoNode:
+    id: UUID
+    level: str
+    name: str
+    parent_id: Optional[UUID]
+    # root first, parent last
+    ancestor_ids: Tuple[UUID, ...]
+    full_address: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+class GeoHierarchy:
+    """
+    Per-worker copy of the country > state > city > area > locality tree.
+
+    Rows are loaded flat and linked once, so every node carries its ancestor
+    ids and full address ("locality, area, city, state, country") ready to
+    serve without joining up the chain per project.
+    """
+
+    def __init__(self):
+        self._nodes: Dict[UUID, GeoNode] = {}
+        self._children: Dict[UUID, List[UUID]] = {}
+        self._prefix_index = PrefixIndex()
+        self._broad_rankings = TTLCache(maxsize=512, ttl=float("inf"))
+        self.loaded = False
+        self.refreshed_at = 0.0
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def build(self, rows: Dict[str, Iterable[tuple]]):
+        """
+        Replaces the tree with `rows`: for each level, (id, name, parent_id)
+        tuples, localities extended with (latitude, longitude). Rows whose
+        parent is missing are dropped along with their subtree.
+        """
+        nodes: Dict[UUID, GeoNode] = {}
+        children: Dict[UUID, List[UUID]] = {}
+        for level in LEVELS:
+            for row in rows.get(level, ()):
+                node_id, name, parent_id = row[:3]
+                parent = nodes.get(parent_id) if parent_id is not None else None
+                if level != "country" and parent is None:
+                    continue
+                latitude, longitude = (row[3], row[4]) if level == "locality" else (None, None)
+                nodes[node_id] = GeoNode(
+                    id=node_id,
+                    level=level,
+                    name=name,
+                    parent_id=parent_id,
+                    ancestor_ids=parent.ancestor_ids + (parent.id,) if parent else (),
+                    full_address=f"{name}, {parent.full_address}" if parent else name,
+                    latitude=float(latitude) if latitude is not None else None,
+                    longitude=float(longitude) if longitude is not None else None,
+                )
+                if parent:
+                    children.setdefault(parent.id, []).append(node_id)
+
+        prefix_index = PrefixIndex()
+        prefix_index.build((node.id, node.name) for node in nodes.values() if node.level in SUGGESTED_LEVELS)
+
+        # swap in one step so readers never see a half built tree
+        self._nodes, self._children, self._prefix_index = nodes, children, prefix_index
+        self._broad_rankings.clear()
+        self.loaded = True
+
+    def get(self, node_id: UUID) -> Optional[GeoNode]:
+        return self._nodes.get(node_id)
+
+    def locality(self, locality_id: UUID) -> Optional[GeoNode]:
+        node = self._nodes.get(locality_id)
+        return node if node is not None and node.level == "locality" else None
+
+    def ancestors(self, node_id: UUID) -> List[GeoNode]:
+        node = self._nodes.get(node_id)
+        return [self._nodes[i] for i in node.ancestor_ids] if node else []
+
+    def children(self, node_id: UUID) -> List[GeoNode]:
+        return [self._nodes[i] for i in self._children.get(node_id, ())]
+
+    def nodes(self, level: Optional[str] = None) -> Iterable[GeoNode]:
+        if level is None:
+            return self._nodes.values()
+        return (node for node in self._nodes.values() if node.level == level)
+
+    def localities(
+        self, within: Iterable[Set[UUID]] = (), offset: int = 0, limit: int = 10
+    ) -> Tuple[List[GeoNode], int]:
+        """
+        Returns (page of localities by name, total), restricted like
+        autocomplete by every id set in `within`.
+        """
+        within = list(within)
+        matches = [
+            node for node in self.nodes("locality")
+            if not any({node.id, *node.ancestor_ids}.isdisjoint(ids) for ids in within)
+        ]
+        matches.sort(key=lambda node: (normalize(node.name), node.full_address, node.id))
+        return matches[offset:offset + limit], len(matches)
+
+    def autocomplete(
+        self, query: str, within: Iterable[Set[UUID]] = (), offset: int = 0, limit: int = 10
+    ) -> Tuple[List[GeoNode], int]:
+        """
+        Returns (page of city/area/locality nodes with a word starting with
+        `query`, total matches). Each id set in `within` restricts matches to
+        the subtrees under any of its ids.
+
+        Exact names rank first, then whole-name prefixes, then shorter names.
+        """
+        within = list(within)
+        query = normalize(query)
+        broad = len(query) <= BROAD_QUERY_LENGTH
+        if broad:
+            cache_key = (query, tuple(frozenset(ids) for ids in within))
+            ranked = self._broad_rankings.get(cache_key)
+            if ranked is not None:
+                return [self._nodes[i] for i in ranked[offset:offset + limit]], len(ranked)
+
+        candidates = []
+        for node_id, match in self._prefix_index.search(query).items():
+            node = self._nodes[node_id]
+            if within:
+                lineage = {node.id, *node.ancestor_ids}
+                if any(lineage.isdisjoint(ids) for ids in within):
+                    continue
+            candidates.append((match, len(node.name), SUGGESTED_LEVELS.index(node.level), node.name, node_id))
+
+        if broad:
+            ranked = [item[-1] for item in sorted(candidates)]
+            self._broad_rankings.set(cache_key, ranked)
+            return [self._nodes[i] for i in ranked[offset:offset + limit]], len(ranked)
+        page = heapq.nsmallest(offset + limit, candidates)[offset:]
+        return [self._nodes[item[-1]] for item in page], len(candidates)
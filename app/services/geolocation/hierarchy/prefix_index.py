@@ -0,0 +1,62 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+
+# ranks of a match: the whole name starts with the query, or a later word does
+NAME_PREFIX, WORD_PREFIX = 0, 1
+
+_WORD_START = re.compile(r"(?:^|(?<=[\s\-/,(]))\w")
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+
+class PrefixIndex:
+    """
+    Sorted array of name keys for typeahead. Every name is stored once per
+    word start ("electronic city phase 1" also as "city phase 1", "phase 1",
+    "1"), so a prefix lookup is a bisect plus a scan over the matches only.
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._entries: List[Tuple[UUID, int]] = []
+
+    def __len__(self):
+        return len(self._keys)
+
+    def build(self, names: Iterable[Tuple[UUID, str]]):
+        pairs = []
+        for node_id, name in names:
+            key = normalize(name)
+            for match in _WORD_START.finditer(key):
+                start = match.start()
+                pairs.append((key[start:], node_id, NAME_PREFIX if start == 0 else WORD_PREFIX))
+        pairs.sort(key=lambda pair: pair[0])
+        self._keys = [key for key, _, _ in pairs]
+        self._entries = [(node_id, rank) for _, node_id, rank in pairs]
+
+    def search(self, query: str) -> Dict[UUID, Tuple[int, int]]:
+        """
+        {node id: (exact, rank)} for the names having a word starting with
+        `query`, where exact is 0 for names equal to the query and 1 otherwise
+        (so both sort best-first).
+        """
+        query = normalize(query)
+        if not query:
+            return {}
+        matches: Dict[UUID, Tuple[int, int]] = {}
+        keys, entries = self._keys, self._entries
+        i = bisect_left(keys, query)
+        while i < len(keys) and keys[i].startswith(query):
+            node_id, rank = entries[i]
+            match = (0 if rank == NAME_PREFIX and keys[i] == query else 1, rank)
+            if match < matches.get(node_id, (2, 2)):
+                matches[node_id] = match
+            i += 1
+        return matches
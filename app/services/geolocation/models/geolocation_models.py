@@ -1,5 +1,6 @@
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Column, String, ForeignKey, Numeric
+from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime
+from sqlalchemy.sql import func
 from uuid import uuid4
 from app.db.base import Base
 from sqlalchemy.orm import relationship
@@ -11,6 +12,8 @@ class Country(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String(100), nullable=False)
     iso_code = Column(String(10), nullable=False, unique=True)
+    # project details embed the full address; their ETag covers these
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     def __repr__(self):
         return f"<Country {self.name}>"
@@ -22,6 +25,7 @@ class State(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String(100), nullable=False)
     country_id = Column(UUID(as_uuid=True), ForeignKey('countries.id'), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     country = relationship("Country", backref="states")
 
@@ -35,6 +39,7 @@ class City(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String(100), nullable=False)
     state_id = Column(UUID(as_uuid=True), ForeignKey('states.id'), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     state = relationship("State", backref="cities")
 
@@ -48,6 +53,7 @@ class Area(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String(100), nullable=False)
     city_id = Column(UUID(as_uuid=True), ForeignKey('cities.id'), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     city = relationship("City", backref="areas")
 
@@ -63,6 +69,7 @@ class Locality(Base):
     area_id = Column(UUID(as_uuid=True), ForeignKey('areas.id'), nullable=False)
     latitude = Column(Numeric(9, 6), nullable=True)
     longitude = Column(Numeric(9, 6), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     area = relationship("Area", backref="localities")
 
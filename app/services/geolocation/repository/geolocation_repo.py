@@ -1,11 +1,23 @@
-from app.services.geolocation.models.geolocation_models import Area, City, State, Locality
-from app.services.geolocation.schemas import LocalityFilters
-from sqlalchemy import select
+from typing import Dict, List
+from app.services.geolocation.models.geolocation_models import Area, City, Country, State, Locality
+from sqlalchemy import literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-async def get_localities(filters: LocalityFilters, db: AsyncSession):
-    result = await db.execute(
-        select(Locality).where(Locality.name == filters.locality_id)
-    )
-    return result.scalar_one_or_none()
+async def fetch_geo_hierarchy_rows(db: AsyncSession) -> Dict[str, List[tuple]]:
+    """
+    Every row of the geo hierarchy as plain tuples keyed by level, each as
+    (id, name, parent_id); localities also carry (latitude, longitude).
+    """
+    queries = {
+        "country": select(Country.id, Country.name, literal(None)),
+        "state": select(State.id, State.name, State.country_id),
+        "city": select(City.id, City.name, City.state_id),
+        "area": select(Area.id, Area.name, Area.city_id),
+        "locality": select(Locality.id, Locality.name, Locality.area_id, Locality.latitude, Locality.longitude),
+    }
+    rows = {}
+    for level, query in queries.items():
+        result = await db.execute(query)
+        rows[level] = [tuple(row) for row in result.all()]
+    return rows
@@ -1,9 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 
 class LocalityFilters(BaseModel):
+    q: Optional[str] = Field(default=None, max_length=100)  # prefix for autocomplete
     area_name: Optional[str] = None
     city_name: Optional[str] = None
     locality_id: Optional[UUID] = None
@@ -12,3 +13,23 @@ class LocalityFilters(BaseModel):
     area_id: Optional[UUID] = None
     page: int = Field(default=1, ge=1)
     limit: int = Field(default=10, ge=1, le=100)
+
+
+class GeoNodeResponse(BaseModel):
+    id: UUID
+    name: str
+    level: str
+
+
+class LocalitySuggestion(GeoNodeResponse):
+    full_address: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    hierarchy: List[GeoNodeResponse] = []
+
+
+class LocalitySuggestionsResponse(BaseModel):
+    total: int
+    page: int
+    limit: int
+    results: List[LocalitySuggestion]
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from typing import Dict, Iterable
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.services.geolocation.hierarchy import GeoNode, geo_hierarchy
+from app.services.geolocation.repository.geolocation_repo import fetch_geo_hierarchy_rows
+
+# an id missing from the tree forces a reload, at most this often
+MISS_RELOAD_SECONDS = 5
+
+_refresh_lock = asyncio.Lock()
+_last_miss_reload = 0.0
+
+
+def geo_hierarchy_is_fresh() -> bool:
+    return (
+        geo_hierarchy.loaded
+        and time.monotonic() - geo_hierarchy.refreshed_at < config.GEO_HIERARCHY_REFRESH_SECONDS
+    )
+
+
+async def refresh_geo_hierarchy(db: AsyncSession, force: bool = False):
+    """
+    (Re)loads the worker's geo hierarchy. Once loaded, concurrent callers keep
+    reading the current tree instead of waiting for the reload.
+    """
+    if not force and geo_hierarchy_is_fresh():
+        return
+    if _refresh_lock.locked() and geo_hierarchy.loaded:
+        return
+
+    async with _refresh_lock:
+        if not force and geo_hierarchy_is_fresh():
+            return
+        geo_hierarchy.build(await fetch_geo_hierarchy_rows(db))
+        geo_hierarchy.refreshed_at = time.monotonic()
+
+
+async def resolve_localities(db: AsyncSession, locality_ids: Iterable[UUID]) -> Dict[UUID, GeoNode]:
+    """
+    Locality nodes for `locality_ids`. A locality created since the last load
+    triggers a reload, so new rows show up without waiting for the refresh.
+    """
+    global _last_miss_reload
+    await refresh_geo_hierarchy(db)
+
+    locality_ids = set(locality_ids)
+    nodes = {i: node for i in locality_ids if (node := geo_hierarchy.locality(i)) is not None}
+    if len(nodes) < len(locality_ids) and time.monotonic() - _last_miss_reload > MISS_RELOAD_SECONDS:
+        _last_miss_reload = time.monotonic()
+        await refresh_geo_hierarchy(db, force=True)
+        nodes = {i: node for i in locality_ids if (node := geo_hierarchy.locality(i)) is not None}
+    return nodes
@@ -1,11 +1,62 @@
-from app.services.geolocation.repository.geolocation_repo import get_localities
+from typing import List, Set
+from uuid import UUID
+from app.services.geolocation.hierarchy import GeoNode, geo_hierarchy, normalize
+from app.services.geolocation.schemas import (
+    GeoNodeResponse, LocalityFilters, LocalitySuggestion, LocalitySuggestionsResponse
+)
+from app.services.geolocation.service.geo_hierarchy_service import refresh_geo_hierarchy
 
 
 class GeolocationService:
     def __init__(self, db):
         self.db = db
 
-    async def get_localities(self, payload):
-        response = await get_localities(filters=payload, db=self.db)
-        return response
+    async def get_localities(self, filters: LocalityFilters) -> LocalitySuggestionsResponse:
+        """
+        Localities under the filtered city, area or locality, by name, answered
+        from the in-memory geo hierarchy.
+        """
+        await refresh_geo_hierarchy(self.db)
 
+        nodes, total = geo_hierarchy.localities(
+            self._within(filters), offset=(filters.page - 1) * filters.limit, limit=filters.limit
+        )
+        return LocalitySuggestionsResponse(
+            total=total, page=filters.page, limit=filters.limit, results=[self._suggestion(n) for n in nodes]
+        )
+
+    async def autocomplete(self, filters: LocalityFilters) -> LocalitySuggestionsResponse:
+        """
+        Typeahead over city, area and locality names, answered from the
+        in-memory geo hierarchy.
+        """
+        await refresh_geo_hierarchy(self.db)
+
+        nodes, total = geo_hierarchy.autocomplete(
+            filters.q, self._within(filters), offset=(filters.page - 1) * filters.limit, limit=filters.limit
+        )
+        return LocalitySuggestionsResponse(
+            total=total, page=filters.page, limit=filters.limit, results=[self._suggestion(n) for n in nodes]
+        )
+
+    @staticmethod
+    def _within(filters: LocalityFilters) -> List[Set[UUID]]:
+        # one id set per filter, every one of which a result must fall under
+        node_ids = (filters.country_id, filters.city_id, filters.area_id, filters.locality_id)
+        within = [{node_id} for node_id in node_ids if node_id]
+        for level, name in (("city", filters.city_name), ("area", filters.area_name)):
+            if name:
+                within.append({n.id for n in geo_hierarchy.nodes(level) if normalize(n.name) == normalize(name)})
+        return within
+
+    @staticmethod
+    def _suggestion(node: GeoNode) -> LocalitySuggestion:
+        return LocalitySuggestion(
+            id=node.id,
+            name=node.name,
+            level=node.level,
+            full_address=node.full_address,
+            latitude=node.latitude,
+            longitude=node.longitude,
+            hierarchy=[GeoNodeResponse(id=a.id, name=a.name, level=a.level) for a in geo_hierarchy.ancestors(node.id)],
+        )
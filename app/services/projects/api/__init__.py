@@ -1,3 +1,8 @@
 from . import create
 from . import list
-from . import details
\ No newline at end of file
+from . import details
+from . import facets
+from . import nearby
+from . import clusters
+from . import bulk_import
+from . import export
\ No newline at end of file
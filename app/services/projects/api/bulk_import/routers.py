@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.connection import get_db
+from app.services.projects.schemas.project_schemas import ProjectImportResponse
+from app.services.projects.service.project_import_service import ProjectImportService
+
+router = APIRouter(prefix="/api/v1/projects", tags=["projects"])
+
+
+@router.post("/import", response_model=ProjectImportResponse)
+async def import_projects(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Bulk create from an NDJSON body, one ProjectCreateRequest per line. The
+    body is read as a stream; invalid or conflicting rows are reported by
+    line number and don't stop the import.
+    """
+    try:
+        return await ProjectImportService(db).import_ndjson(request.stream())
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(
+            status_code=500,
+            content={"status": 500, "msg": "Failed to import projects", "error": str(e)}
+        )
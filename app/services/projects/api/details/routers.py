@@ -1,21 +1,30 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.responses import JSONResponse
-from app.db.connection import get_db
+from fastapi.responses import JSONResponse, Response
+from app.db.connection import get_read_db
 from uuid import UUID
 from app.services.projects.service.project_service import ProjectService
 from app.utils.errors import ProjectNotFound
+from app.utils.http_utils import is_not_modified
 
 router = APIRouter(prefix="/api/v1/project", tags=["projects"])
 
 
 @router.get("/details/{project_id}")
 async def get_projects(
-    project_id: UUID, db: AsyncSession = Depends(get_db)
+    project_id: UUID, request: Request, db: AsyncSession = Depends(get_read_db)
 ):
     try:
-        project_detail = await ProjectService(db).get_project_details(project_id)
-        return project_detail
+        detail, cached = await ProjectService(db).get_project_detail_response(project_id, request.headers)
+        headers = {
+            **detail.headers,
+            "Cache-Control": "public, max-age=0, must-revalidate",
+            "X-Cache": "HIT" if cached else "MISS",
+        }
+        if is_not_modified(request.headers, detail.headers["ETag"], detail.headers.get("Last-Modified")):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(content=detail.body, media_type="application/json", headers=headers)
     except ProjectNotFound as e:
         return JSONResponse(
             status_code=e.status_code,
@@ -0,0 +1 @@
+from . import routers
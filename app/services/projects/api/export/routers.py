@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from app.services.projects.schemas.project_schemas import ProjectExportFilters
+from app.services.projects.service.project_export_service import export_projects_ndjson
+from typing import Optional, List
+from app.services.projects.schemas.enums import UnitType
+
+router = APIRouter(prefix="/api/v1/projects", tags=["projects"])
+
+
+@router.get("/export")
+async def export_projects(
+    bedrooms: Optional[List[int]] = Query(default=None),
+    unit_type: Optional[List[UnitType]] = Query(default=None),
+    balconies: Optional[List[int]] = Query(default=None),
+    filters: ProjectExportFilters = Depends(),
+):
+    """
+    Every project matching the listing filters as NDJSON, one project per
+    line in (updated_at, id) order. Pass the last updated_at seen as
+    updated_since to fetch only what changed since.
+    """
+    filters.bedrooms = bedrooms
+    filters.balconies = balconies
+    filters.unit_type = unit_type
+    return StreamingResponse(export_projects_ndjson(filters), media_type="application/x-ndjson")
@@ -0,0 +1 @@
+from . import routers
\ No newline at end of file
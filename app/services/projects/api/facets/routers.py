@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import JSONResponse
+from app.db.connection import get_read_db
+from app.services.projects.schemas.project_schemas import ProjectListFilters, ProjectFacetCountsResponse
+from app.services.projects.service.project_service import ProjectService
+from typing import Optional, List
+from app.services.projects.schemas.enums import UnitType
+
+router = APIRouter(prefix="/api/v1/projects", tags=["projects"])
+
+
+@router.get("/facets", response_model=ProjectFacetCountsResponse)
+async def get_project_facets(
+    bedrooms: Optional[List[int]] = Query(default=None),
+    unit_type: Optional[List[UnitType]] = Query(default=None),
+    balconies: Optional[List[int]] = Query(default=None),
+    filters: ProjectListFilters = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        filters.bedrooms = bedrooms
+        filters.balconies = balconies
+        filters.unit_type = unit_type
+        return await ProjectService(db).facet_counts(filters)
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"status": 500, "msg": "Failed to fetch project facets", "error": str(e)}
+        )
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.responses import JSONResponse
-from app.db.connection import get_db
+from fastapi.responses import JSONResponse, Response
+from app.db.connection import get_read_db
 from app.services.projects.schemas.project_schemas import ProjectListFilters
 from app.services.projects.service.project_service import ProjectService
 from typing import Optional, List
 from app.services.projects.schemas.enums import UnitType
+from app.utils.errors import InvalidCursorException
 
 router = APIRouter(prefix="/api/v1/projects", tags=["projects"])
 
@@ -16,19 +17,21 @@ async def get_projects(
     unit_type: Optional[List[UnitType]] = Query(default=None),
     balconies: Optional[List[int]] = Query(default=None),
     filters: ProjectListFilters = Depends(),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     try:
         filters.bedrooms = bedrooms
         filters.balconies = balconies
         filters.unit_type = unit_type
-        projects, total = await ProjectService(db).list_projects(filters)
-        return {
-            "projects": projects,
-            "total": total,
-            "page": filters.page,
-            "limit": filters.limit,
-        }
+        body, cached = await ProjectService(db).list_projects_response(filters)
+        return Response(
+            content=body, media_type="application/json", headers={"X-Cache": "HIT" if cached else "MISS"}
+        )
+    except InvalidCursorException as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"status": e.status_code, "msg": "Failed to fetch projects", "error": str(e.detail)}
+        )
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import JSONResponse, Response
+from app.db.connection import get_read_db
+from app.services.projects.schemas.project_schemas import ProjectGeoFilters, PaginatedNearbyProjectResponse
+from app.services.projects.service.project_service import ProjectService
+from typing import Optional, List
+from app.services.projects.schemas.enums import UnitType
+from app.utils.errors import InvalidGeoQueryException
+
+router = APIRouter(prefix="/api/v1/projects", tags=["projects"])
+
+
+@router.get("/nearby", response_model=PaginatedNearbyProjectResponse)
+async def get_nearby_projects(
+    bedrooms: Optional[List[int]] = Query(default=None),
+    unit_type: Optional[List[UnitType]] = Query(default=None),
+    balconies: Optional[List[int]] = Query(default=None),
+    filters: ProjectGeoFilters = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        filters.bedrooms = bedrooms
+        filters.balconies = balconies
+        filters.unit_type = unit_type
+        body = await ProjectService(db).nearby_projects(filters)
+        return Response(content=body, media_type="application/json")
+    except InvalidGeoQueryException as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"status": e.status_code, "msg": "Failed to fetch nearby projects", "error": str(e.detail)}
+        )
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"status": 500, "msg": "Failed to fetch nearby projects", "error": str(e)}
+        )
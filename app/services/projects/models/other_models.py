@@ -10,7 +10,7 @@ class NearbyLandmark(Base):
     __tablename__ = "nearby_landmarks"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    project_id = Column(UUID, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(UUID, ForeignKey("projects.id"), nullable=False, index=True)
 
     name = Column(String(100), nullable=False)
     type = Column(String(50), nullable=False)  # e.g., "hospital", "school", "mall"
@@ -40,7 +40,7 @@ class ProjectAmenity(Base):
     __tablename__ = "project_amenities"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    project_id = Column(UUID, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(UUID, ForeignKey("projects.id"), nullable=False, index=True)
     amenity_id = Column(UUID, ForeignKey("amenities.id"), nullable=False)
 
     is_available = Column(Boolean, default=True)
@@ -55,7 +55,7 @@ class ParkingCharge(Base):
     __tablename__ = 'parking_charges'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    project_id = Column(UUID, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(UUID, ForeignKey("projects.id"), nullable=False, index=True)
 
     parking_type = Column(String(20), nullable=False)
 
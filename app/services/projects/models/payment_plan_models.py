@@ -10,7 +10,7 @@ class PaymentPlan(Base):
     __tablename__ = 'payment_plans'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    project_id = Column(UUID, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(UUID, ForeignKey("projects.id"), nullable=False, index=True)
     plan_name = Column(String(255), nullable=False)
     description = Column(String)
     is_active = Column(Boolean, default=True)
@@ -25,7 +25,7 @@ class PaymentPlanBreakup(Base):
     __tablename__ = 'payment_plan_breakups'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    payment_plan_id = Column(UUID, ForeignKey('payment_plans.id'), nullable=False)
+    payment_plan_id = Column(UUID, ForeignKey('payment_plans.id'), nullable=False, index=True)
     milestone = Column(String(255), nullable=False)   # e.g., "On Booking", "On Slab Completion"
     percentage = Column(Float, nullable=False)        # Total must sum to 100
     due_days = Column(Integer, nullable=True)         # From booking/previous milestone
@@ -43,7 +43,7 @@ class AdditionalCharge(Base):
     __tablename__ = 'additional_charges'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    project_id = Column(UUID, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(UUID, ForeignKey("projects.id"), nullable=False, index=True)
     charge_name = Column(String(255), nullable=False)             # e.g., PLC, Clubhouse
     amount_type = Column(String(10), nullable=False)    # fixed / per_sqft / percentage
     amount_value = Column(Float, nullable=False)                  # value according to amount_type
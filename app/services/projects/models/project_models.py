@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Text, Date, DECIMAL, JSON, ForeignKey, Integer, Boolean, DateTime, ARRAY, Float
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, Date, DECIMAL, JSON, ForeignKey, Integer, Boolean, DateTime, ARRAY, Float, Index, \
+    UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, ARRAY as PG_ARRAY
 from sqlalchemy.sql import func
 from uuid import uuid4
 from sqlalchemy.orm import relationship
@@ -8,6 +9,16 @@ from app.db.base import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # keyset pagination seeks on (sort column, id)
+        Index("ix_projects_created_at_id", "created_at", "id"),
+        Index("ix_projects_updated_at_id", "updated_at", "id"),
+        Index("ix_projects_locality_id", "locality_id"),
+        # GIN trigram indexes on lower(name) live in the e7d04b6c3f21 migration,
+        # the (name COLLATE "C", id) keyset index in c8a2f5e7d913
+        # create_project inserts with ON CONFLICT on this
+        UniqueConstraint("developer_id", "name", name="uq_projects_developer_id_name"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     developer_id = Column(UUID(as_uuid=True), ForeignKey("developers.id"), nullable=False)
@@ -24,6 +35,7 @@ class Project(Base):
     furnishing_status = Column(String, default="NA")
     project_size = Column(Float, default=0, nullable=True)
     project_size_unit = Column(String(10), default="sqft")
+    project_size_sqft = Column(Float, nullable=True)  # project_size in sqft, set on write
     is_active = Column(Boolean, default=True)
     is_deleted = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -37,19 +49,24 @@ class Project(Base):
     payment_plan = relationship("PaymentPlan", backref="project", cascade="all, delete-orphan")
     parking = relationship("ParkingCharge", backref="project", cascade="all, delete-orphan")
     amenities = relationship("ProjectAmenity", backref="project", cascade="all, delete-orphan")
+    listing_summary = relationship("ProjectListingSummary", uselist=False, cascade="all, delete-orphan")
 
 
 class ProjectUnit(Base):
     __tablename__ = "project_units"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
     locality_id = Column(UUID(as_uuid=True), ForeignKey("localities.id"), nullable=False)
     unit_type = Column(String, nullable=False)  # "2 BHK", "Studio"
     layout_name = Column(String, nullable=True)
     carpet_area_value = Column(Float, nullable=False)
     super_area_value = Column(Float, nullable=False)
     area_unit = Column(String(10), default="sqft")  # Enum: sqft, sqm, acres, etc.
+    # the areas above in sqft and base_price per super area sqft, set on write
+    super_area_sqft = Column(Float, nullable=True)
+    carpet_area_sqft = Column(Float, nullable=True)
+    price_per_sqft = Column(Float, nullable=True)
     bedrooms = Column(Integer, nullable=True)
     balconies = Column(Integer, nullable=True)
     total_units = Column(Integer)
@@ -64,11 +81,35 @@ class ProjectUnit(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
+# Per-project aggregates over project_units, rewritten whenever units change so
+# listing can filter and sort on them without loading units.
+class ProjectListingSummary(Base):
+    __tablename__ = "project_listing_summary"
+    __table_args__ = (
+        Index("ix_project_listing_summary_starting_price", "starting_price"),
+        Index("ix_project_listing_summary_super_area", "min_super_area", "max_super_area"),
+        Index("ix_project_listing_summary_price_per_sqft", "min_price_per_sqft", "max_price_per_sqft"),
+        Index("ix_project_listing_summary_configuration", "configuration", postgresql_using="gin"),
+    )
+
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    starting_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+    # in sqft
+    min_super_area = Column(Float, nullable=True)
+    max_super_area = Column(Float, nullable=True)
+    min_price_per_sqft = Column(Float, nullable=True)
+    max_price_per_sqft = Column(Float, nullable=True)
+    configuration = Column(PG_ARRAY(String), default=[])  # distinct unit types, e.g. ["2BHK", "3BHK"]
+    total_units = Column(Integer, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class ProjectMedia(Base):
     __tablename__ = "project_media"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
     type = Column(String, nullable=False)  # image, video, pdf
     content_type = Column(String, nullable=True)
     is_featured = Column(Boolean, default=False)
@@ -78,6 +119,8 @@ class ProjectMedia(Base):
     meta_json = Column(JSON)
     is_active = Column(Boolean, default=True)
     is_deleted = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class ResaleListing(Base):
@@ -120,7 +163,7 @@ class ProjectCommission(Base):
     __tablename__ = "project_commissions"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    project_id = Column(UUID, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(UUID, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     commission_type = Column(String, nullable=False)  # 'fixed' or '%'
     calculation_type = Column(String(10), nullable=False)  # "flat" or "slab"
     range_min_value = Column(Integer, nullable=True)  # applicable for slab
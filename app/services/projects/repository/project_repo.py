@@ -1,169 +1,795 @@
-from app.services.projects.models.project_models import Project, ProjectUnit, ProjectMedia, ProjectCommission
-from app.services.projects.models.other_models import ProjectAmenity, ParkingCharge, NearbyLandmark
+from app.services.projects.models.project_models import Project, ProjectUnit, ProjectMedia, ProjectCommission, \
+    ProjectListingSummary
+from app.services.projects.models.other_models import ProjectAmenity, ParkingCharge, NearbyLandmark, Amenity
 from app.services.projects.models.payment_plan_models import PaymentPlan, PaymentPlanBreakup, AdditionalCharge
-from app.services.geolocation.models.geolocation_models import Area, City, State
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_, func, desc, asc, extract
-from app.services.projects.schemas.project_schemas import ProjectListFilters
-from sqlalchemy.orm import selectinload, joinedload
-from app.services.geolocation.models.geolocation_models import Locality
-from uuid import UUID
+from sqlalchemy import select, or_, and_, func, extract, tuple_, union, union_all, case, literal, cast, true, Float, Integer, String, \
+    any_, bindparam
+from app.services.projects.schemas.project_schemas import ProjectListFilters, FullProjectResponse, ProjectDetailResponse
+from app.services.projects.schemas.enums import AreaUnit, SQFT_PER_AREA_UNIT
+from sqlalchemy.dialects.postgresql import insert, ARRAY as PG_ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import contains_eager, noload
+from app.db.loaders import loader_options
+from app.services.geolocation.models.geolocation_models import Country, State, City, Area, Locality
+from app.services.projects.search import project_search_index, ProjectFacetDocument, COUNTED_FACETS, UNIT_FACETS, \
+    UnitCatalogRow
+from app.utils.cursor_utils import encode_cursor, decode_cursor
+from app.utils.cache_utils import TTLCache, canonical_key
+from app.utils.metrics import registry
+from app.config import config
+import json
+import math
+from typing import Optional
+from uuid import UUID, uuid4
+from pydantic import AnyUrl
+
+
+def _row(model, **extra) -> dict:
+    # column values of a create schema; urls are stored as text
+    row = {k: str(v) if isinstance(v, AnyUrl) else v for k, v in model.dict().items()}
+    row.update(extra)
+    return row
+
+
+def _sqft(value, area_unit) -> Optional[float]:
+    # None when the value is missing or the unit isn't an AreaUnit
+    unit = getattr(area_unit, "value", area_unit) or AreaUnit.SQFT.value
+    factor = SQFT_PER_AREA_UNIT.get(unit.lower())
+    return value * factor if value is not None and factor else None
+
+
+def _project_row(project, **extra) -> dict:
+    return _row(project, project_size_sqft=_sqft(project.project_size, project.project_size_unit), **extra)
+
+
+def _unit_row(unit, **extra) -> dict:
+    super_area_sqft = _sqft(unit.super_area_value, unit.area_unit)
+    return _row(
+        unit,
+        super_area_sqft=super_area_sqft,
+        carpet_area_sqft=_sqft(unit.carpet_area_value, unit.area_unit),
+        price_per_sqft=unit.base_price / super_area_sqft if super_area_sqft else None,
+        **extra,
+    )
 
 
-async def get_project_by_name_and_developer(name: str, developer_id: UUID, db: AsyncSession):
+async def find_existing_project_keys(keys, db: AsyncSession):
+    """
+    The (developer_id, name) pairs among `keys` that already have a project.
+    """
+    if not keys:
+        return set()
     result = await db.execute(
-        select(Project).where(Project.name == name, Project.developer_id == developer_id)
+        select(Project.developer_id, Project.name).where(tuple_(Project.developer_id, Project.name).in_(list(keys)))
+    )
+    return {tuple(row) for row in result.all()}
+
+
+CHILD_MODELS = (
+    ProjectUnit, ProjectMedia, ProjectAmenity, NearbyLandmark, ParkingCharge,
+    ProjectCommission, AdditionalCharge, PaymentPlan, PaymentPlanBreakup,
+)
+
+
+def _add_child_rows(rows, project_id, payload):
+    rows[ProjectUnit].extend(_unit_row(unit, project_id=project_id) for unit in payload.units or [])
+    rows[ProjectMedia].extend(_row(media, project_id=project_id) for media in payload.media or [])
+    rows[ProjectAmenity].extend(_row(amenity, project_id=project_id) for amenity in payload.amenities)
+    rows[NearbyLandmark].extend(_row(nl, project_id=project_id) for nl in payload.nearby_landmarks)
+    rows[ParkingCharge].append(_row(payload.parking, project_id=project_id))
+    rows[ProjectCommission].append(_row(payload.commission, project_id=project_id))
+    rows[AdditionalCharge].append(_row(payload.additional_charges, project_id=project_id))
+
+    # the plan id is generated here so its breakups need no RETURNING
+    payment_plan_id = uuid4()
+    rows[PaymentPlan].append({
+        "id": payment_plan_id,
+        "project_id": project_id,
+        "plan_name": payload.payment.plan_name,
+        "description": payload.payment.description,
+    })
+    rows[PaymentPlanBreakup].extend(
+        _row(breakup, payment_plan_id=payment_plan_id) for breakup in payload.payment.breakup_create or []
     )
-    return result.scalar_one_or_none()
-
-
-async def create_project(data: dict, db: AsyncSession) -> Project:
-    project = Project(**data)
-    db.add(project)
-    await db.flush()  # Keep project.id available
-    return project
-
-
-async def create_project_units(project_id, units_data, db: AsyncSession):
-    for unit in units_data:
-        db.add(ProjectUnit(project_id=project_id, **unit.dict()))
-    await db.flush()
-
-
-async def create_project_media(project_id, media_data, db: AsyncSession):
-    for media in media_data:
-        db.add(ProjectMedia(project_id=project_id, **media.dict()))
-    await db.flush()
 
 
-async def create_project_amenities(project_id, amenities, db: AsyncSession):
-    for amenity in amenities:
-        db.add(ProjectAmenity(project_id=project_id, **amenity.dict()))
+async def _insert_rows(rows, db: AsyncSession):
+    # one multi-row INSERT per table, parents first (rows keeps insertion order)
+    for model, model_rows in rows.items():
+        if model_rows:
+            await db.execute(insert(model), model_rows)
 
 
-async def create_project_payment(project_id, payment, db: AsyncSession):
-    payment_plan= PaymentPlan(project_id=project_id, plan_name=payment.plan_name, description=payment.description)
-    db.add(payment_plan)
-    await db.flush()
-    payment_plan_id = payment_plan.id
-    for breakup in payment.breakup_create:
-        db.add(PaymentPlanBreakup(payment_plan_id=payment_plan_id, **breakup.dict()))
+async def create_project(project, db: AsyncSession) -> Optional[Project]:
+    """
+    Inserts the project row, or returns None when the developer already has a
+    project with this name. The unique constraint decides, so there is no
+    separate lookup and no race between check and insert.
+    """
+    stmt = insert(Project).values(**_project_row(project)).on_conflict_do_nothing(
+        constraint="uq_projects_developer_id_name"
+    ).returning(Project)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
 
 
-async def create_project_additional_charges(project_id, charges, db: AsyncSession):
-    db.add(AdditionalCharge(project_id=project_id, **charges.dict()))
+async def create_project_children(project_id, payload, db: AsyncSession):
+    """
+    Inserts everything of a ProjectCreateRequest below the project row.
+    """
+    rows = {model: [] for model in CHILD_MODELS}
+    _add_child_rows(rows, project_id, payload)
+    await _insert_rows(rows, db)
+
+
+async def bulk_create_projects(payloads, db: AsyncSession):
+    """
+    Inserts whole ProjectCreateRequest payloads with one multi-row INSERT per
+    table. Ids are generated up front so child rows need no RETURNING round
+    trip. Returns the new project ids in payload order.
+    """
+    project_ids = [uuid4() for _ in payloads]
+    rows = {model: [] for model in (Project,) + CHILD_MODELS}
+    for project_id, payload in zip(project_ids, payloads):
+        rows[Project].append(_project_row(payload.project, id=project_id))
+        _add_child_rows(rows, project_id, payload)
+    await _insert_rows(rows, db)
+    return project_ids
+
+
+# projects the listing, its facets, the indexes and the export show
+LISTED_PROJECT = and_(Project.is_active.is_(True), Project.is_deleted.is_not(True))
+# units that count towards a project's listing: summary, facets, unit filters and the unit catalog
+LISTED_UNIT = and_(ProjectUnit.is_active.is_(True), ProjectUnit.is_deleted.is_not(True))
+
+
+def listing_summary_select(project_ids=None):
+    query = select(
+        Project.id,
+        func.min(ProjectUnit.base_price),
+        func.max(ProjectUnit.base_price),
+        func.min(ProjectUnit.super_area_sqft),
+        func.max(ProjectUnit.super_area_sqft),
+        func.min(ProjectUnit.price_per_sqft),
+        func.max(ProjectUnit.price_per_sqft),
+        func.array_remove(func.array_agg(ProjectUnit.unit_type.distinct()), None),
+        func.count(ProjectUnit.id),
+    ).outerjoin(ProjectUnit, and_(ProjectUnit.project_id == Project.id, LISTED_UNIT)).group_by(Project.id)
+    if project_ids is not None:
+        query = query.where(Project.id.in_(project_ids))
+    return query
+
+
+async def refresh_project_listing_summary(project_ids, db: AsyncSession):
+    """
+    Recomputes project_listing_summary rows for the given projects from their
+    active, non-deleted units. Must run after unit changes are flushed.
+    """
+    stmt = insert(ProjectListingSummary).from_select(
+        [
+            "project_id", "starting_price", "max_price", "min_super_area", "max_super_area",
+            "min_price_per_sqft", "max_price_per_sqft", "configuration", "total_units",
+        ],
+        listing_summary_select(project_ids),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ProjectListingSummary.project_id],
+        set_={
+            "starting_price": stmt.excluded.starting_price,
+            "max_price": stmt.excluded.max_price,
+            "min_super_area": stmt.excluded.min_super_area,
+            "max_super_area": stmt.excluded.max_super_area,
+            "min_price_per_sqft": stmt.excluded.min_price_per_sqft,
+            "max_price_per_sqft": stmt.excluded.max_price_per_sqft,
+            "configuration": stmt.excluded.configuration,
+            "total_units": stmt.excluded.total_units,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+# filtered totals, keyed by the normalized filter set
+project_count_cache = TTLCache(maxsize=2048, ttl=config.PROJECT_COUNT_CACHE_TTL_SECONDS)
+# fetch_projects statements by filter shape; they never go stale
+listing_statement_cache = TTLCache(maxsize=config.PROJECT_STATEMENT_CACHE_SIZE, ttl=math.inf)
+listing_statement_lookups = registry.counter(
+    "project_listing_statement_cache_lookups", "fetch_projects statement cache lookups, by result.", ["result"]
+)
+# fields that don't change which projects match
+NON_FILTER_FIELDS = {"page", "limit", "cursor", "sort_by", "sort_order", "count_mode"}
+
+SORT_COLUMNS = {
+    "created_at": Project.created_at,
+    "updated_at": Project.updated_at,
+    # code point order, which the facet index reproduces; the database
+    # collation's order depends on the server's locale
+    "name": Project.name.collate("C"),
+    "possession_date": Project.possession_date,
+    "starting_price": ProjectListingSummary.starting_price,
+    # smallest unit of the project
+    "super_area": ProjectListingSummary.min_super_area,
+    "price_per_sqft": ProjectListingSummary.min_price_per_sqft,
+}
+NULLABLE_SORT_KEYS = {"possession_date", "starting_price", "super_area", "price_per_sqft"}
+
+
+def resolve_sort_key(filters: ProjectListFilters) -> str:
+    if filters.search and filters.sort_by in (None, "relevance"):
+        return "relevance"
+    return filters.sort_by if filters.sort_by in SORT_COLUMNS else "created_at"
+
+
+def resolve_sort_column(sort_key: str, filters: ProjectListFilters, bind=None):
+    if sort_key == "relevance":
+        return search_relevance(filters.search, bind)
+    return SORT_COLUMNS[sort_key]
+
+
+async def load_project_search_index(db: AsyncSession, project_ids=None):
+    """
+    (Re)indexes projects in the in-process search index. Only used by the
+    "memory" search backend.
+    """
+    query = select(Project.id, Project.name, Locality.name).join(Project.locality)
+    if project_ids is not None:
+        query = query.where(Project.id.in_(project_ids))
+    else:
+        project_search_index.clear()
+    result = await db.execute(query)
+    for project_id, name, locality_name in result.all():
+        project_search_index.add(project_id, (name, locality_name))
+
+
+def search_condition(params: dict, bind):
+    if "search_ids" in params:
+        return Project.id == any_(bind("search_ids", PG_ARRAY(PG_UUID(as_uuid=True))))
+
+    # Each branch is answered by a pg_trgm GIN index on lower(name).
+    pattern = bind("search_pattern", String)
+    return Project.id.in_(
+        union(
+            select(Project.id).where(func.lower(Project.name).like(pattern)),
+            select(Project.id).join(Project.locality).where(func.lower(Locality.name).like(pattern)),
+        )
+    )
 
 
-async def create_project_commission(project_id, commission, db: AsyncSession):
-    db.add(ProjectCommission(project_id=project_id, **commission.dict()))
+def search_relevance(search: str, bind=None):
+    if config.PROJECT_SEARCH_BACKEND == "memory":
+        scores = dict(project_search_index.search(search))
+        return case(scores, value=Project.id, else_=0.0) if scores else literal(0.0, Float)
 
+    term = bind("search_term", String) if bind else search.lower()
+    return func.greatest(
+        func.word_similarity(term, func.lower(Project.name)),
+        func.word_similarity(term, func.lower(Locality.name)),
+        type_=Float,
+    )
 
-async def create_project_parking(project_id, parking, db: AsyncSession):
-    db.add(ParkingCharge(project_id=project_id, **parking.dict()))
 
+def _order_by(sort_key: str, sort_column, descending: bool):
+    ordering = [sort_column.desc() if descending else sort_column.asc(),
+                Project.id.desc() if descending else Project.id.asc()]
+    if sort_key in NULLABLE_SORT_KEYS:
+        ordering[0] = ordering[0].nulls_last()
+    return ordering
 
-async def create_project_nearby_landmarks(project_id, landmarks, db: AsyncSession):
-    for nl in landmarks:
-        db.add(NearbyLandmark(project_id=project_id, **nl.dict()))
 
+def _seek_condition(sort_key: str, sort_column, value, last_id, descending: bool):
+    """
+    Rows strictly after (value, last_id) in the listing order, `value` being
+    None for rows without a sort value. For non-null sort keys this is a
+    plain row comparison, which Postgres resolves with a single index range
+    scan on (sort column, id).
+    """
+    if value is None:
+        id_condition = Project.id < last_id if descending else Project.id > last_id
+        return and_(sort_column.is_(None), id_condition)
 
-async def fetch_projects(session: AsyncSession, filters: ProjectListFilters):
-    query = select(Project).join(Project.locality).options(
-        joinedload(Project.locality)
-        .joinedload(Locality.area)
-        .joinedload(Area.city)
-        .joinedload(City.state)
-        .joinedload(State.country),
-        selectinload(Project.units),
-        selectinload(Project.media),
-        selectinload(Project.nearby_landmarks),
-        selectinload(Project.additional_charges),
-        selectinload(Project.parking),
-        selectinload(Project.payment_plan),
-        selectinload(Project.commissions),
-        selectinload(Project.amenities).joinedload(ProjectAmenity.amenity)
-    )
+    if descending:
+        condition = tuple_(sort_column, Project.id) < tuple_(value, last_id)
+    else:
+        condition = tuple_(sort_column, Project.id) > tuple_(value, last_id)
+    if sort_key in NULLABLE_SORT_KEYS:
+        condition = or_(condition, sort_column.is_(None))
+    return condition
+
+
+def project_filter_params(filters: ProjectListFilters) -> dict:
+    """
+    Bind values of the filters that are set, by parameter name. The set of
+    names is the filter shape: it alone decides the SQL of the filtered query.
+    """
+    params = {}
+    if filters.search:
+        if config.PROJECT_SEARCH_BACKEND == "memory":
+            params["search_ids"] = [project_id for project_id, _ in project_search_index.search(filters.search)]
+        else:
+            params["search_pattern"] = f"%{filters.search.lower()}%"
+    for name in ("development_stage", "project_type", "property_type", "locality_id", "developer_id",
+                 "min_price", "max_price"):
+        if getattr(filters, name):
+            params[name] = getattr(filters, name)
+    if filters.possession_date:
+        params["possession_year"] = filters.possession_date
+    if filters.is_featured is not None:
+        params["is_featured"] = filters.is_featured
+    if filters.unit_type:
+        params["unit_types"] = [t.value for t in filters.unit_type]
+    for name in ("bedrooms", "balconies"):
+        if getattr(filters, name):
+            params[name] = [int(value) for value in getattr(filters, name)]
+    for name in ("min_area", "max_area", "min_price_per_sqft", "max_price_per_sqft"):
+        if getattr(filters, name) is not None:
+            params[name] = getattr(filters, name)
+    for i, badge in enumerate(filters.badges or ()):
+        params[f"badge_{i}"] = badge
+    return params
+
+
+def _value_binds(params: dict):
+    # binds carrying their values, anonymized like plain literals would be
+    return lambda name, type_=None: bindparam(name, params[name], type_=type_, unique=True)
+
+
+def _named_binds(name, type_=None):
+    # value-less binds for statements cached by shape, filled at execution
+    return bindparam(name, type_=type_)
+
+
+def apply_project_filters(query, filters: ProjectListFilters, params: Optional[dict] = None, bind=None):
+    """
+    Adds the filter conditions to `query`. Values are bound through `bind`
+    (name, type) -> bindparam, by default binds carrying the values of
+    `params` (project_filter_params(filters) when not given).
+    """
+    if params is None:
+        params = project_filter_params(filters)
+    if bind is None:
+        bind = _value_binds(params)
+    query = query.where(LISTED_PROJECT)
 
     # Text search
-    if filters.search:
-        pattern = f"%{filters.search.lower()}%"
-        query = query.where(
-            or_(
-                func.lower(Project.name).like(pattern),
-                func.lower(Locality.name).like(pattern)
-            )
-        )
+    if "search_ids" in params or "search_pattern" in params:
+        query = query.where(search_condition(params, bind))
 
+    # Lists travel as one array parameter each, so the SQL doesn't depend on their length
     unit_subquery = select(ProjectUnit.project_id).where(
         and_(
-            ProjectUnit.unit_type.in_(filters.unit_type) if filters.unit_type else True,
-            ProjectUnit.bedrooms.in_(filters.bedrooms) if filters.bedrooms else True,
-            ProjectUnit.balconies.in_(filters.balconies) if filters.balconies else True,
-            ProjectUnit.base_price >= filters.min_price if filters.min_price else True,
-            ProjectUnit.base_price <= filters.max_price if filters.max_price else True,
+            LISTED_UNIT,
+            ProjectUnit.unit_type == any_(bind("unit_types", PG_ARRAY(String))) if "unit_types" in params else True,
+            ProjectUnit.bedrooms == any_(bind("bedrooms", PG_ARRAY(Integer))) if "bedrooms" in params else True,
+            ProjectUnit.balconies == any_(bind("balconies", PG_ARRAY(Integer))) if "balconies" in params else True,
+            ProjectUnit.base_price >= bind("min_price") if "min_price" in params else True,
+            ProjectUnit.base_price <= bind("max_price") if "max_price" in params else True,
         )
     ).distinct()
 
     # Filters
-    if filters.development_stage:
-        query = query.where(Project.development_stage == filters.development_stage)
-    if filters.project_type:
-        query = query.where(Project.project_type == filters.project_type)
-    if filters.property_type:
-        query = query.where(Project.property_type == filters.property_type)
-    if filters.possession_date:
-        query = query.where(extract("year", Project.possession_date) == filters.possession_date)
-    if filters.locality_id:
-        query = query.where(Project.locality_id == filters.locality_id)
-    if filters.developer_id:
-        query = query.where(Project.developer_id == filters.developer_id)
-    if filters.is_featured is not None:
-        query = query.where(Project.is_featured == filters.is_featured)
-    if filters.unit_type or filters.bedrooms or filters.balconies or filters.min_price or filters.max_price:
+    for name in ("development_stage", "project_type", "property_type", "locality_id", "developer_id", "is_featured"):
+        if name in params:
+            query = query.where(getattr(Project, name) == bind(name))
+    if "possession_year" in params:
+        query = query.where(extract("year", Project.possession_date) == bind("possession_year", Integer))
+    if params.keys() & {"bedrooms", "balconies", "min_price", "max_price"}:
         query = query.where(Project.id.in_(unit_subquery))
-    if filters.badges:
-        for badge in filters.badges:
-            query = query.where(badge == func.any(Project.badges))
-
-    # Sorting
-    sort_column = getattr(Project, filters.sort_by, Project.created_at)
-    if filters.sort_order == "asc":
-        query = query.order_by(asc(sort_column))
+    elif "unit_types" in params:
+        # same match as the unit subquery, answered from the summary's GIN index
+        query = query.where(ProjectListingSummary.configuration.overlap(bind("unit_types", PG_ARRAY(String))))
+    if "min_area" in params:
+        query = query.where(ProjectListingSummary.max_super_area >= bind("min_area"))
+    if "max_area" in params:
+        query = query.where(ProjectListingSummary.min_super_area <= bind("max_area"))
+    if "min_price_per_sqft" in params:
+        query = query.where(ProjectListingSummary.max_price_per_sqft >= bind("min_price_per_sqft"))
+    if "max_price_per_sqft" in params:
+        query = query.where(ProjectListingSummary.min_price_per_sqft <= bind("max_price_per_sqft"))
+    for name in params:
+        if name.startswith("badge_"):
+            query = query.where(bind(name, String) == func.any(Project.badges))
+
+    return query
+
+
+# locality and full_address come from the in-memory geo hierarchy, amenity
+# fields are derived in the service from amenities.amenity
+GEO_FIELDS = ("locality",)
+
+
+def _listing_options():
+    return loader_options(Project, FullProjectResponse, exclude=GEO_FIELDS) + (
+        contains_eager(Project.listing_summary),
+        noload(Project.locality),
+    )
+
+
+def _detail_options():
+    return loader_options(
+        Project, ProjectDetailResponse, include=("amenities.amenity", "listing_summary"), exclude=GEO_FIELDS
+    ) + (noload(Project.locality),)
+
+
+def _count_query(filters: ProjectListFilters):
+    query = select(Project.id).outerjoin(ProjectListingSummary, ProjectListingSummary.project_id == Project.id)
+    return apply_project_filters(query, filters)
+
+
+async def estimate_project_count(session: AsyncSession, filters: ProjectListFilters) -> int:
+    """
+    The planner's row estimate for the filtered listing. Far cheaper than an
+    exact count on large result sets, at the cost of accuracy.
+    """
+    connection = await session.connection()
+    compiled = _count_query(filters).compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_projects(session: AsyncSession, filters: ProjectListFilters) -> int:
+    query = select(func.count()).select_from(_count_query(filters).subquery())
+    result = await session.execute(query)
+    return result.scalar()
+
+
+def _listing_statement(filters: ProjectListFilters, params: dict, sort_key: str, descending: bool,
+                       count_in_query: bool, bind):
+    sort_column = resolve_sort_column(sort_key, filters, bind)
+    columns = [Project, sort_column.label("sort_value")]
+    if count_in_query:
+        columns.append(func.count().over().label("total_count"))
+
+    query = select(*columns).join(Project.locality).outerjoin(
+        ProjectListingSummary, ProjectListingSummary.project_id == Project.id
+    ).options(*_listing_options())
+    query = apply_project_filters(query, filters, params, bind)
+
+    # Sorting, with Project.id as a tiebreaker so the order is total
+    query = query.order_by(*_order_by(sort_key, sort_column, descending))
+
+    # Pagination: seek past the cursor when one is given, offset otherwise
+    if "cursor_id" in params:
+        value = bind("cursor_value", sort_column.type) if "cursor_value" in params else None
+        last_id = bind("cursor_id", PG_UUID(as_uuid=True))
+        query = query.where(_seek_condition(sort_key, sort_column, value, last_id, descending))
     else:
-        query = query.order_by(desc(sort_column))
+        query = query.offset(bind("offset", Integer))
+    return query.limit(bind("limit", Integer))
 
-    # Pagination
-    offset = (filters.page - 1) * filters.limit
-    query = query.offset(offset).limit(filters.limit)
 
-    results = await session.execute(query)
-    projects = results.scalars().all()
+async def fetch_projects(session: AsyncSession, filters: ProjectListFilters):
+    sort_key = resolve_sort_key(filters)
+    descending = filters.sort_order != "asc"
+    estimate = filters.count_mode == "estimate"
+    count_key = (canonical_key(filters, exclude=NON_FILTER_FIELDS), estimate)
+    total_count = project_count_cache.get(count_key)
+
+    # Without a cached total, count the filtered rows in the same round trip;
+    # the window runs over the full match set before LIMIT applies.
+    count_in_query = total_count is None and not estimate and not filters.cursor
+
+    params = project_filter_params(filters)
+    if sort_key == "relevance" and "search_pattern" in params:
+        params["search_term"] = filters.search.lower()
+    if filters.cursor:
+        sort_type = Float() if sort_key == "relevance" else SORT_COLUMNS[sort_key].type
+        value, params["cursor_id"] = decode_cursor(
+            filters.cursor, sort_key, filters.sort_order, sort_type.python_type
+        )
+        if value is not None:
+            params["cursor_value"] = value
+    else:
+        params["offset"] = (filters.page - 1) * filters.limit
+    params["limit"] = filters.limit
+
+    if sort_key == "relevance" and config.PROJECT_SEARCH_BACKEND == "memory":
+        # the in-memory scores are inlined into the ORDER BY
+        listing_statement_lookups.inc("uncacheable")
+        query = _listing_statement(filters, params, sort_key, descending, count_in_query, _value_binds(params))
+        results = await session.execute(query)
+    else:
+        # One statement per filter shape, so SQLAlchemy finds its compiled form
+        # without rebuilding or re-keying it, and the SQL text (hence asyncpg's
+        # prepared statement) is the same whatever the values.
+        shape = (sort_key, descending, count_in_query, tuple(sorted(params)))
+        query = listing_statement_cache.get(shape)
+        listing_statement_lookups.inc("miss" if query is None else "hit")
+        if query is None:
+            query = _listing_statement(filters, params, sort_key, descending, count_in_query, _named_binds)
+            listing_statement_cache.set(shape, query)
+        results = await session.execute(query, params)
+    rows = results.all()
+    projects = [row.Project for row in rows]
+
+    next_cursor = None
+    if len(rows) == filters.limit:
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_key, filters.sort_order, last.sort_value, last.Project.id)
 
     # Total count (for frontend pagination info)
-    count_query = select(func.count()).select_from(Project)
-    total_result = await session.execute(count_query)
-    total_count = total_result.scalar()
-
-    return projects, total_count
+    if total_count is None:
+        if count_in_query and rows:
+            total_count = rows[0].total_count
+        elif count_in_query and filters.page == 1:
+            total_count = 0
+        elif estimate:
+            total_count = await estimate_project_count(session, filters)
+        else:
+            total_count = await count_projects(session, filters)
+        project_count_cache.set(count_key, total_count)
+
+    return projects, total_count, next_cursor
+
+
+async def fetch_projects_by_ids(session: AsyncSession, project_ids):
+    """
+    Loads the listing shape for the given ids, returned in the same order.
+    """
+    if not project_ids:
+        return []
+    query = select(Project).outerjoin(
+        ProjectListingSummary, ProjectListingSummary.project_id == Project.id
+    ).where(Project.id.in_(project_ids)).options(*_listing_options())
+    results = await session.execute(query)
+    by_id = {p.id: p for p in results.scalars().all()}
+    return [by_id[project_id] for project_id in project_ids if project_id in by_id]
+
+
+async def stream_projects(session: AsyncSession, filters: ProjectListFilters, updated_since=None, batch_size=500):
+    """
+    Yields the listing shape of every project matching `filters`, updated at
+    or after `updated_since` when given, in batches of `batch_size`. One
+    query over a server-side cursor in (updated_at, id) order, so a consumer
+    can resume from the last updated_at it saw (rows sharing that timestamp
+    are sent again rather than skipped).
+    """
+    query = select(Project).outerjoin(
+        ProjectListingSummary, ProjectListingSummary.project_id == Project.id
+    ).options(*_listing_options())
+    query = apply_project_filters(query, filters)
+    if updated_since is not None:
+        query = query.where(Project.updated_at >= updated_since)
+    query = query.order_by(Project.updated_at.asc(), Project.id.asc()).execution_options(yield_per=batch_size)
+
+    result = await session.stream(query)
+    async for projects in result.scalars().partitions():
+        yield projects
+
+
+async def fetch_project_geo_rows(session: AsyncSession):
+    """
+    (project id, locality id, starting price) for every listed project.
+    """
+    result = await session.execute(
+        select(Project.id, Project.locality_id, ProjectListingSummary.starting_price).outerjoin(
+            ProjectListingSummary, ProjectListingSummary.project_id == Project.id
+        ).where(LISTED_PROJECT)
+    )
+    return result.all()
+
+
+async def filter_project_ids(session: AsyncSession, filters: ProjectListFilters, project_ids):
+    """
+    The subset of `project_ids` matching `filters`. The ids travel as a single
+    array parameter, so any number of candidates costs one bind.
+    """
+    if not project_ids:
+        return set()
+    ids = bindparam("project_ids", value=list(project_ids), type_=PG_ARRAY(PG_UUID(as_uuid=True)))
+    result = await session.execute(_count_query(filters).where(Project.id == any_(ids)))
+    return set(result.scalars().all())
+
+
+async def fetch_project_facet_documents(session: AsyncSession, updated_since=None):
+    """
+    Returns (documents, removed ids, watermark) for projects changed after
+    `updated_since`, or for all listed projects when it is None. A project
+    counts as changed when the project row or its listing summary (i.e. any
+    of its units) changed; changed projects that are no longer listed
+    (deactivated or deleted) come back as removed ids.
+    """
+    units = select(
+        ProjectUnit.project_id,
+        func.array_agg(ProjectUnit.unit_type.distinct()).label("unit_types"),
+        func.array_agg(ProjectUnit.bedrooms.distinct()).label("bedrooms"),
+        func.array_agg(ProjectUnit.balconies.distinct()).label("balconies"),
+    ).where(LISTED_UNIT).group_by(ProjectUnit.project_id).subquery()
+    changed_at = func.greatest(Project.updated_at, ProjectListingSummary.updated_at)
+
+    query = select(
+        Project.id, Project.development_stage, Project.project_type, Project.property_type,
+        Project.is_featured, Project.possession_date, Project.locality_id, Project.developer_id,
+        Project.badges, Project.name, Project.created_at, Project.updated_at,
+        LISTED_PROJECT.label("listed"), ProjectListingSummary.starting_price, ProjectListingSummary.min_super_area,
+        ProjectListingSummary.min_price_per_sqft, changed_at.label("changed_at"),
+        units.c.unit_types, units.c.bedrooms, units.c.balconies,
+    ).outerjoin(
+        ProjectListingSummary, ProjectListingSummary.project_id == Project.id
+    ).outerjoin(units, units.c.project_id == Project.id)
+    if updated_since is not None:
+        query = query.where(changed_at > updated_since)
+    else:
+        query = query.where(LISTED_PROJECT)
+
+    result = await session.execute(query)
+    documents = []
+    removed = []
+    watermark = updated_since
+    for row in result.all():
+        if row.changed_at and (watermark is None or row.changed_at > watermark):
+            watermark = row.changed_at
+        if not row.listed:
+            removed.append(row.id)
+            continue
+        documents.append(ProjectFacetDocument(
+            id=row.id,
+            facets={
+                "development_stage": {row.development_stage},
+                "project_type": {row.project_type},
+                "property_type": {row.property_type},
+                "is_featured": {bool(row.is_featured)},
+                "possession_year": {row.possession_date.year if row.possession_date else None},
+                "locality_id": {row.locality_id},
+                "developer_id": {row.developer_id},
+                "badges": set(row.badges or []),
+                "unit_type": set(row.unit_types or []),
+                "bedrooms": set(row.bedrooms or []),
+                "balconies": set(row.balconies or []),
+            },
+            sort_values={
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                "name": row.name,
+                "possession_date": row.possession_date,
+                "starting_price": row.starting_price,
+                "super_area": row.min_super_area,
+                "price_per_sqft": row.min_price_per_sqft,
+            },
+        ))
+    return documents, removed, watermark
+
+
+async def fetch_unit_catalog_rows(session: AsyncSession, updated_since=None):
+    """
+    Returns (rows, watermark) for the units changed after `updated_since`, or
+    for every unit when it is None. Inactive and deleted units are included so
+    an incremental refresh can retire them.
+    """
+    query = select(
+        ProjectUnit.id, ProjectUnit.project_id, ProjectUnit.unit_type, ProjectUnit.bedrooms,
+        ProjectUnit.balconies, ProjectUnit.base_price, ProjectUnit.total_price,
+        ProjectUnit.super_area_sqft, ProjectUnit.carpet_area_sqft, ProjectUnit.price_per_sqft,
+        ProjectUnit.is_active, ProjectUnit.is_deleted, ProjectUnit.updated_at,
+    )
+    if updated_since is not None:
+        query = query.where(ProjectUnit.updated_at > updated_since)
+
+    result = await session.execute(query)
+    rows = []
+    watermark = updated_since
+    for row in result.all():
+        rows.append(UnitCatalogRow(*row[:-1]))
+        if row.updated_at and (watermark is None or row.updated_at > watermark):
+            watermark = row.updated_at
+    return rows, watermark
+
+
+def _facet_count_query(facet: str, filters: ProjectListFilters):
+    # counted against every filter except the facet's own selection
+    filters = filters.model_copy(update={COUNTED_FACETS[facet]: None})
+
+    if facet in UNIT_FACETS:
+        value = cast(getattr(ProjectUnit, facet), String)
+        # only the units the listing's unit filters consider
+        query = select(Project).join(ProjectUnit, and_(ProjectUnit.project_id == Project.id, LISTED_UNIT))
+    elif facet == "badges":
+        badge = func.unnest(Project.badges).table_valued("value").render_derived().lateral("badge")
+        value = badge.c.value
+        query = select(Project).join(badge, true())
+    elif facet == "possession_year":
+        value = cast(cast(extract("year", Project.possession_date), Integer), String)
+        query = select(Project)
+    else:
+        value = cast(getattr(Project, facet), String)
+        query = select(Project)
+
+    query = query.outerjoin(ProjectListingSummary, ProjectListingSummary.project_id == Project.id)
+    query = apply_project_filters(query, filters).where(value.is_not(None))
+    return query.with_only_columns(
+        literal(facet).label("facet"), value.label("value"), func.count(Project.id.distinct()).label("count"),
+        maintain_column_froms=True,
+    ).group_by(value)
+
+
+def _parse_facet_value(facet: str, value: str):
+    if facet in ("bedrooms", "balconies", "possession_year"):
+        return int(value)
+    if facet == "is_featured":
+        return value == "true"
+    return value
+
+
+async def fetch_facet_counts(session: AsyncSession, filters: ProjectListFilters):
+    """
+    SQL counterpart of ProjectFacetIndex.facet_counts: the total and every
+    facet's counts come back from a single UNION ALL statement.
+    """
+    total_query = apply_project_filters(
+        select(Project).outerjoin(ProjectListingSummary, ProjectListingSummary.project_id == Project.id),
+        filters,
+    ).with_only_columns(
+        literal("_total").label("facet"), cast(None, String).label("value"),
+        func.count(Project.id.distinct()).label("count"),
+        maintain_column_froms=True,
+    )
+    query = union_all(total_query, *(_facet_count_query(facet, filters) for facet in COUNTED_FACETS))
+    result = await session.execute(query)
+
+    total = 0
+    counts = {facet: {} for facet in COUNTED_FACETS}
+    for facet, value, count in result.all():
+        if facet == "_total":
+            total = count
+        else:
+            counts[facet][_parse_facet_value(facet, value)] = count
+    return total, counts
+
+
+# rows that end up in ProjectDetailResponse, with how each reaches the project
+DETAIL_VERSION_SOURCES = (
+    (ProjectUnit, lambda q: q.where(ProjectUnit.project_id == Project.id)),
+    (ProjectMedia, lambda q: q.where(ProjectMedia.project_id == Project.id)),
+    (NearbyLandmark, lambda q: q.where(NearbyLandmark.project_id == Project.id)),
+    (AdditionalCharge, lambda q: q.where(AdditionalCharge.project_id == Project.id)),
+    (ParkingCharge, lambda q: q.where(ParkingCharge.project_id == Project.id)),
+    (ProjectCommission, lambda q: q.where(ProjectCommission.project_id == Project.id)),
+    (ProjectAmenity, lambda q: q.where(ProjectAmenity.project_id == Project.id)),
+    (PaymentPlan, lambda q: q.where(PaymentPlan.project_id == Project.id)),
+    (PaymentPlanBreakup, lambda q: q.join(PaymentPlan, PaymentPlan.id == PaymentPlanBreakup.payment_plan_id)
+        .where(PaymentPlan.project_id == Project.id)),
+    (Amenity, lambda q: q.join(ProjectAmenity, ProjectAmenity.amenity_id == Amenity.id)
+        .where(ProjectAmenity.project_id == Project.id)),
+)
+
+
+async def get_project_version(session: AsyncSession, project_id: UUID):
+    """
+    Project.updated_at and locality_id, the updated_at of every level of the
+    locality's address, then the latest change and the row count of every
+    child table the detail serializes, in one statement that touches only
+    primary keys and the project_id indexes. None when the project doesn't
+    exist.
+    """
+    columns = [Project.updated_at, Project.locality_id]
+    columns += [model.updated_at for model in (Locality, Area, City, State, Country)]
+    for model, scope in DETAIL_VERSION_SOURCES:
+        changed_at = func.coalesce(model.updated_at, model.created_at)
+        columns.append(scope(select(func.max(changed_at))).scalar_subquery())
+        # counts catch deletions, which leave no timestamp behind
+        columns.append(scope(select(func.count(model.id))).scalar_subquery())
+
+    query = (
+        select(*columns)
+        .outerjoin(Locality, Locality.id == Project.locality_id)
+        .outerjoin(Area, Area.id == Locality.area_id)
+        .outerjoin(City, City.id == Area.city_id)
+        .outerjoin(State, State.id == City.state_id)
+        .outerjoin(Country, Country.id == State.country_id)
+        .where(Project.id == project_id)
+    )
+    result = await session.execute(query)
+    return result.first()
 
 
 async def get_project_detail_id(session: AsyncSession, project_id: UUID):
 
-    query = select(Project).join(Project.locality).where(Project.id == project_id).options(
-        joinedload(Project.locality)
-        .joinedload(Locality.area)
-        .joinedload(Area.city)
-        .joinedload(City.state)
-        .joinedload(State.country),
-        selectinload(Project.units),
-        selectinload(Project.media),
-        selectinload(Project.nearby_landmarks),
-        selectinload(Project.additional_charges),
-        selectinload(Project.parking),
-        selectinload(Project.payment_plan).joinedload(PaymentPlan.breakups),
-        selectinload(Project.commissions),
-        selectinload(Project.amenities).joinedload(ProjectAmenity.amenity)
-    )
+    query = select(Project).where(Project.id == project_id).options(*_detail_options())
 
     response = await session.execute(query)
     project_detail = response.scalars().first()
@@ -22,6 +22,14 @@ class AreaUnit(str, Enum):
     ACRES = "acres"
 
 
+# square feet per AreaUnit, for the normalized *_sqft columns
+SQFT_PER_AREA_UNIT: Dict[AreaUnit, float] = {
+    AreaUnit.SQFT: 1.0,
+    AreaUnit.SQM: 10.7639,
+    AreaUnit.ACRES: 43560.0,
+}
+
+
 class MediaType(str, Enum):
     IMAGE = "image"
     VIDEO = "video"
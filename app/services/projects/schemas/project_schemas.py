@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl, Field, model_validator, field_validator
-from typing import Optional, Text, List, Dict, Set
+from typing import Optional, Text, List, Dict, Set, Union, Literal
 from uuid import UUID
 from datetime import date, datetime
 from .enums import *
@@ -205,6 +205,10 @@ class ProjectListFilters(BaseModel):
     developer_id: Optional[UUID] = None
     min_price: Optional[float] = None
     max_price: Optional[float] = None
+    min_area: Optional[float] = None  # super area, sqft
+    max_area: Optional[float] = None
+    min_price_per_sqft: Optional[float] = None
+    max_price_per_sqft: Optional[float] = None
     project_type: Optional[ProjectType] = None
     property_type: Optional[PropertyType] = None
     unit_type: Optional[List[UnitType]] = Query(default=None)
@@ -213,10 +217,41 @@ class ProjectListFilters(BaseModel):
     is_featured: Optional[bool] = None
     badges: Optional[List[str]] = None
     possession_date: Optional[int] = None
-    sort_by: Optional[str] = "created_at"  # created_at, starting_price
+    # created_at, updated_at, name, possession_date, starting_price, super_area,
+    # price_per_sqft, relevance; defaults to relevance when searching and created_at otherwise
+    sort_by: Optional[str] = None
     sort_order: Optional[str] = "desc"  # asc or desc
     page: int = Field(default=1, ge=1)
     limit: int = Field(default=10, ge=1, le=100)
+    cursor: Optional[str] = None  # next_cursor from the previous page, takes precedence over page
+    count_mode: Literal["exact", "estimate"] = "exact"  # estimate uses the planner's row estimate
+
+
+class ProjectExportFilters(ProjectListFilters):
+    # only projects updated at or after this; page, limit, cursor and sorting don't
+    # apply, the export runs in (updated_at, id) order
+    updated_since: Optional[datetime] = None
+
+
+class ProjectGeoFilters(ProjectListFilters):
+    # a point with radius_km, or a bounding box; results are sorted by distance
+    # from the point (the box's center when only a box is given)
+    lat: Optional[float] = Field(default=None, ge=-90, le=90)
+    lon: Optional[float] = Field(default=None, ge=-180, le=180)
+    radius_km: float = Field(default=5, gt=0, le=100)
+    min_lat: Optional[float] = Field(default=None, ge=-90, le=90)
+    min_lon: Optional[float] = Field(default=None, ge=-180, le=180)
+    max_lat: Optional[float] = Field(default=None, ge=-90, le=90)
+    max_lon: Optional[float] = Field(default=None, ge=-180, le=180)
+
+
+class ProjectClusterFilters(ProjectListFilters):
+    # viewport, clustered per web mercator tile at `zoom`
+    min_lat: float = Field(ge=-90, le=90)
+    min_lon: float = Field(ge=-180, le=180)
+    max_lat: float = Field(ge=-90, le=90)
+    max_lon: float = Field(ge=-180, le=180)
+    zoom: int = Field(ge=0, le=20)
 
 
 class ProjectMediaResponse(BaseModel):
@@ -240,6 +275,9 @@ class ProjectUnitResponse(BaseModel):
     carpet_area_value: float
     super_area_value: float
     area_unit: AreaUnit
+    super_area_sqft: Optional[float] = None
+    carpet_area_sqft: Optional[float] = None
+    price_per_sqft: Optional[float] = None
     bedrooms: Optional[int]
     balconies: Optional[int]
     total_units: int
@@ -329,7 +367,8 @@ class ProjectDetailResponse(BaseModel):
     configuration: Optional[Set[str]] = Set
     project_size: Optional[float] = 0
     project_size_unit: Optional[str]
-    unit_size_range: Optional[List[int]] = []
+    project_size_sqft: Optional[float] = None
+    unit_size_range: Optional[List[int]] = []  # sqft
     possession_date: Optional[date]
     starting_price: Optional[float]
     total_units: Optional[int] = 0
@@ -393,4 +432,59 @@ class PaginatedProjectListResponse(BaseModel):
     total: int
     page: int
     limit: int
+    next_cursor: Optional[str] = None
     projects: List[FullProjectResponse]
+
+
+class FacetValueCount(BaseModel):
+    value: Union[bool, int, str]
+    count: int
+
+
+class ProjectFacetCountsResponse(BaseModel):
+    total: int
+    facets: Dict[str, List[FacetValueCount]]
+
+
+class NearbyProjectResponse(FullProjectResponse):
+    distance_km: float
+
+
+class ProjectExportResponse(FullProjectResponse):
+    updated_at: Optional[datetime]
+
+
+class PaginatedNearbyProjectResponse(BaseModel):
+    total: int
+    page: int
+    limit: int
+    projects: List[NearbyProjectResponse]
+
+
+class MapClusterResponse(BaseModel):
+    lat: float
+    lon: float
+    count: int
+    min_starting_price: Optional[float] = None
+    project_id: Optional[UUID] = None  # set when the cluster is a single project
+
+
+class MapClustersResponse(BaseModel):
+    zoom: int
+    clusters: List[MapClusterResponse]
+
+
+class ProjectImportError(BaseModel):
+    line: int
+    name: Optional[str] = None
+    # where the row failed: validation, insert, or summary/commit of its batch (nothing of the batch was imported)
+    stage: Literal["validation", "insert", "summary", "commit"]
+    error: str
+
+
+class ProjectImportResponse(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[ProjectImportError] = []
+    errors_truncated: bool = False  # only the first errors are listed
@@ -0,0 +1,16 @@
+from .ngram_index import NgramIndex
+from .facet_index import ProjectFacetIndex, ProjectFacetDocument, COUNTED_FACETS, UNIT_FACETS
+from .geo_index import ProjectGeoIndex, haversine_km, tile_bbox, tile_range
+from .unit_catalog import ProjectUnitCatalog, UnitCatalogRow, ProjectAggregates
+
+# per-worker index backing the "memory" project search backend
+project_search_index = NgramIndex()
+
+# per-worker bitmap index over listing facets
+project_facet_index = ProjectFacetIndex()
+
+# per-worker grid index over project (locality) coordinates
+project_geo_index = ProjectGeoIndex()
+
+# per-worker columnar snapshot of project units
+project_unit_catalog = ProjectUnitCatalog()
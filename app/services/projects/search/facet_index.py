@@ -0,0 +1,300 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+from bitarray import bitarray
+
+# project level facets hold one value per project, unit level facets the set of
+# values over the project's units
+PROJECT_FACETS = (
+    "development_stage", "project_type", "property_type", "is_featured",
+    "possession_year", "locality_id", "developer_id",
+)
+UNIT_FACETS = ("unit_type", "bedrooms", "balconies")
+FACETS = PROJECT_FACETS + UNIT_FACETS + ("badges",)
+
+# facets the listing UI shows counts for, with the ProjectListFilters field
+# holding each one's selection
+COUNTED_FACETS = {
+    "development_stage": "development_stage",
+    "project_type": "project_type",
+    "property_type": "property_type",
+    "unit_type": "unit_type",
+    "bedrooms": "bedrooms",
+    "balconies": "balconies",
+    "is_featured": "is_featured",
+    "badges": "badges",
+    "possession_year": "possession_date",
+}
+
+SORT_KEYS = ("created_at", "updated_at", "name", "possession_date", "starting_price", "super_area", "price_per_sqft")
+
+
+@dataclass
+class ProjectFacetDocument:
+    id: UUID
+    facets: Dict[str, Set[Any]]
+    sort_values: Dict[str, Any] = field(default_factory=dict)
+
+
+def normalize_facet_value(value):
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
+
+def _sort_key(value):
+    # None sorts after everything else; other values compare natively, which is
+    # how Postgres orders them (names under COLLATE "C", i.e. by code point)
+    if value is None:
+        return (1, 0)
+    return (0, value)
+
+
+class ProjectFacetIndex:
+    """
+    Per-worker bitmap index over the listing's low-cardinality facets.
+
+    Every project owns a slot; each (facet, value) pair owns a bitarray with a
+    bit set for the slots carrying that value. A filter combination resolves
+    to AND across facets and OR within a multi-valued facet, so only the ids
+    of the requested page ever need to be fetched from Postgres.
+    """
+
+    def __init__(self):
+        self._capacity = 0
+        self._slots: Dict[UUID, int] = {}
+        self._ids: List[Optional[UUID]] = []
+        self._free: List[int] = []
+        self._live = bitarray()
+        self._bitmaps: Dict[str, Dict[Any, bitarray]] = defaultdict(dict)
+        self._documents: Dict[int, ProjectFacetDocument] = {}
+        self._orders: Dict[Tuple[str, bool], List[int]] = {}
+        self.loaded = False
+        self.stale = False
+        self.watermark: Optional[datetime] = None
+        self.refreshed_at = 0.0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _grow(self, capacity: int):
+        padding = bitarray(capacity - self._capacity)
+        padding.setall(0)
+        self._live.extend(padding)
+        for values in self._bitmaps.values():
+            for bits in values.values():
+                bits.extend(padding)
+        self._capacity = capacity
+
+    def _bitmap(self, facet: str, value) -> bitarray:
+        bits = self._bitmaps[facet].get(value)
+        if bits is None:
+            bits = bitarray(self._capacity)
+            bits.setall(0)
+            self._bitmaps[facet][value] = bits
+        return bits
+
+    def _allocate(self, project_id: UUID) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = project_id
+        else:
+            slot = len(self._ids)
+            self._ids.append(project_id)
+            if slot >= self._capacity:
+                self._grow(max(64, self._capacity * 2))
+        self._slots[project_id] = slot
+        return slot
+
+    def _clear_slot(self, slot: int):
+        document = self._documents.pop(slot, None)
+        if document is None:
+            return
+        for facet, values in document.facets.items():
+            for value in values:
+                bits = self._bitmaps[facet].get(value)
+                if bits is not None:
+                    bits[slot] = 0
+        self._live[slot] = 0
+
+    def upsert(self, document: ProjectFacetDocument):
+        slot = self._slots.get(document.id)
+        if slot is None:
+            slot = self._allocate(document.id)
+        else:
+            self._clear_slot(slot)
+
+        facets = {f: {normalize_facet_value(v) for v in values if v is not None}
+                  for f, values in document.facets.items()}
+        document.facets = facets
+        for facet, values in facets.items():
+            for value in values:
+                self._bitmap(facet, value)[slot] = 1
+        self._live[slot] = 1
+        self._documents[slot] = document
+        self._orders.clear()
+
+    def remove(self, project_id: UUID):
+        slot = self._slots.pop(project_id, None)
+        if slot is None:
+            return
+        self._clear_slot(slot)
+        self._ids[slot] = None
+        self._free.append(slot)
+        self._orders.clear()
+
+    def clear(self):
+        self.__init__()
+
+    def invalidate(self):
+        # picked up by the next incremental refresh
+        self.stale = True
+
+    def supports(self, filters, unit_matches: bool = False) -> bool:
+        """
+        Whether the filter set can be answered from bitmaps alone. Text search,
+        price/area/price per sqft ranges and cursors go to Postgres, as does more than one
+        unit level facet: those must match on the same unit, which per-project
+        bitmaps cannot tell.
+
+        With `unit_matches` the caller resolves every unit level filter
+        itself (see ProjectUnitCatalog) and passes the matching project ids.
+        """
+        if filters.search or filters.cursor:
+            return False
+        if unit_matches:
+            return True
+        if filters.min_price or filters.max_price:
+            return False
+        if filters.min_area is not None or filters.max_area is not None:
+            return False
+        if filters.min_price_per_sqft is not None or filters.max_price_per_sqft is not None:
+            return False
+        if sum(1 for facet in UNIT_FACETS if getattr(filters, facet)) > 1:
+            return False
+        return True
+
+    def _any_of(self, facet: str, values: Iterable) -> bitarray:
+        result = bitarray(self._capacity)
+        result.setall(0)
+        for value in values:
+            bits = self._bitmaps[facet].get(normalize_facet_value(value))
+            if bits is not None:
+                result |= bits
+        return result
+
+    def _of_ids(self, project_ids: Iterable[UUID]) -> bitarray:
+        result = bitarray(self._capacity)
+        result.setall(0)
+        for project_id in project_ids:
+            slot = self._slots.get(project_id)
+            if slot is not None:
+                result[slot] = 1
+        return result
+
+    def resolve(self, filters, exclude: Iterable[str] = (), unit_matches: Optional[Set[UUID]] = None) -> bitarray:
+        """
+        Bitmap of projects matching `filters`, ignoring the facets in `exclude`.
+        `unit_matches` replaces the unit level facets with a precomputed set of
+        matching project ids.
+        """
+        exclude = set(exclude)
+        result = self._live.copy()
+
+        single_valued = {
+            "development_stage": filters.development_stage,
+            "project_type": filters.project_type,
+            "property_type": filters.property_type,
+            "is_featured": filters.is_featured,
+            "possession_year": filters.possession_date,
+            "locality_id": filters.locality_id,
+            "developer_id": filters.developer_id,
+        }
+        for facet, value in single_valued.items():
+            if value is not None and facet not in exclude:
+                result &= self._any_of(facet, [value])
+
+        if unit_matches is not None:
+            result &= self._of_ids(unit_matches)
+        else:
+            for facet in UNIT_FACETS:
+                values = getattr(filters, facet)
+                if values and facet not in exclude:
+                    result &= self._any_of(facet, values)
+
+        if filters.badges and "badges" not in exclude:
+            for badge in filters.badges:
+                result &= self._any_of("badges", [badge])
+
+        return result
+
+    def matching(
+        self, filters, project_ids: Iterable[UUID], unit_matches: Optional[Set[UUID]] = None
+    ) -> List[UUID]:
+        """
+        The ids among `project_ids` that match `filters`, in the given order.
+        """
+        bits = self.resolve(filters, unit_matches=unit_matches)
+        return [i for i in project_ids if (slot := self._slots.get(i)) is not None and bits[slot]]
+
+    def _order(self, sort_key: str, descending: bool) -> List[int]:
+        order = self._orders.get((sort_key, descending))
+        if order is None:
+            slots = list(self._documents)
+            # order by id, then stably by value, both in the requested direction,
+            # matching the SQL ORDER BY so a page can be continued by either;
+            # None always sorts last like NULLS LAST in the SQL listing
+            slots.sort(key=lambda s: self._ids[s].bytes, reverse=descending)
+            values = {s: _sort_key(self._documents[s].sort_values.get(sort_key)) for s in slots}
+            non_null = [s for s in slots if values[s][0] == 0]
+            null = [s for s in slots if values[s][0] == 1]
+            non_null.sort(key=lambda s: values[s], reverse=descending)
+            order = non_null + null
+            self._orders[(sort_key, descending)] = order
+        return order
+
+    def select(
+        self, filters, sort_key: str, offset: int, limit: int, unit_matches: Optional[Set[UUID]] = None
+    ) -> Tuple[List[UUID], int, Any]:
+        """
+        Returns (page of project ids, total matches, sort value of the last id).
+        """
+        bits = self.resolve(filters, unit_matches=unit_matches)
+        total = bits.count()
+        page = []
+        skipped = 0
+        descending = filters.sort_order != "asc"
+        for slot in self._order(sort_key, descending):
+            if not bits[slot]:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            page.append(slot)
+            if len(page) == limit:
+                break
+
+        last_value = self._documents[page[-1]].sort_values.get(sort_key) if page else None
+        return [self._ids[slot] for slot in page], total, last_value
+
+    def facet_counts(self, filters, facets: Iterable[str] = COUNTED_FACETS) -> Tuple[int, Dict[str, Dict[Any, int]]]:
+        """
+        Returns (total, {facet: {value: count}}). Each facet is counted against
+        every filter except its own selection, so the counts next to a group of
+        checkboxes don't collapse to the value that is already ticked.
+        """
+        total = self.resolve(filters).count()
+        counts = {}
+        for facet in facets:
+            base = self.resolve(filters, exclude=[facet])
+            counts[facet] = {
+                value: count
+                for value, bits in self._bitmaps[facet].items()
+                if (count := (base & bits).count())
+            }
+        return total, counts
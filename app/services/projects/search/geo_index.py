@@ -0,0 +1,208 @@
+import math
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+# web mercator stops here
+MAX_TILE_LATITUDE = 85.05112878
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distances from (lat, lon) to every point of the arrays, all
+    in degrees.
+    """
+    lat0, lon0 = math.radians(lat), math.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat0) / 2) ** 2 + math.cos(lat0) * np.cos(lats) * np.sin((lons - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def tile_range(min_lat: float, min_lon: float, max_lat: float, max_lon: float, zoom: int):
+    """
+    (x range, y range) of the web mercator tiles at `zoom` covering the box.
+    """
+    def tile_xy(lat, lon):
+        lat = math.radians(min(max(lat, -MAX_TILE_LATITUDE), MAX_TILE_LATITUDE))
+        n = 2 ** zoom
+        x = int((lon + 180) / 360 * n)
+        y = int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n)
+        return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+    x_min, y_min = tile_xy(max_lat, min_lon)
+    x_max, y_max = tile_xy(min_lat, max_lon)
+    return range(x_min, x_max + 1), range(y_min, y_max + 1)
+
+
+def tile_bbox(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """
+    (min_lat, min_lon, max_lat, max_lon) of a web mercator tile.
+    """
+    n = 2 ** zoom
+
+    def lat(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return lat(y + 1), x / n * 360 - 180, lat(y), (x + 1) / n * 360 - 180
+
+
+class ProjectGeoIndex:
+    """
+    Per-worker grid index over project coordinates.
+
+    Points are sorted by grid cell, so each cell is a contiguous slice of the
+    coordinate arrays; a query gathers the slices of the cells overlapping its
+    bounding box and computes distances for those candidates in one numpy pass.
+    The grid does not wrap around the antimeridian.
+    """
+
+    def __init__(self, cell_degrees: float = 0.1):
+        self.cell_degrees = cell_degrees
+        self._ids: List[UUID] = []
+        self._lats = np.empty(0)
+        self._lons = np.empty(0)
+        self._prices = np.empty(0)
+        self._cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self.loaded = False
+        self.stale = False
+        self.refreshed_at = 0.0
+        # bumped on every build, for caches derived from the index
+        self.version = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def build(
+        self, ids: Sequence[UUID], lats: Sequence[float], lons: Sequence[float],
+        prices: Optional[Sequence[Optional[float]]] = None,
+    ):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if prices is None:
+            prices = [None] * len(lats)
+        prices = np.array([np.nan if p is None else p for p in prices], dtype=np.float64)
+        rows = np.floor(lats / self.cell_degrees).astype(np.int64)
+        cols = np.floor(lons / self.cell_degrees).astype(np.int64)
+        order = np.lexsort((cols, rows))
+        rows, cols = rows[order], cols[order]
+
+        cells = {}
+        if len(order):
+            # start of each run of equal (row, col)
+            starts = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])])
+            ends = np.r_[starts[1:], len(order)]
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                cells[(int(rows[start]), int(cols[start]))] = (start, end)
+
+        self._ids = [ids[i] for i in order.tolist()]
+        self._lats, self._lons, self._prices, self._cells = lats[order], lons[order], prices[order], cells
+        self.loaded = True
+        self.version += 1
+
+    def invalidate(self):
+        self.stale = True
+
+    def _in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        candidates = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        lats, lons = self._lats[candidates], self._lons[candidates]
+        return candidates[(lats >= min_lat) & (lats < max_lat) & (lons >= min_lon) & (lons < max_lon)]
+
+    def _candidates(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        row_min, col_min = self._cell(min_lat, min_lon)
+        row_max, col_max = self._cell(max_lat, max_lon)
+        if (row_max - row_min + 1) * (col_max - col_min + 1) > len(self._cells):
+            # box spans more cells than are populated: walk the populated ones
+            slices = [
+                (start, end) for (row, col), (start, end) in self._cells.items()
+                if row_min <= row <= row_max and col_min <= col <= col_max
+            ]
+        else:
+            slices = [
+                self._cells[(row, col)]
+                for row in range(row_min, row_max + 1)
+                for col in range(col_min, col_max + 1)
+                if (row, col) in self._cells
+            ]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, end) for start, end in slices])
+
+    def _ranked(self, candidates: np.ndarray, distances: np.ndarray, mask: np.ndarray):
+        candidates, distances = candidates[mask], distances[mask]
+        order = np.argsort(distances, kind="stable")
+        return [self._ids[i] for i in candidates[order].tolist()], distances[order]
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> Tuple[List[UUID], np.ndarray]:
+        """
+        Returns (ids, distances in km) of the projects within `radius_km` of
+        (lat, lon), nearest first.
+        """
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        candidates = self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+        distances = haversine_km(lat, lon, self._lats[candidates], self._lons[candidates])
+        return self._ranked(candidates, distances, distances <= radius_km)
+
+    def within_bbox(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+        lat: Optional[float] = None, lon: Optional[float] = None,
+    ) -> Tuple[List[UUID], np.ndarray]:
+        """
+        Returns (ids, distances in km) of the projects inside the box, nearest
+        to (lat, lon) first, or to the box's center when no point is given.
+        """
+        if lat is None or lon is None:
+            lat, lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        candidates = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        lats, lons = self._lats[candidates], self._lons[candidates]
+        mask = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        return self._ranked(candidates, haversine_km(lat, lon, lats, lons), mask)
+
+    def clusters(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+        grid: int = 8, allowed: Optional[Set[UUID]] = None,
+    ) -> List[dict]:
+        """
+        Aggregates the points inside the box (max edges exclusive, so adjacent
+        tiles don't share points) over a `grid` x `grid` split of it. Each
+        non-empty cell yields its count, centroid and lowest starting price;
+        a cell holding a single project also names it. `allowed` restricts
+        the points to those ids.
+        """
+        points = self._in_bbox(min_lat, min_lon, max_lat, max_lon)
+        if allowed is not None:
+            points = points[np.fromiter((self._ids[i] in allowed for i in points.tolist()), bool, len(points))]
+        if not len(points):
+            return []
+
+        lats, lons, prices = self._lats[points], self._lons[points], self._prices[points]
+        rows = np.minimum(((lats - min_lat) / (max_lat - min_lat) * grid).astype(np.int64), grid - 1)
+        cols = np.minimum(((lons - min_lon) / (max_lon - min_lon) * grid).astype(np.int64), grid - 1)
+        cells = rows * grid + cols
+
+        size = grid * grid
+        counts = np.bincount(cells, minlength=size)
+        lat_sums = np.bincount(cells, weights=lats, minlength=size)
+        lon_sums = np.bincount(cells, weights=lons, minlength=size)
+        min_prices = np.full(size, np.inf)
+        np.fmin.at(min_prices, cells, prices)
+        # only read for single point cells, where any write is the point
+        first = np.full(size, -1)
+        first[cells] = points
+
+        clusters = []
+        for cell in np.flatnonzero(counts).tolist():
+            count = int(counts[cell])
+            clusters.append({
+                "lat": float(lat_sums[cell] / count),
+                "lon": float(lon_sums[cell] / count),
+                "count": count,
+                "min_starting_price": float(min_prices[cell]) if np.isfinite(min_prices[cell]) else None,
+                "project_id": self._ids[first[cell]] if count == 1 else None,
+            })
+        return clusters
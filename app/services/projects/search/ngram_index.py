@@ -0,0 +1,99 @@
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Trigrams of a lowercased string padded the way pg_trgm pads words, so
+    scores from this index line up with similarity() in Postgres.
+    """
+    grams = set()
+    for word in text.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """
+    In-process trigram inverted index. Used as the project search backend when
+    Postgres (and pg_trgm) is not available, e.g. in tests.
+
+    Lookup intersects posting lists starting from the rarest trigram, so the
+    cost depends on how many documents share the query's trigrams rather than
+    on the size of the catalog.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._documents: Dict[Hashable, Tuple[str, ...]] = {}
+        self._grams: Dict[Hashable, Tuple[Set[str], ...]] = {}
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._documents
+
+    def add(self, doc_id: Hashable, fields: Iterable[str]):
+        self.remove(doc_id)
+        fields = tuple(f.lower() for f in fields if f)
+        field_grams = tuple(trigrams(field) for field in fields)
+        self._documents[doc_id] = fields
+        self._grams[doc_id] = field_grams
+        for gram in set().union(*field_grams):
+            self._postings[gram].add(doc_id)
+
+    def remove(self, doc_id: Hashable):
+        for gram in set().union(*self._grams.pop(doc_id, ())):
+            posting = self._postings[gram]
+            posting.discard(doc_id)
+            if not posting:
+                del self._postings[gram]
+        self._documents.pop(doc_id, None)
+
+    def clear(self):
+        self._postings.clear()
+        self._documents.clear()
+        self._grams.clear()
+
+    def _candidates(self, query: str) -> Iterable[Hashable]:
+        # Only whole-word trigrams are required to be present; the leading and
+        # trailing padded trigrams may not occur when the query is a substring.
+        inner = set()
+        for word in query.split():
+            inner.update(word[i:i + 3] for i in range(len(word) - 2))
+        if not inner:
+            return list(self._documents)
+
+        postings = sorted((self._postings.get(g, set()) for g in inner), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query: str, limit: int = None) -> List[Tuple[Hashable, float]]:
+        """
+        Returns (doc_id, score) for every document containing `query` as a
+        substring of one of its fields, best match first. The score is the
+        best trigram similarity between the query and any matching field.
+        """
+        query = query.lower().strip()
+        if not query:
+            return []
+
+        query_grams = trigrams(query)
+        matches = []
+        for doc_id in self._candidates(query):
+            scores = [
+                len(query_grams & grams) / len(query_grams | grams)
+                for field, grams in zip(self._documents[doc_id], self._grams[doc_id])
+                if query in field
+            ]
+            if scores:
+                matches.append((doc_id, max(scores)))
+
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches[:limit] if limit else matches
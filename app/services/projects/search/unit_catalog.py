@@ -0,0 +1,203 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+from uuid import UUID
+import numpy as np
+
+# stands in for NULL in the integer columns
+MISSING = -1
+
+
+class UnitCatalogRow(NamedTuple):
+    id: UUID
+    project_id: UUID
+    unit_type: str
+    bedrooms: Optional[int]
+    balconies: Optional[int]
+    base_price: float
+    total_price: float
+    super_area_sqft: Optional[float]
+    carpet_area_sqft: Optional[float]
+    price_per_sqft: Optional[float]
+    is_active: bool
+    is_deleted: bool
+
+
+class ProjectAggregates(NamedTuple):
+    # per project slot; NaN where the project has no live unit
+    min_price: np.ndarray
+    max_price: np.ndarray
+    min_area: np.ndarray
+    max_area: np.ndarray
+    min_price_per_sqft: np.ndarray
+    max_price_per_sqft: np.ndarray
+
+
+def _float(value: Optional[float]) -> float:
+    return np.nan if value is None else value
+
+
+def _int_values(values: Iterable) -> List[int]:
+    # filters carry bedrooms/balconies as strings
+    return [int(v) for v in values if str(v).lstrip("-").isdigit()]
+
+
+class ProjectUnitCatalog:
+    """
+    Per-worker columnar snapshot of project units.
+
+    Each unit owns a row across parallel NumPy columns (prices, areas in sqft,
+    price per sqft, bedrooms, balconies, unit type code, project slot), so a unit level filter
+    is a handful of vectorized comparisons over every unit at once instead of
+    a DISTINCT project_id subquery. Inactive and deleted units stay in place
+    with their live flag cleared.
+    """
+
+    def __init__(self):
+        self._size = 0
+        self._row_of: Dict[UUID, int] = {}
+        self._project_ids: List[UUID] = []
+        self._project_slot: Dict[UUID, int] = {}
+        self._type_codes: Dict[str, int] = {}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._allocate(0)
+        self._aggregates: Optional[ProjectAggregates] = None
+        self.loaded = False
+        self.stale = False
+        self.watermark: Optional[datetime] = None
+        self.refreshed_at = 0.0
+        self.loaded_at = 0.0
+
+    def __len__(self):
+        return int(self._columns["live"][:self._size].sum())
+
+    def _allocate(self, capacity: int):
+        old, size = self._columns, self._size
+        self._columns = {
+            "base_price": np.empty(capacity, np.float64),
+            "total_price": np.empty(capacity, np.float64),
+            "super_sqft": np.empty(capacity, np.float64),
+            "carpet_sqft": np.empty(capacity, np.float64),
+            "price_per_sqft": np.empty(capacity, np.float64),
+            "bedrooms": np.empty(capacity, np.int16),
+            "balconies": np.empty(capacity, np.int16),
+            "unit_type": np.empty(capacity, np.int16),
+            "project": np.empty(capacity, np.int32),
+            "live": np.zeros(capacity, bool),
+        }
+        for name, column in old.items():
+            self._columns[name][:size] = column[:size]
+
+    def _project(self, project_id: UUID) -> int:
+        slot = self._project_slot.get(project_id)
+        if slot is None:
+            slot = self._project_slot[project_id] = len(self._project_ids)
+            self._project_ids.append(project_id)
+        return slot
+
+    def _type_code(self, unit_type: str) -> int:
+        return self._type_codes.setdefault(unit_type, len(self._type_codes))
+
+    def clear(self):
+        self.__init__()
+
+    def invalidate(self):
+        # picked up by the next incremental refresh
+        self.stale = True
+
+    def upsert(self, rows: List[UnitCatalogRow]):
+        new = sum(1 for row in rows if row.id not in self._row_of)
+        capacity = len(self._columns["live"])
+        if self._size + new > capacity:
+            self._allocate(max(1024, capacity * 2, self._size + new))
+
+        columns = self._columns
+        for row in rows:
+            i = self._row_of.get(row.id)
+            if i is None:
+                i = self._row_of[row.id] = self._size
+                self._size += 1
+            columns["base_price"][i] = row.base_price
+            columns["total_price"][i] = row.total_price
+            columns["super_sqft"][i] = _float(row.super_area_sqft)
+            columns["carpet_sqft"][i] = _float(row.carpet_area_sqft)
+            columns["price_per_sqft"][i] = _float(row.price_per_sqft)
+            columns["bedrooms"][i] = MISSING if row.bedrooms is None else row.bedrooms
+            columns["balconies"][i] = MISSING if row.balconies is None else row.balconies
+            columns["unit_type"][i] = self._type_code(row.unit_type)
+            columns["project"][i] = self._project(row.project_id)
+            columns["live"][i] = bool(row.is_active) and not row.is_deleted
+        self._aggregates = None
+
+    def _column(self, name: str) -> np.ndarray:
+        return self._columns[name][:self._size]
+
+    def unit_mask(self, filters) -> np.ndarray:
+        """
+        Live units matching the unit level filters: unit_type, bedrooms,
+        balconies and the base price range.
+        """
+        mask = self._column("live").copy()
+        if filters.unit_type:
+            names = {getattr(t, "value", t) for t in filters.unit_type}
+            codes = [code for name, code in self._type_codes.items() if name in names]
+            mask &= np.isin(self._column("unit_type"), codes)
+        if filters.bedrooms:
+            mask &= np.isin(self._column("bedrooms"), _int_values(filters.bedrooms))
+        if filters.balconies:
+            mask &= np.isin(self._column("balconies"), _int_values(filters.balconies))
+        if filters.min_price:
+            mask &= self._column("base_price") >= filters.min_price
+        if filters.max_price:
+            mask &= self._column("base_price") <= filters.max_price
+        return mask
+
+    def aggregates(self) -> ProjectAggregates:
+        """
+        Per-project min/max base price, super area (sqft) and price per sqft
+        over live units.
+        """
+        if self._aggregates is None:
+            live = self._column("live")
+            projects = self._column("project")[live]
+            count = len(self._project_ids)
+
+            def reduce(ufunc, name, initial):
+                # fmin/fmax skip NaN (unknown area) like SQL min/max skip NULL
+                out = np.full(count, initial)
+                ufunc.at(out, projects, self._column(name)[live])
+                out[np.isinf(out)] = np.nan
+                return out
+
+            self._aggregates = ProjectAggregates(
+                min_price=reduce(np.fmin, "base_price", np.inf),
+                max_price=reduce(np.fmax, "base_price", -np.inf),
+                min_area=reduce(np.fmin, "super_sqft", np.inf),
+                max_area=reduce(np.fmax, "super_sqft", -np.inf),
+                min_price_per_sqft=reduce(np.fmin, "price_per_sqft", np.inf),
+                max_price_per_sqft=reduce(np.fmax, "price_per_sqft", -np.inf),
+            )
+        return self._aggregates
+
+    def matching_projects(self, filters) -> Set[UUID]:
+        """
+        Ids of the projects having a live unit that matches every unit level
+        filter at once. The area and price per sqft ranges match projects
+        whose range overlaps the requested one, like the listing summary
+        filters.
+        """
+        slots = np.zeros(len(self._project_ids), bool)
+        slots[self._column("project")[self.unit_mask(filters)]] = True
+        ranges = [
+            ("min_area", "max_area", filters.min_area, filters.max_area),
+            ("min_price_per_sqft", "max_price_per_sqft", filters.min_price_per_sqft, filters.max_price_per_sqft),
+        ]
+        for min_name, max_name, low, high in ranges:
+            if low is None and high is None:
+                continue
+            aggregates = self.aggregates()
+            with np.errstate(invalid="ignore"):
+                if low is not None:
+                    slots &= getattr(aggregates, max_name) >= low
+                if high is not None:
+                    slots &= getattr(aggregates, min_name) <= high
+        return {self._project_ids[slot] for slot in np.flatnonzero(slots).tolist()}
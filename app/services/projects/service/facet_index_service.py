@@ -0,0 +1,51 @@
+import asyncio
+import time
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.services.projects.repository.project_repo import fetch_project_facet_documents
+from app.services.projects.search import project_facet_index
+
+# updated_at is stamped with the writing transaction's start time, so a slow
+# transaction can commit rows older than the watermark; re-read a window behind it
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+_refresh_lock = asyncio.Lock()
+
+
+def facet_index_is_fresh() -> bool:
+    index = project_facet_index
+    return (
+        index.loaded
+        and not index.stale
+        and time.monotonic() - index.refreshed_at < config.FACET_INDEX_REFRESH_SECONDS
+    )
+
+
+async def refresh_facet_index(db: AsyncSession, full: bool = False):
+    """
+    Loads the worker's facet index on first use and afterwards applies only the
+    projects changed since the last refresh. Concurrent callers keep serving
+    the current index instead of queueing behind the refresh.
+    """
+    if not full and facet_index_is_fresh():
+        return
+    if _refresh_lock.locked():
+        return
+
+    index = project_facet_index
+    async with _refresh_lock:
+        full = full or not index.loaded
+        since = None if full or index.watermark is None else index.watermark - WATERMARK_OVERLAP
+        index.stale = False
+        documents, removed, watermark = await fetch_project_facet_documents(db, since)
+
+        if full:
+            index.clear()
+        for document in documents:
+            index.upsert(document)
+        for project_id in removed:
+            index.remove(project_id)
+        index.watermark = watermark or index.watermark
+        index.loaded = True
+        index.refreshed_at = time.monotonic()
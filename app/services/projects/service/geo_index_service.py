@@ -0,0 +1,50 @@
+import asyncio
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.services.projects.repository.project_repo import fetch_project_geo_rows
+from app.services.projects.search import project_geo_index
+from app.services.geolocation.service.geo_hierarchy_service import resolve_localities
+
+_refresh_lock = asyncio.Lock()
+
+
+def geo_index_is_fresh() -> bool:
+    index = project_geo_index
+    return (
+        index.loaded
+        and not index.stale
+        and time.monotonic() - index.refreshed_at < config.PROJECT_GEO_INDEX_REFRESH_SECONDS
+    )
+
+
+async def refresh_project_geo_index(db: AsyncSession, force: bool = False):
+    """
+    Rebuilds the worker's project geo index from each project's locality
+    coordinates and starting price. Projects whose locality has no
+    coordinates are left out.
+    """
+    if not force and geo_index_is_fresh():
+        return
+    if _refresh_lock.locked() and project_geo_index.loaded:
+        return
+
+    index = project_geo_index
+    async with _refresh_lock:
+        if not force and geo_index_is_fresh():
+            return
+        index.stale = False
+        rows = await fetch_project_geo_rows(db)
+        localities = await resolve_localities(db, {row.locality_id for row in rows})
+
+        ids, lats, lons, prices = [], [], [], []
+        for project_id, locality_id, starting_price in rows:
+            locality = localities.get(locality_id)
+            if locality is None or locality.latitude is None or locality.longitude is None:
+                continue
+            ids.append(project_id)
+            lats.append(locality.latitude)
+            lons.append(locality.longitude)
+            prices.append(float(starting_price) if starting_price is not None else None)
+        index.build(ids, lats, lons, prices)
+        index.refreshed_at = time.monotonic()
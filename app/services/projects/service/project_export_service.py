@@ -0,0 +1,37 @@
+from typing import AsyncIterator
+from app.config import config
+from app.db.connection import db_connection
+from app.services.projects.repository.project_repo import stream_projects
+from app.services.projects.schemas.project_schemas import ProjectExportFilters, ProjectExportResponse
+from app.services.geolocation.service.geo_hierarchy_service import resolve_localities
+from app.utils.json_utils import dumps, RowEncoder
+
+export_encoder = RowEncoder(ProjectExportResponse)
+
+
+async def export_projects_ndjson(filters: ProjectExportFilters) -> AsyncIterator[bytes]:
+    """
+    NDJSON chunks of ProjectExportResponse rows, one chunk per batch of
+    PROJECT_EXPORT_BATCH_SIZE projects, from a single streamed query.
+
+    Opens its own session: the body is sent after the request's dependencies
+    have closed theirs. Loaded projects are expunged after each batch, so
+    memory use doesn't grow with the size of the export.
+    """
+    async with db_connection.get_read_session() as db:
+        async for projects in stream_projects(
+            db, filters, filters.updated_since, config.PROJECT_EXPORT_BATCH_SIZE
+        ):
+            localities = await resolve_localities(db, {p.locality_id for p in projects})
+            chunk = bytearray()
+            for p in projects:
+                locality = localities.get(p.locality_id)
+                chunk += dumps(export_encoder.encode(
+                    p,
+                    locality=locality.name if locality else None,
+                    full_address=locality.full_address if locality else None,
+                    starting_price=p.listing_summary.starting_price if p.listing_summary else None,
+                ))
+                chunk += b"\n"
+            db.expunge_all()
+            yield bytes(chunk)
@@ -0,0 +1,114 @@
+from typing import AsyncIterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.services.projects.repository.project_repo import (
+    bulk_create_projects,
+    find_existing_project_keys,
+    refresh_project_listing_summary,
+    load_project_search_index,
+)
+from app.services.projects.schemas.project_schemas import (
+    ProjectCreateRequest, ProjectImportError, ProjectImportResponse
+)
+from app.services.projects.service.project_service import invalidate_projects_on_commit
+from app.utils.ndjson_utils import iter_ndjson_lines
+
+# errors past this many are counted but not listed
+MAX_REPORTED_ERRORS = 1000
+
+
+class ProjectImportService:
+    """
+    Imports ProjectCreateRequest rows from an NDJSON stream. Rows are
+    validated as they arrive and written in batches of
+    PROJECT_IMPORT_BATCH_SIZE, each batch in its own transaction, so memory
+    use depends on the batch size and not on the size of the upload. A batch
+    whose summary refresh or commit fails is rolled back and its rows are
+    reported as failed at that stage; the import goes on with the next batch.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.report = ProjectImportResponse(total_rows=0, imported=0, failed=0)
+
+    def _fail(self, line: int, stage: str, error: str, name: Optional[str] = None):
+        self.report.failed += 1
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(ProjectImportError(line=line, name=name, stage=stage, error=error))
+        else:
+            self.report.errors_truncated = True
+
+    async def import_ndjson(self, chunks: AsyncIterator[bytes]) -> ProjectImportResponse:
+        batch: List[Tuple[int, ProjectCreateRequest]] = []
+        async for line, raw in iter_ndjson_lines(chunks):
+            self.report.total_rows += 1
+            if raw is None:
+                self._fail(line, "validation", "Line is too long.")
+                continue
+            try:
+                batch.append((line, ProjectCreateRequest.model_validate_json(raw)))
+            except ValidationError as e:
+                self._fail(line, "validation", "; ".join(
+                    ": ".join(filter(None, [".".join(map(str, err["loc"])), err["msg"]]))
+                    for err in e.errors(include_url=False)
+                ))
+                continue
+            if len(batch) >= config.PROJECT_IMPORT_BATCH_SIZE:
+                await self._write_batch(batch)
+                batch = []
+        if batch:
+            await self._write_batch(batch)
+        return self.report
+
+    async def _write_batch(self, batch: List[Tuple[int, ProjectCreateRequest]]):
+        existing = await find_existing_project_keys(
+            {(payload.project.developer_id, payload.project.name) for _, payload in batch}, self.db
+        )
+        rows = []
+        for line, payload in batch:
+            key = (payload.project.developer_id, payload.project.name)
+            if key in existing:
+                self._fail(
+                    line, "insert", "Project with this name already exists for this developer.", payload.project.name
+                )
+                continue
+            # later rows of the same file count as duplicates too
+            existing.add(key)
+            rows.append((line, payload))
+
+        project_ids = []
+        inserted = []
+        try:
+            async with self.db.begin_nested():
+                project_ids = await bulk_create_projects([payload for _, payload in rows], self.db)
+            inserted = rows
+        except SQLAlchemyError:
+            # find the offending rows by retrying them one at a time
+            for line, payload in rows:
+                try:
+                    async with self.db.begin_nested():
+                        project_ids += await bulk_create_projects([payload], self.db)
+                    inserted.append((line, payload))
+                except SQLAlchemyError as e:
+                    self._fail(line, "insert", str(getattr(e, "orig", None) or e), payload.project.name)
+
+        stage = "summary"
+        try:
+            if project_ids:
+                await refresh_project_listing_summary(project_ids, self.db)
+                # new projects have no cached detail, only listings need dropping
+                invalidate_projects_on_commit(self.db, [])
+            stage = "commit"
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            error = f"Batch not imported, its {stage} failed: {getattr(e, 'orig', None) or e}"
+            for line, payload in inserted:
+                self._fail(line, stage, error, payload.project.name)
+            return
+
+        self.report.imported += len(project_ids)
+        if project_ids and config.PROJECT_SEARCH_BACKEND == "memory":
+            await load_project_search_index(self.db, project_ids)
@@ -3,66 +3,108 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.services.projects.schemas.project_schemas import ProjectCreateRequest, ProjectListFilters, FullProjectResponse,\
-        ProjectDetailResponse
+        ProjectDetailResponse, ProjectFacetCountsResponse, FacetValueCount, LocalityResponse, ProjectGeoFilters, \
+        NearbyProjectResponse, ProjectClusterFilters, MapClustersResponse
 
 from app.services.projects.repository.project_repo import (
-    get_project_by_name_and_developer,
     create_project,
-    create_project_units,
-    create_project_media,
-    create_project_payment,
-    create_project_additional_charges,
-    create_project_commission,
-    create_project_parking,
-    create_project_amenities,
-    create_project_nearby_landmarks
+    create_project_children,
+    refresh_project_listing_summary,
+    load_project_search_index
 )
-from app.utils.errors import ProjectAlreadyExistsException, ProjectNotFound
-from app.services.projects.repository.project_repo import fetch_projects, get_project_detail_id
-from typing import Tuple, List, Dict
+from app.utils.errors import ProjectAlreadyExistsException, ProjectNotFound, InvalidGeoQueryException
+from app.config import config
+from app.services.projects.repository.project_repo import fetch_projects, fetch_projects_by_ids, \
+    get_project_detail_id, resolve_sort_key, fetch_facet_counts, project_count_cache, get_project_version, \
+    filter_project_ids, NON_FILTER_FIELDS
+from app.services.projects.search import project_facet_index, project_geo_index, project_unit_catalog, tile_bbox, \
+    tile_range
+from app.services.projects.service.geo_index_service import refresh_project_geo_index
+from app.services.geolocation.service.geo_hierarchy_service import resolve_localities
+from app.services.projects.service.facet_index_service import refresh_facet_index
+from app.services.projects.service.unit_catalog_service import refresh_unit_catalog
+from app.db.events import on_commit
+from app.db.connection import db_connection, reads_replica, reads_own_writes
+from app.utils.cursor_utils import encode_cursor
+from app.utils.cache_utils import canonical_key, SingleFlight, TTLCache
+from app.utils.response_cache import CachedResponse, ResponseCache, register_cache, invalidate_tags_nowait
+from app.utils.http_utils import http_date, is_not_modified
+from app.utils.json_utils import dumps, RowEncoder
+from typing import Tuple, List, Dict, Mapping, Optional, Set
+from datetime import datetime
 from uuid import UUID
+import hashlib
 
+# tag shared by every cached response that lists projects
+PROJECTS_TAG = "projects"
 
-class ProjectService:
+project_list_cache = register_cache(
+    ResponseCache("projects:list", maxsize=1024, ttl=config.PROJECT_LIST_CACHE_TTL_SECONDS)
+)
+project_detail_cache = register_cache(
+    ResponseCache(
+        "projects:detail", maxsize=config.PROJECT_DETAIL_CACHE_SIZE, ttl=config.PROJECT_DETAIL_CACHE_TTL_SECONDS
+    )
+)
+# concurrent detail misses for one project share a single load
+project_detail_loads = SingleFlight()
 
-    def __init__(self, db: AsyncSession):
-        self.db = db
+# map clusters per (geo index version, zoom, x, y, filters)
+map_tile_cache = TTLCache(maxsize=config.MAP_TILE_CACHE_SIZE, ttl=config.MAP_TILE_CACHE_TTL_SECONDS)
+# cells per tile edge, i.e. 64px clusters on 256px tiles
+MAP_CLUSTER_GRID = 4
+MAX_VIEWPORT_TILES = 64
 
-    async def create_project(self, payload: ProjectCreateRequest):
-        try:
-            # Check if project already exists
-            existing = await get_project_by_name_and_developer(payload.project.name, payload.project.developer_id, self.db)
-            if existing:
-                raise ProjectAlreadyExistsException("Project with this name already exists for this developer.")
 
-            # Create Project
-            project = await create_project(payload.project.dict(), self.db)
+def project_tag(project_id) -> str:
+    return f"project:{project_id}"
 
-            # Create Units
-            if payload.units:
-                await create_project_units(project.id, payload.units, self.db)
 
-            # Create Media
-            if payload.media:
-                await create_project_media(project.id, payload.media, self.db)
+def invalidate_projects_on_commit(db: AsyncSession, project_ids: List[UUID]):
+    # every per-worker index and cache derived from projects drops the
+    # change only once it is committed
+    on_commit(db, project_facet_index.invalidate)
+    on_commit(db, project_geo_index.invalidate)
+    on_commit(db, project_unit_catalog.invalidate)
+    on_commit(db, project_count_cache.clear)
+    on_commit(db, lambda: invalidate_tags_nowait([PROJECTS_TAG, *map(project_tag, project_ids)]))
 
-            if payload.amenities:
-                await create_project_amenities(project.id, payload.amenities, self.db)
 
-            if payload.nearby_landmarks:
-                await create_project_nearby_landmarks(project.id, payload.nearby_landmarks, self.db)
+# listing rows are encoded straight from the ORM objects, skipping from_orm
+listing_encoder = RowEncoder(FullProjectResponse)
+nearby_encoder = RowEncoder(NearbyProjectResponse)
 
-            if payload.parking:
-                await create_project_parking(project.id, payload.parking, self.db)
 
-            if payload.commission:
-                await create_project_commission(project.id, payload.commission, self.db)
+class ProjectService:
 
-            if payload.additional_charges:
-                await create_project_additional_charges(project.id, payload.additional_charges, self.db)
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        # clients that just wrote read past every cache and in-memory index
+        self.bypass_caches = reads_own_writes(db)
 
-            if payload.payment:
-                await create_project_payment(project.id, payload.payment, self.db)
+    def _may_fill(self, cache: ResponseCache, tags: List[str]) -> bool:
+        # a lagging replica can still return what a recent write replaced;
+        # don't store that under the tag versions the write bumped
+        if self.bypass_caches:
+            return False
+        return not (reads_replica(self.db) and cache.changed_within(tags, db_connection.replica_max_staleness))
+
+    async def create_project(self, payload: ProjectCreateRequest):
+        try:
+            # Create Project, unless the developer already has one by this name
+            project = await create_project(payload.project, self.db)
+            if project is None:
+                raise ProjectAlreadyExistsException("Project with this name already exists for this developer.")
+
+            # Units, media, amenities, landmarks, charges and the payment plan,
+            # one multi-row INSERT per table
+            await create_project_children(project.id, payload, self.db)
+
+            await refresh_project_listing_summary([project.id], self.db)
+
+            if config.PROJECT_SEARCH_BACKEND == "memory":
+                await load_project_search_index(self.db, [project.id])
+            invalidate_projects_on_commit(self.db, [project.id])
 
             return project
 
@@ -70,22 +112,259 @@ class ProjectService:
             await self.db.rollback()
             raise HTTPException(status_code=500, detail="Failed to create project: " + str(e))
 
+    async def list_projects_response(self, filters: ProjectListFilters) -> Tuple[bytes, bool]:
+        """
+        Encoded /projects/list body and whether it came from the cache. Hits
+        skip both the database and serialization.
+        """
+        key = canonical_key(filters)
+        tags = [PROJECTS_TAG]
+        cached = None if self.bypass_caches else await project_list_cache.get(key, tags)
+        if cached is not None:
+            return cached.body, True
+
+        versions = await project_list_cache.tag_versions(tags)
+        projects, total, next_cursor = await self.list_projects(filters)
+        body = dumps({
+            "projects": projects,
+            "total": total,
+            "page": filters.page,
+            "limit": filters.limit,
+            "next_cursor": next_cursor,
+        })
+        if self._may_fill(project_list_cache, tags):
+            await project_list_cache.set(key, CachedResponse(body), tags, versions)
+        return body, False
+
     async def list_projects(
         self, filters: ProjectListFilters
-    ) -> Tuple[List[FullProjectResponse], int]:
-        projects, total = await fetch_projects(self.db, filters)
+    ) -> Tuple[List[dict], int, Optional[str]]:
+        unit_matches = await self._unit_matches(filters)
+        if await self._facet_index_ready(filters, unit_matches):
+            projects, total, next_cursor = await self._select_from_facet_index(filters, unit_matches)
+        else:
+            projects, total, next_cursor = await fetch_projects(self.db, filters)
+
+        return await self._listing_rows(projects), total, next_cursor
+
+    async def _listing_rows(self, projects, encoder: RowEncoder = listing_encoder) -> List[dict]:
+        # FullProjectResponse shaped dicts, ready for dumps()
         response = []
+        localities = await resolve_localities(self.db, {p.locality_id for p in projects})
+
+        for p in projects:
+            locality = localities.get(p.locality_id)
+            response.append(encoder.encode(
+                p,
+                locality=locality.name if locality else None,
+                full_address=locality.full_address if locality else None,
+                starting_price=p.listing_summary.starting_price if p.listing_summary else None,
+            ))
+
+        return response
+
+    async def nearby_projects(self, filters: ProjectGeoFilters) -> bytes:
+        """
+        Encoded PaginatedNearbyProjectResponse of the projects within
+        radius_km of (lat, lon), or inside the bounding box, nearest first.
+        Distances are those of the project's locality. The
+        listing filters apply on top, from the facet index when it can answer
+        them and with one query over the candidate ids otherwise.
+        """
+        box = (filters.min_lat, filters.min_lon, filters.max_lat, filters.max_lon)
+        has_point = filters.lat is not None and filters.lon is not None
+        if all(v is not None for v in box):
+            if filters.min_lat > filters.max_lat or filters.min_lon > filters.max_lon:
+                raise InvalidGeoQueryException("Bounding box min values must not exceed its max values.")
+        elif any(v is not None for v in box) or not has_point:
+            raise InvalidGeoQueryException()
 
+        await refresh_project_geo_index(self.db)
+        if box[0] is not None:
+            project_ids, distances = project_geo_index.within_bbox(*box, lat=filters.lat, lon=filters.lon)
+        else:
+            project_ids, distances = project_geo_index.within_radius(filters.lat, filters.lon, filters.radius_km)
+        distance_by_id = dict(zip(project_ids, distances.tolist()))
+        project_ids = await self._filter_project_ids(self._listing_filters(filters), project_ids)
+
+        offset = (filters.page - 1) * filters.limit
+        projects = await fetch_projects_by_ids(self.db, project_ids[offset:offset + filters.limit])
         for p in projects:
-            p.full_address = p.locality.full_address
+            p.distance_km = round(distance_by_id[p.id], 3)
+        return dumps({
+            "total": len(project_ids),
+            "page": filters.page,
+            "limit": filters.limit,
+            "projects": await self._listing_rows(projects, nearby_encoder),
+        })
+
+    async def facet_counts(self, filters: ProjectListFilters) -> ProjectFacetCountsResponse:
+        if await self._facet_index_ready(filters):
+            total, counts = project_facet_index.facet_counts(filters)
+        else:
+            total, counts = await fetch_facet_counts(self.db, filters)
+
+        return ProjectFacetCountsResponse(
+            total=total,
+            facets={
+                facet: [
+                    FacetValueCount(value=value, count=count)
+                    for value, count in sorted(values.items(), key=lambda item: (-item[1], str(item[0])))
+                ]
+                for facet, values in counts.items()
+            },
+        )
+
+    async def _facet_index_ready(self, filters: ProjectListFilters, unit_matches: Optional[Set[UUID]] = None) -> bool:
+        if self.bypass_caches:
+            return False
+        if not (config.FACET_INDEX_ENABLED and project_facet_index.supports(filters, unit_matches is not None)):
+            return False
+        await refresh_facet_index(self.db)
+        return project_facet_index.loaded
+
+    async def _unit_matches(self, filters: ProjectListFilters) -> Optional[Set[UUID]]:
+        # projects matching the unit level filters that the facet index can't
+        # answer alone (price/area ranges, several unit facets), from the unit catalog
+        if self.bypass_caches or not (config.FACET_INDEX_ENABLED and config.UNIT_CATALOG_ENABLED):
+            return None
+        if project_facet_index.supports(filters) or not project_facet_index.supports(filters, unit_matches=True):
+            return None
+        await refresh_unit_catalog(self.db)
+        if not project_unit_catalog.loaded:
+            return None
+        return project_unit_catalog.matching_projects(filters)
+
+    async def _select_from_facet_index(self, filters: ProjectListFilters, unit_matches: Optional[Set[UUID]] = None):
+        # facets resolve in memory; Postgres only loads the requested page
+        sort_key = resolve_sort_key(filters)
+        project_ids, total, last_value = project_facet_index.select(
+            filters, sort_key, (filters.page - 1) * filters.limit, filters.limit, unit_matches=unit_matches
+        )
+        projects = await fetch_projects_by_ids(self.db, project_ids)
+
+        next_cursor = None
+        if len(project_ids) == filters.limit:
+            next_cursor = encode_cursor(sort_key, filters.sort_order, last_value, project_ids[-1])
+        return projects, total, next_cursor
+
+    async def map_clusters(self, filters: ProjectClusterFilters) -> MapClustersResponse:
+        """
+        Project counts, centroids and lowest starting prices aggregated on a
+        grid inside each map tile covering the viewport. Tiles are cached, so
+        panning only computes the tiles that came into view.
+        """
+        if filters.min_lat > filters.max_lat or filters.min_lon > filters.max_lon:
+            raise InvalidGeoQueryException("Bounding box min values must not exceed its max values.")
+        xs, ys = tile_range(filters.min_lat, filters.min_lon, filters.max_lat, filters.max_lon, filters.zoom)
+        if len(xs) * len(ys) > MAX_VIEWPORT_TILES:
+            raise InvalidGeoQueryException("Viewport spans too many tiles for this zoom level.")
+
+        await refresh_project_geo_index(self.db)
+        listing_filters = self._listing_filters(filters)
+        filters_key = canonical_key(listing_filters, exclude=NON_FILTER_FIELDS) if listing_filters else None
+
+        clusters = []
+        allowed = None
+        for x in xs:
+            for y in ys:
+                key = (project_geo_index.version, filters.zoom, x, y, filters_key)
+                tile = map_tile_cache.get(key)
+                if tile is None:
+                    if listing_filters and allowed is None:
+                        # one filter pass over every project in the covered tiles
+                        min_lat, min_lon, _, _ = tile_bbox(filters.zoom, xs[0], ys[-1])
+                        _, _, max_lat, max_lon = tile_bbox(filters.zoom, xs[-1], ys[0])
+                        candidates, _ = project_geo_index.within_bbox(min_lat, min_lon, max_lat, max_lon)
+                        allowed = set(await self._filter_project_ids(listing_filters, candidates))
+                    tile = project_geo_index.clusters(
+                        *tile_bbox(filters.zoom, x, y), grid=MAP_CLUSTER_GRID, allowed=allowed
+                    )
+                    map_tile_cache.set(key, tile)
+                clusters.extend(tile)
+
+        return MapClustersResponse(zoom=filters.zoom, clusters=clusters)
+
+    @staticmethod
+    def _listing_filters(filters: ProjectListFilters) -> Optional[ProjectListFilters]:
+        # the plain listing filters inside a geo request, None when none is set; not
+        # re-validated, the routers set bedrooms/balconies from int query params
+        listing_filters = ProjectListFilters.model_construct(
+            **{name: getattr(filters, name) for name in ProjectListFilters.model_fields}
+        )
+        if listing_filters.model_dump(exclude=NON_FILTER_FIELDS, exclude_none=True, exclude_defaults=True):
+            return listing_filters
+        return None
+
+    async def _filter_project_ids(self, filters: Optional[ProjectListFilters], project_ids: List[UUID]) -> List[UUID]:
+        # the ids matching `filters` in their given order, from the facet index
+        # when it can answer them and with one query otherwise
+        if filters is None:
+            return project_ids
+        unit_matches = await self._unit_matches(filters)
+        if await self._facet_index_ready(filters, unit_matches):
+            return project_facet_index.matching(filters, project_ids, unit_matches=unit_matches)
+        matched = await filter_project_ids(self.db, filters, project_ids)
+        return [i for i in project_ids if i in matched]
+
+    async def get_project_version(self, project_id: UUID) -> Tuple[str, Optional[datetime]]:
+        """
+        Strong ETag and Last-Modified for the project detail, computed without
+        loading any relationship.
+        """
+        version = await get_project_version(self.db, project_id)
+        if version is None:
+            raise ProjectNotFound("Project with this id doesn't exists.")
+
+        # the body's address comes from the worker's hierarchy, which can lag
+        # the rows above until its next refresh
+        locality_ids = [version.locality_id] if version.locality_id else []
+        locality = (await resolve_localities(self.db, locality_ids)).get(version.locality_id)
+        served = (locality.name, locality.full_address, locality.latitude, locality.longitude) if locality else ()
+        fingerprint = hashlib.sha1("|".join(map(str, (*version, *served))).encode()).hexdigest()
+        timestamps = [value for value in version if isinstance(value, datetime)]
+        return f'"{fingerprint}"', max(timestamps) if timestamps else None
+
+    async def get_project_detail_response(
+        self, project_id: UUID, request_headers: Optional[Mapping[str, str]] = None
+    ) -> Tuple[CachedResponse, bool]:
+        """
+        Encoded project detail with its validator headers, and whether it came
+        from the cache. Writes to the project invalidate it through its tag.
+
+        On a miss the version is read first: when it satisfies the request's
+        conditional headers the response has an empty body and nothing else
+        is loaded or cached, the caller answers 304.
+        """
+        key = str(project_id)
+        tags = [project_tag(project_id)]
+        cached = None if self.bypass_caches else await project_detail_cache.get(key, tags)
+        if cached is not None:
+            return cached, True
+
+        versions = await project_detail_cache.tag_versions(tags)
+        etag, last_modified = await self.get_project_version(project_id)
+        headers = {"ETag": etag}
+        if last_modified:
+            headers["Last-Modified"] = http_date(last_modified)
+        if request_headers and is_not_modified(request_headers, etag, last_modified):
+            return CachedResponse(b"", headers), False
+
+        if self.bypass_caches:
+            # the shared load may be reading a replica
+            return CachedResponse(dumps(await self.get_project_details(project_id)), headers), False
 
-            if p.units:
-                starting_price = p.units[0].base_price
-                for unit in p.units:
-                    p.starting_price = starting_price if unit.base_price > starting_price else unit.base_price
-            response.append(FullProjectResponse.from_orm(p))
+        async def load() -> CachedResponse:
+            # outlives this request if it is cancelled, so it reads on its own
+            # session, from the same side as the request's
+            async with db_connection.get_read_session(primary=not reads_replica(self.db)) as db:
+                service = ProjectService(db)
+                response = CachedResponse(dumps(await service.get_project_details(project_id)), headers)
+                if service._may_fill(project_detail_cache, tags):
+                    await project_detail_cache.set(key, response, tags, versions)
+            return response
 
-        return response, total
+        return await project_detail_loads.do(key, load), False
 
     async def get_project_details(self, project_id: UUID) -> ProjectDetailResponse:
         project = await get_project_detail_id(self.db, project_id)
@@ -93,20 +372,14 @@ class ProjectService:
         if not project:
             raise ProjectNotFound("Project with this id doesn't exists.")
 
-        if project.units:
-            project.total_units = len(project.units)
-            starting_price = project.units[0].base_price
-            configuration = set()
-            min_super_area = float('inf')
-            max_super_area = 0
-            for unit in project.units:
-                project.starting_price = starting_price if unit.base_price > starting_price else unit.base_price
-                configuration.add(unit.unit_type)
-                min_super_area = min_super_area if unit.super_area_value > min_super_area else unit.super_area_value
-                max_super_area = max_super_area if unit.super_area_value < max_super_area else unit.super_area_value
-
-            project.configuration = configuration
-            project.unit_size_range = [min_super_area, max_super_area]
+        summary = project.listing_summary
+        project.starting_price = summary.starting_price if summary else None
+        if summary and summary.total_units:
+            project.total_units = summary.total_units
+            project.configuration = set(summary.configuration or [])
+            if summary.min_super_area is not None:
+                # sqft, whatever the units were entered in
+                project.unit_size_range = [round(summary.min_super_area), round(summary.max_super_area)]
 
         project.all_amenities = [
             {
@@ -116,8 +389,14 @@ class ProjectService:
             for pa in project.amenities
             if pa.is_available and pa.amenity and pa.amenity.is_active
         ]
-        project.full_address = project.locality.full_address
+        locality = (await resolve_localities(self.db, [project.locality_id])).get(project.locality_id)
+        project.full_address = locality.full_address if locality else None
 
-        return ProjectDetailResponse.from_orm(project)
+        detail = ProjectDetailResponse.from_orm(project)
+        if locality:
+            detail.locality = LocalityResponse(
+                name=locality.name, latitude=locality.latitude, longitude=locality.longitude
+            )
+        return detail
 
 
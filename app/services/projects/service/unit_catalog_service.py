@@ -0,0 +1,51 @@
+import asyncio
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.services.projects.repository.project_repo import fetch_unit_catalog_rows
+from app.services.projects.search import project_unit_catalog
+from app.services.projects.service.facet_index_service import WATERMARK_OVERLAP
+
+_refresh_lock = asyncio.Lock()
+
+
+def unit_catalog_is_fresh() -> bool:
+    catalog = project_unit_catalog
+    return (
+        catalog.loaded
+        and not catalog.stale
+        and time.monotonic() - catalog.refreshed_at < config.UNIT_CATALOG_REFRESH_SECONDS
+    )
+
+
+async def refresh_unit_catalog(db: AsyncSession, full: bool = False):
+    """
+    Loads the worker's unit catalog on first use and afterwards applies only
+    the units changed since the last refresh, with a periodic full reload.
+    Concurrent callers keep serving the current catalog.
+    """
+    if not full and unit_catalog_is_fresh():
+        return
+    if _refresh_lock.locked() and project_unit_catalog.loaded:
+        return
+
+    catalog = project_unit_catalog
+    async with _refresh_lock:
+        if not full and unit_catalog_is_fresh():
+            return
+        full = (
+            full
+            or not catalog.loaded
+            or time.monotonic() - catalog.loaded_at >= config.UNIT_CATALOG_FULL_RELOAD_SECONDS
+        )
+        since = None if full or catalog.watermark is None else catalog.watermark - WATERMARK_OVERLAP
+        catalog.stale = False
+        rows, watermark = await fetch_unit_catalog_rows(db, since)
+
+        if full:
+            catalog.clear()
+            catalog.loaded_at = time.monotonic()
+        catalog.upsert(rows)
+        catalog.watermark = watermark or catalog.watermark
+        catalog.loaded = True
+        catalog.refreshed_at = time.monotonic()
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+from pydantic import BaseModel
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire `ttl` seconds after being set.
+    Not thread-safe; meant for per-worker state touched from the event loop.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller starts the
+    load, everyone arriving while it is in flight awaits the same result.
+
+    The load runs in its own task, so a caller that is cancelled (e.g. its
+    client disconnected) only stops waiting; the load goes on for the other
+    callers. It must therefore not use resources owned by the first caller's
+    request, such as its database session.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.get_running_loop().create_task(load())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # mark retrieved, every waiter may have been cancelled
+            task.exception()
+
+
+def canonical_key(model: BaseModel, exclude: Iterable[str] = ()) -> str:
+    """
+    Stable hash of a pydantic model's values: unset and default fields are
+    dropped and list values sorted, so equivalent filter sets share one key.
+    """
+    data = model.model_dump(
+        mode="json", exclude=set(exclude), exclude_none=True, exclude_defaults=True, warnings=False
+    )
+    for name, value in data.items():
+        if isinstance(value, list):
+            data[name] = sorted(value, key=str)
+    raw = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()
@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Optional, Tuple
+from uuid import UUID
+from .errors import InvalidCursorException
+
+
+def _encode_value(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(value: Any, python_type: Optional[type]):
+    if value is None or python_type is None:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, last_id: UUID) -> str:
+    """
+    Builds an opaque, url-safe cursor pointing just after (value, last_id).
+    """
+    payload = [sort_by, sort_order, _encode_value(value), str(last_id)]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str, python_type: Optional[type]) -> Tuple[Any, UUID]:
+    """
+    Returns (value, last_id) for a cursor issued by encode_cursor.
+
+    A cursor is only valid for the sort it was issued for, so a client that
+    changes sort_by/sort_order must restart from the first page.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort_by, cursor_sort_order, value, last_id = json.loads(raw)
+        if (cursor_sort_by, cursor_sort_order) != (sort_by, sort_order):
+            raise InvalidCursorException("Cursor was issued for a different sort order.")
+        return _decode_value(value, python_type), UUID(last_id)
+    except InvalidCursorException:
+        raise
+    except Exception:
+        raise InvalidCursorException()
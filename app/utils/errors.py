@@ -27,3 +27,13 @@ class ProjectAlreadyExistsException(HTTPException):
 class ProjectNotFound(HTTPException):
     def __init__(self, detail="Project doesn't exist."):
         super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self, detail="Invalid pagination cursor."):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class InvalidGeoQueryException(HTTPException):
+    def __init__(self, detail="Pass either lat/lon or a full bounding box."):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
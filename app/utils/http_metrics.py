@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+from app.config import config
+from app.utils.metrics import registry, MultiprocessCollector, OTHER
+
+logger = logging.getLogger(__name__)
+
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+# bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+requests_total = registry.counter(
+    "http_requests", "Requests by method, route template and status.", ["method", "route", "status"]
+)
+request_duration = registry.histogram(
+    "http_request_duration_seconds", "Request latency, until the last body chunk is sent.",
+    ["method", "route", "status"],
+)
+response_size = registry.histogram(
+    "http_response_size_bytes", "Response body size.", ["method", "route"], buckets=SIZE_BUCKETS
+)
+requests_in_flight = registry.gauge("http_requests_in_flight", "Requests being served.", ["method"])
+
+# set when several workers share METRICS_MULTIPROC_DIR
+multiprocess: Optional[MultiprocessCollector] = (
+    MultiprocessCollector(config.METRICS_MULTIPROC_DIR, config.METRICS_STALE_SECONDS)
+    if config.METRICS_MULTIPROC_DIR else None
+)
+
+
+async def collect_metrics():
+    if multiprocess is not None:
+        return await asyncio.to_thread(multiprocess.collect, registry.snapshot())
+    return registry.collect()
+
+
+async def retire_metrics():
+    await asyncio.to_thread(multiprocess.retire, registry.snapshot())
+
+
+async def flush_metrics_periodically():
+    # keeps this worker's snapshot fresh for scrapes served by other workers
+    while True:
+        try:
+            await asyncio.to_thread(multiprocess.flush, registry.snapshot())
+        except OSError:
+            logger.exception("Flushing metrics to %s failed", multiprocess.directory)
+        await asyncio.sleep(config.METRICS_FLUSH_SECONDS)
+
+
+class MetricsMiddleware:
+    """
+    Counts requests and records latency and response size per route
+    template. Routes are only known after routing, so unmatched paths share
+    one "unmatched" label and the label set stays bounded by the app's routes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"] if scope["method"] in METHODS else OTHER
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        requests_in_flight.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_flight.dec(method)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            requests_total.inc(method, route, status)
+            request_duration.observe(elapsed, method, route, status)
+            response_size.observe(size, method, route)
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping, Optional, Union
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed
+
+
+def is_not_modified(
+    headers: Mapping[str, str], etag: str, last_modified: Union[datetime, str, None]
+) -> bool:
+    """
+    Evaluates a GET's conditional headers. If-None-Match wins over
+    If-Modified-Since when both are sent (RFC 9110 13.2.2). `last_modified`
+    may already be a formatted Last-Modified header value.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if isinstance(last_modified, str):
+        last_modified = _parse_http_date(last_modified)
+    if not if_modified_since or last_modified is None:
+        return False
+    since = _parse_http_date(if_modified_since)
+    if since is None:
+        return False
+    # HTTP dates have second precision
+    return last_modified.replace(microsecond=0) <= since
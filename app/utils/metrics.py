@@ -0,0 +1,396 @@
+import fcntl
+import json
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# seconds, from sub-millisecond pool checkouts to stalled requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# label sets per metric; later ones are folded into a single "other" series
+MAX_SERIES = 500
+OTHER = "other"
+
+# (metric suffix, label names, label values, value)
+Sample = Tuple[str, Tuple[str, ...], Tuple[str, ...], float]
+
+
+class Metric(ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), max_series: int = MAX_SERIES):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.max_series = max_series
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Iterable) -> Tuple[str, ...]:
+        key = tuple(str(label) for label in labels)
+        if len(key) != len(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {key}")
+        if key not in self._values and len(self._values) >= self.max_series:
+            return (OTHER,) * len(key)
+        return key
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        ...
+
+    def snapshot(self) -> dict:
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labels": list(self.labels),
+            "values": [[list(key), value] for key, value in self._values.items()],
+        }
+
+    def merge(self, snapshot: dict):
+        for key, value in snapshot["values"]:
+            self._merge_value(tuple(key), value)
+
+    def _merge_value(self, key: Tuple[str, ...], value):
+        self._values[key] = self._values.get(key, 0.0) + value
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1.0):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[Sample]:
+        for key, value in self._values.items():
+            yield "_total", self.labels, key, value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, *labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, *labels, amount: float = 1.0):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[Sample]:
+        for key, value in self._values.items():
+            yield "", self.labels, key, value
+
+
+class Histogram(Metric):
+    """
+    Fixed-bucket histogram. Each label set keeps per-bucket counts (the last
+    one for +Inf) plus the sum; cumulative counts are only built at scrape.
+    """
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_series: int = MAX_SERIES,
+    ):
+        super().__init__(name, help, labels, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def count(self, *labels) -> int:
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def quantile(self, q: float, *labels) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-quantile, None without data.
+        """
+        state = self._values.get(self._key(labels))
+        if not state:
+            return None
+        counts, total = state[0], sum(state[0])
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def samples(self) -> Iterator[Sample]:
+        bucket_labels = self.labels + ("le",)
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield "_bucket", bucket_labels, key + (_format_value(bound),), cumulative
+            yield "_count", self.labels, key, cumulative
+            yield "_sum", self.labels, key, total
+
+    def snapshot(self) -> dict:
+        # copies the bucket counts, which observe keeps updating in place
+        values = [[list(key), [list(counts), total]] for key, (counts, total) in self._values.items()]
+        return {**super().snapshot(), "values": values, "buckets": list(self.buckets)}
+
+    def _merge_value(self, key: Tuple[str, ...], value):
+        counts, total = value
+        state = self._values.get(key)
+        if state is None:
+            self._values[key] = [list(counts), total]
+        else:
+            state[0] = [a + b for a, b in zip(state[0], counts)]
+            state[1] += total
+
+
+class MetricsRegistry:
+    """
+    Per-worker metrics. Updates are plain dict/list writes on the event loop
+    thread, so recording takes no lock. Collectors are called at scrape time
+    for values that are cheaper to read than to track (e.g. pool state).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_series: int = MAX_SERIES,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets, max_series))
+
+    def add_collector(self, collect: Callable[[], None]):
+        self._collectors.append(collect)
+
+    def collect(self) -> List[Metric]:
+        for collect in self._collectors:
+            collect()
+        return list(self._metrics.values())
+
+    def snapshot(self) -> dict:
+        return {metric.name: metric.snapshot() for metric in self.collect()}
+
+
+registry = MetricsRegistry()
+
+_METRIC_TYPES = {cls.type: cls for cls in (Counter, Gauge, Histogram)}
+
+
+class MultiprocessCollector:
+    """
+    Aggregates the registries of every worker of a multi-process server.
+
+    Each worker writes its snapshot to `directory` (see flush), and a scrape,
+    whichever worker serves it, sums the snapshots: counters and histograms
+    add up, and so do gauges (connections, in-flight requests).
+
+    A worker that exits (see retire), or whose snapshot is older than
+    `stale_seconds`, has its counters and histograms folded into a persistent
+    archive snapshot and only its gauges dropped. The summed counters then
+    never go down, which Prometheus would read as a reset and turn into a
+    rate spike on every restart. Folds, flushes and scrapes hold a lock on
+    the directory so a snapshot is never counted twice, and a worker that was
+    only slow, not gone, afterwards writes just what it counted since.
+
+    Methods take a registry snapshot and do blocking file IO: take the
+    snapshot on the event loop, which is the registry's only writer, and run
+    them in a thread.
+    """
+
+    ARCHIVE = "archive.json"
+
+    def __init__(self, directory: str, stale_seconds: float):
+        self.directory = directory
+        self.stale_seconds = stale_seconds
+        self.path = os.path.join(directory, f"{os.getpid()}.json")
+        self._started = False
+        self._retired = False
+        # registry snapshot behind the last write, and what of it is archived already
+        self._written: Optional[dict] = None
+        self._archived: dict = {}
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _write(path: str, snapshot: dict):
+        # write then rename, so readers never see a partial file
+        temp = f"{path}.tmp"
+        with open(temp, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(temp, path)
+
+    @staticmethod
+    def _read(path: str) -> Optional[dict]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _fold(self, path: str):
+        # caller holds the lock
+        snapshot = self._read(path)
+        if snapshot:
+            archive_path = os.path.join(self.directory, self.ARCHIVE)
+            archived = _merge_snapshots([self._read(archive_path) or {}, snapshot], types=("counter", "histogram"))
+            self._write(archive_path, {name: metric.snapshot() for name, metric in archived.items()})
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def flush(self, snapshot: dict):
+        with self._locked():
+            if self._retired:
+                # a periodic flush finishing after retire would count again
+                return
+            if not self._started:
+                # a snapshot under this pid is a dead process's whose pid was reused
+                if os.path.exists(self.path):
+                    self._fold(self.path)
+                self._started = True
+            elif self._written is not None and not os.path.exists(self.path):
+                # folded as stale while still running
+                self._archived = self._written
+            self._write(self.path, _subtract_snapshot(snapshot, self._archived))
+            self._written = snapshot
+
+    def retire(self, snapshot: dict):
+        """
+        Folds this worker's final counters into the archive on shutdown.
+        """
+        self.flush(snapshot)
+        with self._locked():
+            self._fold(self.path)
+            self._retired = True
+
+    def collect(self, snapshot: dict) -> List[Metric]:
+        self.flush(snapshot)
+        snapshots = []
+        now = time.time()
+        with self._locked():
+            # the archive is read after every fold, which may also create it
+            paths = [os.path.join(self.directory, self.ARCHIVE)]
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".json") or entry.name == self.ARCHIVE:
+                    continue
+                try:
+                    stale = now - entry.stat().st_mtime > self.stale_seconds
+                except OSError:
+                    continue
+                if stale:
+                    self._fold(entry.path)
+                else:
+                    paths.append(entry.path)
+            for path in paths:
+                snapshot = self._read(path)
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+        return list(_merge_snapshots(snapshots).values())
+
+
+def _subtract_snapshot(snapshot: dict, baseline: dict) -> dict:
+    # counters and histograms of `snapshot` minus those already in `baseline`
+    if not baseline:
+        return snapshot
+    result = {}
+    for name, data in snapshot.items():
+        base = baseline.get(name)
+        if base is None or data["type"] == "gauge":
+            result[name] = data
+            continue
+        base_values = {tuple(key): value for key, value in base["values"]}
+        values = []
+        for key, value in data["values"]:
+            previous = base_values.get(tuple(key))
+            if previous is None:
+                values.append([key, value])
+            elif data["type"] == "histogram":
+                counts, total = value
+                values.append([key, [[a - b for a, b in zip(counts, previous[0])], total - previous[1]]])
+            else:
+                values.append([key, value - previous])
+        result[name] = {**data, "values": values}
+    return result
+
+
+def _merge_snapshots(snapshots: Iterable[dict], types: Optional[Sequence[str]] = None) -> Dict[str, Metric]:
+    # sums registry snapshots into unbounded metrics, optionally only those of `types`
+    merged: Dict[str, Metric] = {}
+    for snapshot in snapshots:
+        for name, data in snapshot.items():
+            if types is not None and data["type"] not in types:
+                continue
+            metric = merged.get(name)
+            if metric is None:
+                cls = _METRIC_TYPES[data["type"]]
+                extra = {"buckets": data["buckets"]} if cls is Histogram else {}
+                metric = merged[name] = cls(name, data["help"], data["labels"], max_series=math.inf, **extra)
+            metric.merge(data)
+    return merged
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus(metrics: Iterable[Metric]) -> str:
+    """
+    Prometheus text exposition format (version 0.0.4).
+    """
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for suffix, names, values, value in metric.samples():
+            labels = ",".join(f'{name}="{_escape(label)}"' for name, label in zip(names, values))
+            lines.append(f"{metric.name}{suffix}{{{labels}}} {_format_value(value)}" if labels
+                         else f"{metric.name}{suffix} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
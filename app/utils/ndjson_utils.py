@@ -0,0 +1,45 @@
+from typing import AsyncIterator, Optional, Tuple
+
+MAX_LINE_BYTES = 4 * 1024 * 1024
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Splits a byte stream into (line number, line) pairs, skipping blank lines.
+    Only the current line is buffered; a line longer than `max_line_bytes` is
+    discarded and reported as (line number, None).
+    """
+    buffer = bytearray()
+    line_no = 1
+    overflow = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not overflow:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        overflow = True
+                        buffer.clear()
+                break
+
+            if overflow:
+                yield line_no, None
+            else:
+                buffer += chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    yield line_no, None
+                elif buffer.strip():
+                    yield line_no, bytes(buffer)
+            buffer.clear()
+            overflow = False
+            line_no += 1
+            start = end + 1
+
+    if overflow:
+        yield line_no, None
+    elif buffer.strip():
+        yield line_no, bytes(buffer)
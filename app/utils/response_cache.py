@@ -0,0 +1,204 @@
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from .cache_utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """
+    Shared (cross-worker) store behind ResponseCache. Values are opaque bytes;
+    counters back tag versions so an invalidation in one worker is seen by all.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float):
+        ...
+
+    @abstractmethod
+    async def get_counters(self, keys: List[str]) -> List[int]:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+    async def close(self):
+        pass
+
+
+class RedisCacheBackend(CacheBackend):
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("RedisCacheBackend needs the 'redis' package installed.")
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._client.set(key, value, px=int(ttl * 1000))
+
+    async def get_counters(self, keys: List[str]) -> List[int]:
+        return [int(v or 0) for v in await self._client.mget(keys)]
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: Dict[str, str] = {}
+
+
+_shared_backend: Optional[CacheBackend] = None
+_pending_invalidations = set()
+
+
+def set_shared_backend(backend: Optional[CacheBackend]):
+    global _shared_backend
+    _shared_backend = backend
+
+
+def get_shared_backend() -> Optional[CacheBackend]:
+    return _shared_backend
+
+
+class ResponseCache:
+    """
+    Cache of pre-encoded response bodies: a per-worker LRU with TTL in front of
+    the optional shared backend.
+
+    Entries carry the versions of their tags at the time they were stored;
+    invalidating a tag bumps its version, which makes every entry stored under
+    it a miss without having to enumerate them. The worker also notes when it
+    last saw each tag change (a bump here, or a new shared version, counting
+    a tag it sees for the first time as changed), see changed_within.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: float = 30):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._tag_versions: Dict[str, int] = {}
+        self._seen_versions: Dict[str, int] = {}
+        self._changed_at: Dict[str, float] = {}
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def tag_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        tags = sorted(tags)
+        backend = get_shared_backend()
+        if backend is None:
+            return {tag: self._tag_versions.get(tag, 0) for tag in tags}
+        counters = await backend.get_counters([f"tag:{tag}" for tag in tags])
+        for tag, counter in zip(tags, counters):
+            if self._seen_versions.get(tag) != counter:
+                self._seen_versions[tag] = counter
+                self._changed_at[tag] = time.monotonic()
+        return dict(zip(tags, counters))
+
+    def changed_within(self, tags: Iterable[str], seconds: float) -> bool:
+        """
+        Whether any of the tags changed less than `seconds` ago, as far as
+        this worker can tell.
+        """
+        changed_at = max((self._changed_at.get(tag, float("-inf")) for tag in tags), default=float("-inf"))
+        return time.monotonic() - changed_at < seconds
+
+    async def get(self, key: str, tags: Iterable[str]) -> Optional[CachedResponse]:
+        versions = await self.tag_versions(tags)
+        entry = self._local.get(key)
+        if entry is None and get_shared_backend() is not None:
+            raw = await get_shared_backend().get(self._key(key))
+            if raw is not None:
+                header, _, body = raw.partition(b"\n")
+                header = json.loads(header)
+                entry = (header["versions"], CachedResponse(body, header["headers"]))
+                self._local.set(key, entry)
+        if entry is None:
+            return None
+
+        stored_versions, response = entry
+        if stored_versions != versions:
+            self._local.delete(key)
+            return None
+        return response
+
+    async def set(
+        self, key: str, response: CachedResponse, tags: Iterable[str], versions: Optional[Dict[str, int]] = None
+    ):
+        """
+        Stores `response` under the given tag versions. Pass the versions read
+        before building the response so an invalidation that lands while it
+        was being built isn't lost.
+        """
+        if versions is None:
+            versions = await self.tag_versions(tags)
+        self._local.set(key, (versions, response))
+        backend = get_shared_backend()
+        if backend is not None:
+            header = json.dumps({"versions": versions, "headers": response.headers}, sort_keys=True).encode()
+            await backend.set(self._key(key), header + b"\n" + response.body, self.ttl)
+
+    def invalidate_local(self, tags: Iterable[str]):
+        now = time.monotonic()
+        for tag in tags:
+            self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+            self._changed_at[tag] = now
+
+
+_caches: List[ResponseCache] = []
+
+
+def register_cache(cache: ResponseCache) -> ResponseCache:
+    _caches.append(cache)
+    return cache
+
+
+async def invalidate_tags(tags: Iterable[str]):
+    tags = list(tags)
+    for cache in _caches:
+        cache.invalidate_local(tags)
+    backend = get_shared_backend()
+    if backend is not None:
+        for tag in tags:
+            await backend.incr(f"tag:{tag}")
+
+
+def invalidate_tags_nowait(tags: Iterable[str]):
+    """
+    Synchronous entry point for commit hooks: local caches are invalidated
+    immediately, the shared backend from a background task.
+    """
+    tags = list(tags)
+    for cache in _caches:
+        cache.invalidate_local(tags)
+    backend = get_shared_backend()
+    if backend is None:
+        return
+
+    async def _bump():
+        try:
+            for tag in tags:
+                await backend.incr(f"tag:{tag}")
+        except Exception:
+            logger.exception("Failed to invalidate cache tags %s", tags)
+
+    task = asyncio.get_running_loop().create_task(_bump())
+    _pending_invalidations.add(task)
+    task.add_done_callback(_pending_invalidations.discard)
@@ -0,0 +1,87 @@
+"""
+Per-project cost of encoding a /projects/list page: FullProjectResponse.from_orm
+plus jsonable_encoder and json.dumps, against RowEncoder plus orjson.
+
+Runs on transient ORM objects, no database needed:
+
+    PYTHONPATH=. python benchmarks/project_serialization.py [projects] [media per project]
+"""
+import json
+import sys
+import timeit
+import warnings
+from datetime import date, datetime, timezone
+from uuid import uuid4
+from fastapi.encoders import jsonable_encoder
+from app.services.projects.models.project_models import Project, ProjectMedia, ProjectListingSummary
+from app.services.projects.schemas.project_schemas import FullProjectResponse
+from app.utils.json_utils import RowEncoder, dumps
+
+
+def make_projects(count: int, media: int):
+    projects = []
+    for i in range(count):
+        project = Project(
+            id=uuid4(), name=f"Project {i}", project_type="residential", property_type="apartment",
+            development_stage="launched", possession_date=date(2027, 6, 30), is_featured=i % 5 == 0,
+            badges=["New Project"], created_at=datetime(2026, 1, 1, 9, 30, tzinfo=timezone.utc),
+            locality_id=uuid4(),
+        )
+        project.listing_summary = ProjectListingSummary(starting_price=4500000.0 + i)
+        project.media = [
+            ProjectMedia(
+                id=uuid4(), type="image", content_type="default", is_featured=j == 0, sort_order=j,
+                media_url=f"https://cdn.example.com/projects/{i}/{j}.jpg",
+                thumbnail_url=f"https://cdn.example.com/projects/{i}/{j}_thumb.jpg",
+                meta_json={"width": 1600, "height": 900},
+            )
+            for j in range(media)
+        ]
+        projects.append(project)
+    return projects
+
+
+def before(projects) -> bytes:
+    rows = []
+    for p in projects:
+        p.full_address = "Whitefield, Bengaluru"
+        p.starting_price = p.listing_summary.starting_price
+        row = FullProjectResponse.from_orm(p)
+        row.locality = "Whitefield"
+        rows.append(row)
+    return json.dumps(
+        jsonable_encoder({"projects": rows, "total": len(rows)}),
+        ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+encoder = RowEncoder(FullProjectResponse)
+
+
+def after(projects) -> bytes:
+    rows = [
+        encoder.encode(
+            p, locality="Whitefield", full_address="Whitefield, Bengaluru",
+            starting_price=p.listing_summary.starting_price,
+        )
+        for p in projects
+    ]
+    return dumps({"projects": rows, "total": len(rows)})
+
+
+def main():
+    # before() is the old code path, from_orm included
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    media = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    projects = make_projects(count, media)
+    assert json.loads(before(projects)) == json.loads(after(projects)), "encoders disagree"
+
+    for name, encode in (("from_orm + json", before), ("RowEncoder + orjson", after)):
+        runs, total = timeit.Timer(lambda: encode(projects)).autorange()
+        per_project = min(timeit.repeat(lambda: encode(projects), number=runs, repeat=5)) / runs / count
+        print(f"{name:<22} {per_project * 1e6:8.1f} us/project")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,64 @@
+import asyncio
 from fastapi import FastAPI
-from app.db.connection import db_connection
+from app.db.connection import db_connection, ReadYourWritesMiddleware
+from app.db.sql_profiler import SqlProfilingMiddleware
 from contextlib import asynccontextmanager
+from app.config import config
 from app.services import common_services, geolocation, user, projects
+from app.services.projects.repository.project_repo import load_project_search_index
+from app.services.projects.service.facet_index_service import refresh_facet_index
+from app.services.projects.service.unit_catalog_service import refresh_unit_catalog
+from app.services.geolocation.service.geo_hierarchy_service import refresh_geo_hierarchy
+from app.utils.response_cache import RedisCacheBackend, set_shared_backend, get_shared_backend
+from app.utils import http_metrics
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup code if needed
+    metrics_flush = None
+    if http_metrics.multiprocess:
+        metrics_flush = asyncio.create_task(http_metrics.flush_metrics_periodically())
+    if config.CACHE_REDIS_URL:
+        set_shared_backend(RedisCacheBackend(config.CACHE_REDIS_URL))
+    async with db_connection.get_session() as session:
+        await refresh_geo_hierarchy(session, force=True)
+    if config.PROJECT_SEARCH_BACKEND == "memory":
+        async with db_connection.get_session() as session:
+            await load_project_search_index(session)
+    if config.FACET_INDEX_ENABLED:
+        async with db_connection.get_session() as session:
+            await refresh_facet_index(session, full=True)
+    if config.FACET_INDEX_ENABLED and config.UNIT_CATALOG_ENABLED:
+        async with db_connection.get_session() as session:
+            await refresh_unit_catalog(session, full=True)
     yield
     # shutdown code
+    if metrics_flush:
+        metrics_flush.cancel()
+        await http_metrics.retire_metrics()
+    if get_shared_backend():
+        await get_shared_backend().close()
     await db_connection.dispose()
 
 app = FastAPI(title="Reztic AI", version="1.0.0", lifespan=lifespan)
+app.add_middleware(ReadYourWritesMiddleware)
+if config.SQL_PROFILING_ENABLED:
+    app.add_middleware(SqlProfilingMiddleware)
+# outermost, so its latency covers the other middlewares too
+app.add_middleware(http_metrics.MetricsMiddleware)
 
 app.include_router(common_services.healthcheck.routers.router, prefix="/v1")
+app.include_router(common_services.metrics.routers.router)
 app.include_router(user.api.register.routers.router)
 app.include_router(user.api.auth.routers.router)
 app.include_router(common_services.upload.routers.router)
 app.include_router(projects.api.create.routers.router)
+app.include_router(projects.api.bulk_import.routers.router)
+app.include_router(projects.api.export.routers.router)
 app.include_router(projects.api.list.routers.router)
+app.include_router(projects.api.facets.routers.router)
+app.include_router(projects.api.nearby.routers.router)
+app.include_router(projects.api.clusters.routers.router)
 app.include_router(projects.api.details.routers.router)
 app.include_router(geolocation.api.routers.router)
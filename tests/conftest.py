@@ -0,0 +1,199 @@
+import os
+import random
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID
+import pytest
+from sqlalchemy.engine import make_url
+
+# Postgres for the tests running against a database, e.g.
+# postgresql+asyncpg://postgres@localhost:5432/listing_test; its tables are dropped and recreated
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+_test_db = make_url(TEST_DATABASE_URL) if TEST_DATABASE_URL else None
+
+# app.config reads these at import time; the app's own sessions go to the
+# test database when there is one
+for name, value in {
+    "DB_USERNAME": _test_db.username if _test_db else "test",
+    "DB_PASSWORD": (_test_db.password or "") if _test_db else "test",
+    "DB_HOST": _test_db.host if _test_db else "localhost",
+    "DB_PORT": str(_test_db.port or 5432) if _test_db else "5432",
+    "DB_NAME": _test_db.database if _test_db else "test",
+    "OTP_EXPIRE_MINUTES": "5",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "5",
+    "REFRESH_TOKEN_EXPIRE_DAYS": "5",
+    "SECRET_KEY": "test",
+    "ALGORITHM": "HS256",
+}.items():
+    if _test_db and name.startswith("DB_"):
+        os.environ[name] = value
+    else:
+        os.environ.setdefault(name, value)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+STAGES = ["launched", "under_construction", "presale", "completed"]
+UNIT_TYPES = ["1BHK", "2BHK", "3BHK", "studio", "penthouse"]
+BADGES = ["New Project", "5% Commission", "Hot Deal"]
+# mixed case and accents, so name order depends on the collation
+NAMES = ["alpha", "Alpha", "Éclat", "zen", "Zen", "beta", "Ω Towers", "Ananda"]
+
+
+def seed_listing(rng):
+    """
+    Groups of rows, in insert order: geo rows, developers and projects with
+    units covering every listing filter, with shared timestamps and names,
+    missing sort values, projects without units, and inactive or deleted
+    projects and units.
+    """
+    from app.services.geolocation.models.geolocation_models import Country, State, City, Area, Locality
+    from app.services.projects.models.project_models import Project, ProjectUnit, Developer
+
+    def new_id():
+        # reproducible, like everything else drawn from rng
+        return UUID(int=rng.getrandbits(128), version=4)
+
+    country = Country(id=new_id(), name="India", iso_code="IN")
+    state = State(id=new_id(), name="Karnataka", country_id=country.id)
+    city = City(id=new_id(), name="Bengaluru", state_id=state.id)
+    area = Area(id=new_id(), name="East Bengaluru", city_id=city.id)
+    localities = [
+        Locality(id=new_id(), name=name, area_id=area.id, latitude=12.9 + i / 100, longitude=77.6 + i / 100)
+        for i, name in enumerate(["Whitefield", "Lakeside", "Hoodi"])
+    ]
+    developers = [Developer(id=new_id(), name=f"Developer {i}", locality_id=localities[0].id) for i in range(4)]
+    projects, units = [], []
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(120):
+        created_at = start + timedelta(hours=rng.randint(0, 30))
+        project = Project(
+            id=new_id(),
+            developer_id=developers[i % 4].id,
+            name=f"{rng.choice(NAMES)} {i // 4}",
+            locality_id=rng.choice(localities).id,
+            development_stage=rng.choice(STAGES),
+            project_type="residential",
+            description="Seeded project",
+            property_type=rng.choice(["apartment", "villa", "plot"]),
+            is_featured=rng.random() < 0.3,
+            badges=rng.sample(BADGES, rng.randint(0, 2)),
+            possession_date=rng.choice([None, date(2027, 3, 31), date(2027, 9, 30), date(2028, 12, 1)]),
+            is_active=rng.random() < 0.92,
+            is_deleted=rng.random() < 0.05,
+            created_at=created_at,
+            updated_at=created_at + timedelta(hours=rng.choice([0, 0, 5])),
+        )
+        projects.append(project)
+        for _ in range(rng.choice([0, 1, 2, 3, 4, 6])):
+            super_area = rng.choice([None, rng.uniform(450, 3200)])
+            price = round(rng.uniform(2.5e6, 1.8e7), -3)
+            units.append(ProjectUnit(
+                id=new_id(),
+                project_id=project.id,
+                locality_id=project.locality_id,
+                unit_type=rng.choice(UNIT_TYPES),
+                carpet_area_value=(super_area or 1000) * 0.8,
+                super_area_value=super_area or 1000,
+                super_area_sqft=super_area,
+                carpet_area_sqft=super_area * 0.8 if super_area else None,
+                price_per_sqft=price / super_area if super_area else None,
+                bedrooms=rng.choice([None, 1, 2, 3, 4]),
+                balconies=rng.choice([None, 0, 1, 2]),
+                base_price=price,
+                total_price=price * 1.08,
+                total_units=12,
+                available_units=5,
+                floor_plan_media_url="https://cdn.example.com/plan.png",
+                is_active=rng.random() < 0.85,
+                is_deleted=rng.random() < 0.05,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+    return [[country], [state], [city], [area], localities, developers, projects, units]
+
+
+@pytest.fixture(scope="session")
+async def listing_db(anyio_backend):
+    """
+    Session factory over the seeded test database, with listing summaries
+    computed. Skips when TEST_DATABASE_URL is not set.
+    """
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from sqlalchemy.pool import NullPool
+    from app.db.base import Base
+    # every model, so create_all covers the tables the listing eager loads
+    from app.services.user.models import user_models, otp_models, sms_models
+    from app.services.projects.models import project_models, other_models, payment_plan_models
+    from app.services.geolocation.models import geolocation_models
+    from app.services.projects.repository.project_repo import refresh_project_listing_summary
+
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with sessionmaker() as session:
+        for rows in seed_listing(random.Random(20260101)):
+            session.add_all(rows)
+            await session.flush()
+        await refresh_project_listing_summary(None, session)
+        await session.commit()
+
+    yield sessionmaker
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def profiled_db(listing_db):
+    """
+    Session factory over the seeded database on an engine of its own with
+    the SQL profiler installed, already connected.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app.db.sql_profiler import instrument_sql
+
+    engine = create_async_engine(TEST_DATABASE_URL)
+    instrument_sql(engine)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with sessionmaker() as session:
+        await session.execute(text("SELECT 1"))
+    yield sessionmaker
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def facet_index(listing_db):
+    """
+    Facet index fully loaded from the seeded database.
+    """
+    from app.services.projects.repository.project_repo import fetch_project_facet_documents
+    from app.services.projects.search import ProjectFacetIndex
+
+    index = ProjectFacetIndex()
+    async with listing_db() as session:
+        documents, removed, index.watermark = await fetch_project_facet_documents(session)
+    assert not removed
+    for document in documents:
+        index.upsert(document)
+    return index
+
+
+@pytest.fixture
+async def api_client(listing_db):
+    """
+    HTTP client for the app, whose sessions use the seeded test database.
+    """
+    import httpx
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
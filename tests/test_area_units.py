@@ -0,0 +1,52 @@
+import pytest
+from app.services.projects.repository.project_repo import _project_row, _sqft, _unit_row
+from app.services.projects.schemas.enums import AreaUnit, SQFT_PER_AREA_UNIT
+from app.services.projects.schemas.project_schemas import ProjectBase, ProjectUnitCreate
+
+
+@pytest.mark.parametrize("value, area_unit, sqft", [
+    (1200, AreaUnit.SQFT, 1200),
+    (100, AreaUnit.SQM, 1076.39),
+    (2, AreaUnit.ACRES, 87120),
+    # project_size_unit is free text
+    (100, "sqm", 1076.39),
+    (1.5, "Acres", 65340),
+    (750, None, 750),
+    (750, "", 750),
+    (3, "hectares", None),
+    (None, AreaUnit.SQM, None),
+    (0, AreaUnit.SQM, 0),
+])
+def test_sqft(value, area_unit, sqft):
+    assert _sqft(value, area_unit) == pytest.approx(sqft)
+
+
+def test_every_area_unit_has_a_factor():
+    assert set(SQFT_PER_AREA_UNIT) == set(AreaUnit)
+
+
+@pytest.mark.parametrize("area_unit", list(AreaUnit))
+def test_unit_rows_store_sqft_and_price_per_sqft(area_unit):
+    unit = ProjectUnitCreate(
+        locality_id="6a4c1f1e-3e0b-4a8e-9a57-4f2ad1b6f0a1", unit_type="2BHK", layout_name=None,
+        carpet_area_value=80, super_area_value=100, area_unit=area_unit, bedrooms=2, balconies=1,
+        total_units=10, available_units=4, base_price=5e6, total_price=5.4e6,
+        floor_plan_media_url="https://cdn.example.com/plan.png",
+    )
+    row = _unit_row(unit)
+    factor = SQFT_PER_AREA_UNIT[area_unit]
+    assert (row["super_area_value"], row["area_unit"]) == (100, area_unit)
+    assert row["super_area_sqft"] == pytest.approx(100 * factor)
+    assert row["carpet_area_sqft"] == pytest.approx(80 * factor)
+    assert row["price_per_sqft"] == pytest.approx(5e6 / (100 * factor))
+
+
+@pytest.mark.parametrize("unit, sqft", [("acres", 87120), ("sq yards", None)])
+def test_project_rows_store_size_in_sqft(unit, sqft):
+    project = ProjectBase(
+        developer_id="0d7d6c8e-1f4b-4b51-8c43-2b6f0f6a9e10", name="Lakeside", description=None,
+        locality_id="6a4c1f1e-3e0b-4a8e-9a57-4f2ad1b6f0a1", development_stage="launched", possession_date=None,
+        rera_number=None, project_type="residential", property_type="apartment", project_size=2,
+        project_size_unit=unit,
+    )
+    assert _project_row(project)["project_size_sqft"] == pytest.approx(sqft)
@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import select
+from app.services.projects.models.project_models import Project
+from app.services.projects.repository.project_repo import filter_project_ids
+from app.services.projects.schemas.project_schemas import ProjectListFilters
+
+pytestmark = pytest.mark.anyio
+
+VIEWPORT = {"min_lat": 12.8, "min_lon": 77.5, "max_lat": 13.0, "max_lon": 77.7, "zoom": 11}
+
+
+@pytest.mark.parametrize("params, filters", [
+    ({}, {}),
+    ({"bedrooms": 2}, {"bedrooms": ["2"]}),
+    ({"bedrooms": [2, 3], "balconies": 1}, {"bedrooms": ["2", "3"], "balconies": ["1"]}),
+    ({"balconies": 0, "is_featured": "false"}, {"balconies": ["0"], "is_featured": False}),
+])
+async def test_unit_filters_from_the_query_string(listing_db, api_client, params, filters):
+    response = await api_client.get("/api/v1/projects/clusters", params={**VIEWPORT, **params})
+    assert response.status_code == 200, response.text
+
+    async with listing_db() as session:
+        project_ids = (await session.execute(select(Project.id))).scalars().all()
+        matched = await filter_project_ids(session, ProjectListFilters(**filters), project_ids)
+    clusters = response.json()["clusters"]
+    assert sum(c["count"] for c in clusters) == len(matched)
+    assert {c["project_id"] for c in clusters if c["count"] == 1} <= {str(i) for i in matched}
@@ -0,0 +1,37 @@
+from datetime import date, datetime, timezone
+from uuid import uuid4
+import pytest
+from app.utils.cursor_utils import encode_cursor, decode_cursor
+from app.utils.errors import InvalidCursorException
+
+
+@pytest.mark.parametrize("value, python_type", [
+    (datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc), datetime),
+    (date(2027, 6, 30), date),
+    ("Ålesund Heights", str),
+    (4500000.5, float),
+    (None, date),
+])
+def test_round_trip(value, python_type):
+    last_id = uuid4()
+    cursor = encode_cursor("possession_date", "asc", value, last_id)
+    assert decode_cursor(cursor, "possession_date", "asc", python_type) == (value, last_id)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor("name", "desc", "a/b+c?" * 10, uuid4())
+    assert "=" not in cursor
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+@pytest.mark.parametrize("sort_by, sort_order", [("name", "desc"), ("created_at", "asc")])
+def test_rejects_other_sort(sort_by, sort_order):
+    cursor = encode_cursor("created_at", "desc", datetime(2026, 1, 1, tzinfo=timezone.utc), uuid4())
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor, sort_by, sort_order, datetime)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "e30", encode_cursor("name", "asc", "x", uuid4())[:-6]])
+def test_rejects_malformed(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor, "name", "asc", str)
@@ -0,0 +1,212 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID, uuid4
+import pytest
+from app.services.projects.schemas.project_schemas import ProjectListFilters
+from app.services.projects.search.facet_index import ProjectFacetIndex, ProjectFacetDocument, COUNTED_FACETS
+
+STAGES = ["launched", "under_construction", "presale"]
+UNIT_TYPES = ["1BHK", "2BHK", "3BHK", "studio"]
+BADGES = ["New Project", "5% Commission", "Hot"]
+LOCALITIES = [uuid4() for _ in range(3)]
+
+
+def make_documents(count=120, seed=3):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    documents = []
+    for i in range(count):
+        possession = rng.choice([None, date(2027, 3, 31), date(2028, 12, 1), date(2028, 1, 15)])
+        documents.append(ProjectFacetDocument(
+            id=uuid4(),
+            facets={
+                "development_stage": {rng.choice(STAGES)},
+                "project_type": {"residential"},
+                "property_type": {rng.choice(["apartment", "villa"])},
+                "is_featured": {rng.random() < 0.3},
+                "possession_year": {possession.year if possession else None},
+                "locality_id": {rng.choice(LOCALITIES)},
+                "developer_id": {uuid4()},
+                "badges": set(rng.sample(BADGES, rng.randint(0, 2))),
+                "unit_type": set(rng.sample(UNIT_TYPES, rng.randint(0, 3))),
+                "bedrooms": set(rng.sample([1, 2, 3], rng.randint(0, 2))),
+                "balconies": set(rng.sample([0, 1, 2], rng.randint(0, 2))),
+            },
+            sort_values={
+                # a few share a timestamp, so the id decides
+                "created_at": start + timedelta(minutes=rng.randint(0, 40)),
+                "name": rng.choice(["Zen", "alpha", "Éclat", "Alpha", "beta", "Ω Towers"]),
+                "possession_date": possession,
+                "starting_price": rng.choice([None, 4500000.0, 6200000.0, rng.uniform(3e6, 9e6)]),
+            },
+        ))
+    return documents
+
+
+def make_index(documents):
+    index = ProjectFacetIndex()
+    for document in documents:
+        index.upsert(ProjectFacetDocument(document.id, {k: set(v) for k, v in document.facets.items()},
+                                          dict(document.sort_values)))
+    return index
+
+
+def matches(document, filters: ProjectListFilters, exclude=()):
+    facets = document.facets
+    single = {
+        "development_stage": filters.development_stage, "project_type": filters.project_type,
+        "property_type": filters.property_type, "is_featured": filters.is_featured,
+        "possession_year": filters.possession_date, "locality_id": filters.locality_id,
+    }
+    for facet, value in single.items():
+        if value is not None and facet not in exclude and getattr(value, "value", value) not in facets[facet]:
+            return False
+    for facet in ("unit_type", "bedrooms", "balconies"):
+        values = getattr(filters, facet)
+        if values and facet not in exclude:
+            if not facets[facet] & {int(v) if facet != "unit_type" else v.value for v in values}:
+                return False
+    if filters.badges and "badges" not in exclude and not set(filters.badges) <= facets["badges"]:
+        return False
+    return True
+
+
+FILTERS = [
+    {},
+    {"development_stage": "launched"},
+    {"is_featured": True, "property_type": "villa"},
+    {"is_featured": False},
+    {"possession_date": 2028, "badges": ["Hot"]},
+    {"badges": ["Hot", "New Project"]},
+    {"unit_type": ["2BHK", "studio"]},
+    {"bedrooms": ["2", "3"], "locality_id": str(LOCALITIES[0])},
+    {"development_stage": "completed"},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_resolve_and_counts_match_brute_force(filters):
+    documents = make_documents()
+    index = make_index(documents)
+    filters = ProjectListFilters(**filters)
+
+    total, counts = index.facet_counts(filters)
+    assert total == sum(matches(d, filters) for d in documents)
+    for facet, field in COUNTED_FACETS.items():
+        expected = {}
+        for document in documents:
+            if matches(document, filters, exclude=[facet]):
+                for value in document.facets[facet]:
+                    if value is not None:
+                        expected[value] = expected.get(value, 0) + 1
+        assert counts[facet] == expected, facet
+
+    ids = [d.id for d in reversed(documents)]
+    assert index.matching(filters, ids) == [d.id for d in reversed(documents) if matches(d, filters)]
+
+
+def expected_order(documents, sort_key, descending):
+    def key(document):
+        return document.sort_values.get(sort_key), document.id.bytes
+
+    present = sorted((d for d in documents if d.sort_values.get(sort_key) is not None), key=key, reverse=descending)
+    missing = sorted((d for d in documents if d.sort_values.get(sort_key) is None),
+                     key=lambda d: d.id.bytes, reverse=descending)
+    return [d.id for d in present + missing]
+
+
+@pytest.mark.parametrize("sort_key", ["created_at", "name", "possession_date", "starting_price", "updated_at"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_pages_follow_the_listing_order(sort_key, sort_order):
+    documents = make_documents()
+    index = make_index(documents)
+    filters = ProjectListFilters(sort_order=sort_order, is_featured=False)
+    matched = [d for d in documents if matches(d, filters)]
+    expected = expected_order(matched, sort_key, sort_order == "desc")
+
+    pages = []
+    for offset in range(0, len(expected) + 7, 7):
+        page, total, last_value = index.select(filters, sort_key, offset, 7)
+        assert total == len(expected)
+        if page:
+            assert last_value == next(d for d in documents if d.id == page[-1]).sort_values.get(sort_key)
+        pages.extend(page)
+    assert pages == expected
+
+
+def test_names_sort_by_code_point():
+    index = ProjectFacetIndex()
+    names = ["beta", "Éclat", "Alpha", "alpha", "Zen"]
+    ids = {name: uuid4() for name in names}
+    for name in names:
+        index.upsert(ProjectFacetDocument(ids[name], {"is_featured": {False}}, {"name": name}))
+    page, _, _ = index.select(ProjectListFilters(sort_order="asc"), "name", 0, 10)
+    assert page == [ids[name] for name in ["Alpha", "Zen", "alpha", "beta", "Éclat"]]
+
+
+def test_ties_break_on_uuid_bytes():
+    index = ProjectFacetIndex()
+    ids = [UUID(int=i << 120) for i in (3, 1, 2)] + [UUID("0" * 31 + "f")]
+    for project_id in ids:
+        index.upsert(ProjectFacetDocument(project_id, {}, {"created_at": datetime(2026, 1, 1, tzinfo=timezone.utc)}))
+    page, _, _ = index.select(ProjectListFilters(sort_order="asc"), "created_at", 0, 10)
+    assert page == sorted(ids, key=lambda i: i.bytes)
+    page, _, _ = index.select(ProjectListFilters(), "created_at", 0, 10)
+    assert page == sorted(ids, key=lambda i: i.bytes, reverse=True)
+
+
+def test_upsert_replaces_and_remove_frees_slot():
+    documents = make_documents(10)
+    index = make_index(documents)
+    first = documents[0]
+    index.upsert(ProjectFacetDocument(first.id, {"development_stage": {"completed"}, "badges": {"Hot"}},
+                                      {"created_at": first.sort_values["created_at"]}))
+    filters = ProjectListFilters(development_stage="completed")
+    assert index.select(filters, "created_at", 0, 10)[:2] == ([first.id], 1)
+    assert len(index) == 10
+
+    index.remove(first.id)
+    index.remove(first.id)
+    assert len(index) == 9
+    assert index.facet_counts(filters)[0] == 0
+    assert index.facet_counts(ProjectListFilters())[0] == 9
+
+    # a new project reuses the freed slot without inheriting its bits
+    newcomer = ProjectFacetDocument(uuid4(), {"development_stage": {"presale"}}, {})
+    index.upsert(newcomer)
+    assert index.matching(ProjectListFilters(badges=["Hot"]), [newcomer.id]) == []
+    assert index.matching(ProjectListFilters(development_stage="presale"), [newcomer.id]) == [newcomer.id]
+
+
+def test_grows_past_initial_capacity():
+    documents = make_documents(300)
+    index = make_index(documents)
+    filters = ProjectListFilters(unit_type=["3BHK"])
+    assert index.facet_counts(filters)[0] == sum(matches(d, filters) for d in documents)
+
+
+@pytest.mark.parametrize("filters, supported, with_unit_matches", [
+    ({}, True, True),
+    ({"unit_type": ["2BHK"]}, True, True),
+    ({"unit_type": ["2BHK"], "bedrooms": ["2"]}, False, True),
+    ({"min_price": 1}, False, True),
+    ({"min_area": 0}, False, True),
+    ({"max_price_per_sqft": 9000}, False, True),
+    ({"search": "lake"}, False, False),
+    ({"cursor": "abc"}, False, False),
+])
+def test_supports(filters, supported, with_unit_matches):
+    index = ProjectFacetIndex()
+    filters = ProjectListFilters(**filters)
+    assert index.supports(filters) is supported
+    assert index.supports(filters, unit_matches=True) is with_unit_matches
+
+
+def test_unit_matches_replace_unit_facets():
+    documents = make_documents()
+    index = make_index(documents)
+    chosen = {d.id for d in documents[:20]}
+    filters = ProjectListFilters(unit_type=["2BHK"], bedrooms=["3"], is_featured=False)
+    page, total, _ = index.select(filters, "created_at", 0, 200, unit_matches=chosen)
+    assert set(page) == {d.id for d in documents[:20] if False in d.facets["is_featured"]}
+    assert total == len(page)
@@ -0,0 +1,109 @@
+"""
+The facet index must answer exactly like the SQL listing: same ids in the
+same order on every page, same totals and facet counts, and cursors either
+path can continue.
+"""
+import pytest
+from sqlalchemy import select, update
+from app.services.projects.models.project_models import Project
+from app.services.projects.repository.project_repo import fetch_projects, fetch_facet_counts, \
+    fetch_project_facet_documents, filter_project_ids, resolve_sort_key
+from app.services.projects.schemas.project_schemas import ProjectListFilters
+from app.utils.cursor_utils import encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+PAGE_SIZE = 7
+SORTS = [
+    (sort_by, sort_order)
+    for sort_by in ("created_at", "updated_at", "name", "possession_date", "starting_price", "super_area",
+                    "price_per_sqft")
+    for sort_order in ("asc", "desc")
+]
+# every filter combination the index answers alone
+FILTERS = [
+    {},
+    {"development_stage": "launched"},
+    {"is_featured": True},
+    {"is_featured": False, "property_type": "villa"},
+    {"possession_date": 2027},
+    {"badges": ["Hot Deal"]},
+    {"badges": ["Hot Deal", "New Project"]},
+    {"unit_type": ["2BHK", "studio"]},
+    {"bedrooms": ["3"]},
+    {"balconies": ["0", "2"], "development_stage": "presale"},
+    {"development_stage": "completed", "possession_date": 2020},
+]
+
+
+def index_page(index, filters: ProjectListFilters):
+    # what ProjectService._select_from_facet_index serves
+    sort_key = resolve_sort_key(filters)
+    ids, total, last_value = index.select(filters, sort_key, (filters.page - 1) * filters.limit, filters.limit)
+    next_cursor = None
+    if len(ids) == filters.limit:
+        next_cursor = encode_cursor(sort_key, filters.sort_order, last_value, ids[-1])
+    return ids, total, next_cursor
+
+
+@pytest.mark.parametrize("sort_by, sort_order", SORTS)
+async def test_offset_pages_match_sql(listing_db, facet_index, sort_by, sort_order):
+    async with listing_db() as session:
+        for filters in FILTERS:
+            page = 1
+            while True:
+                filters_page = ProjectListFilters(
+                    **filters, sort_by=sort_by, sort_order=sort_order, page=page, limit=PAGE_SIZE
+                )
+                assert facet_index.supports(filters_page)
+                projects, total, next_cursor = await fetch_projects(session, filters_page)
+                assert index_page(facet_index, filters_page) == ([p.id for p in projects], total, next_cursor), \
+                    (filters, page)
+                if len(projects) < PAGE_SIZE:
+                    break
+                page += 1
+
+
+@pytest.mark.parametrize("sort_by, sort_order", SORTS)
+async def test_sql_cursor_continues_index_pages(listing_db, facet_index, sort_by, sort_order):
+    async with listing_db() as session:
+        for filters in FILTERS:
+            base = ProjectListFilters(**filters, sort_by=sort_by, sort_order=sort_order, limit=PAGE_SIZE)
+            expected, total, _ = facet_index.select(base, resolve_sort_key(base), 0, 1000)
+
+            # the first page from the index, every later one from Postgres by cursor
+            seen, _, cursor = index_page(facet_index, base)
+            while cursor:
+                projects, _, cursor = await fetch_projects(session, base.model_copy(update={"cursor": cursor}))
+                seen.extend(p.id for p in projects)
+            assert seen == expected, filters
+            assert len(seen) == total
+
+
+@pytest.mark.parametrize("filters", FILTERS + [
+    {"unit_type": ["penthouse"], "is_featured": True},
+    {"development_stage": "under_construction", "badges": ["5% Commission"], "possession_date": 2028},
+])
+async def test_facet_counts_match_sql(listing_db, facet_index, filters):
+    filters = ProjectListFilters(**filters)
+    async with listing_db() as session:
+        assert facet_index.facet_counts(filters) == await fetch_facet_counts(session, filters)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+async def test_matching_matches_sql(listing_db, facet_index, filters):
+    filters = ProjectListFilters(**filters)
+    async with listing_db() as session:
+        project_ids = (await session.execute(select(Project.id).order_by(Project.name))).scalars().all()
+        matched = await filter_project_ids(session, filters, project_ids)
+    assert facet_index.matching(filters, project_ids) == [i for i in project_ids if i in matched]
+
+
+async def test_incremental_refresh_drops_unlisted_projects(listing_db, facet_index):
+    async with listing_db() as session:
+        project_id = facet_index.select(ProjectListFilters(), "created_at", 0, 1)[0][0]
+        await session.execute(update(Project).where(Project.id == project_id).values(is_active=False))
+        documents, removed, watermark = await fetch_project_facet_documents(session, facet_index.watermark)
+        await session.rollback()
+    assert (documents, removed) == ([], [project_id])
+    assert watermark > facet_index.watermark
@@ -0,0 +1,88 @@
+from uuid import uuid4
+from app.services.geolocation.hierarchy import GeoHierarchy
+from app.services.geolocation.hierarchy.prefix_index import PrefixIndex, normalize, NAME_PREFIX, WORD_PREFIX
+
+INDIA, KARNATAKA, MAHARASHTRA = uuid4(), uuid4(), uuid4()
+BENGALURU, PUNE = uuid4(), uuid4()
+ELECTRONIC_CITY, EAST = uuid4(), uuid4()
+PHASE_1, CITY_CENTRE, HINJEWADI = uuid4(), uuid4(), uuid4()
+
+
+def make_hierarchy():
+    hierarchy = GeoHierarchy()
+    hierarchy.build({
+        "country": [(INDIA, "India", None)],
+        "state": [(KARNATAKA, "Karnataka", INDIA), (MAHARASHTRA, "Maharashtra", INDIA)],
+        "city": [(BENGALURU, "Bengaluru", KARNATAKA), (PUNE, "Pune", MAHARASHTRA)],
+        "area": [(ELECTRONIC_CITY, "Electronic City", BENGALURU), (EAST, "Pune East", PUNE)],
+        "locality": [
+            (PHASE_1, "Electronic City Phase 1", ELECTRONIC_CITY, None, None),
+            (CITY_CENTRE, "City Centre", ELECTRONIC_CITY, None, None),
+            (HINJEWADI, "Hinjewadi", EAST, None, None),
+        ],
+    })
+    return hierarchy
+
+
+def test_normalize_folds_case_accents_and_spacing():
+    assert normalize("  Électronic   CITY ") == "electronic city"
+
+
+def test_prefix_index_matches_word_starts():
+    index = PrefixIndex()
+    index.build([(PHASE_1, "Electronic City Phase 1"), (CITY_CENTRE, "City Centre")])
+    assert index.search("city") == {PHASE_1: (1, WORD_PREFIX), CITY_CENTRE: (1, NAME_PREFIX)}
+    assert index.search("city centre") == {CITY_CENTRE: (0, NAME_PREFIX)}
+    assert index.search("ity") == {}
+    assert index.search("") == {}
+
+
+def test_autocomplete_ranks_exact_then_name_prefix_then_shorter():
+    hierarchy = make_hierarchy()
+    nodes, total = hierarchy.autocomplete("city centre")
+    assert [node.id for node in nodes] == [CITY_CENTRE] and total == 1
+
+    nodes, total = hierarchy.autocomplete("electronic")
+    assert [node.id for node in nodes] == [ELECTRONIC_CITY, PHASE_1] and total == 2
+
+    nodes, total = hierarchy.autocomplete("city")
+    assert [node.id for node in nodes] == [CITY_CENTRE, ELECTRONIC_CITY, PHASE_1] and total == 3
+
+
+def test_autocomplete_pages_and_skips_unsuggested_levels():
+    hierarchy = make_hierarchy()
+    # countries and states are not offered
+    assert hierarchy.autocomplete("india") == ([], 0)
+    for query in ("ci", "city"):
+        first, total = hierarchy.autocomplete(query, limit=2)
+        rest, _ = hierarchy.autocomplete(query, offset=2, limit=2)
+        assert [node.id for node in first + rest] == [CITY_CENTRE, ELECTRONIC_CITY, PHASE_1]
+        assert total == 3
+
+
+def test_autocomplete_within_subtrees():
+    hierarchy = make_hierarchy()
+    nodes, total = hierarchy.autocomplete("pune", within=[{MAHARASHTRA}])
+    assert [node.id for node in nodes] == [PUNE, EAST] and total == 2
+    assert hierarchy.autocomplete("pune", within=[{KARNATAKA}]) == ([], 0)
+    # every set must match
+    assert hierarchy.autocomplete("hin", within=[{PUNE}, {KARNATAKA}]) == ([], 0)
+    nodes, _ = hierarchy.autocomplete("hin", within=[{PUNE}, {EAST, KARNATAKA}])
+    assert [node.id for node in nodes] == [HINJEWADI]
+
+
+def test_broad_rankings_reset_on_rebuild():
+    hierarchy = make_hierarchy()
+    assert hierarchy.autocomplete("hin")[1] == 1
+    hierarchy.build({"country": [(INDIA, "India", None)]})
+    assert hierarchy.autocomplete("hin") == ([], 0)
+
+
+def test_localities_by_name_within_subtrees():
+    hierarchy = make_hierarchy()
+    nodes, total = hierarchy.localities()
+    assert [node.id for node in nodes] == [CITY_CENTRE, PHASE_1, HINJEWADI] and total == 3
+    nodes, total = hierarchy.localities(within=[{BENGALURU}], offset=1, limit=1)
+    assert [node.id for node in nodes] == [PHASE_1] and total == 2
+    assert hierarchy.localities(within=[{HINJEWADI}]) == ([hierarchy.get(HINJEWADI)], 1)
+    assert hierarchy.localities(within=[{PUNE}, {ELECTRONIC_CITY}]) == ([], 0)
@@ -0,0 +1,60 @@
+from decimal import Decimal
+from uuid import uuid4
+from app.services.geolocation.hierarchy import GeoHierarchy
+
+INDIA, KARNATAKA, BENGALURU, EAST, WHITEFIELD, ITPL = (uuid4() for _ in range(6))
+ORPHAN_AREA, ORPHAN_LOCALITY = uuid4(), uuid4()
+
+ROWS = {
+    "country": [(INDIA, "India", None)],
+    "state": [(KARNATAKA, "Karnataka", INDIA)],
+    "city": [(BENGALURU, "Bengaluru", KARNATAKA)],
+    "area": [(EAST, "East Bengaluru", BENGALURU), (ORPHAN_AREA, "Nowhere", uuid4())],
+    "locality": [
+        (WHITEFIELD, "Whitefield", EAST, Decimal("12.969800"), Decimal("77.749900")),
+        (ITPL, "ITPL", EAST, None, None),
+        (ORPHAN_LOCALITY, "Lost", ORPHAN_AREA, None, None),
+    ],
+}
+
+
+def make_hierarchy():
+    hierarchy = GeoHierarchy()
+    hierarchy.build(ROWS)
+    return hierarchy
+
+
+def test_nodes_carry_ancestors_and_full_address():
+    hierarchy = make_hierarchy()
+    whitefield = hierarchy.locality(WHITEFIELD)
+    assert whitefield.full_address == "Whitefield, East Bengaluru, Bengaluru, Karnataka, India"
+    assert whitefield.ancestor_ids == (INDIA, KARNATAKA, BENGALURU, EAST)
+    assert (whitefield.latitude, whitefield.longitude) == (12.9698, 77.7499)
+    assert [node.name for node in hierarchy.ancestors(WHITEFIELD)] == [
+        "India", "Karnataka", "Bengaluru", "East Bengaluru",
+    ]
+    assert hierarchy.get(INDIA).full_address == "India"
+    assert hierarchy.locality(ITPL).latitude is None
+
+
+def test_children_and_levels():
+    hierarchy = make_hierarchy()
+    assert {node.id for node in hierarchy.children(EAST)} == {WHITEFIELD, ITPL}
+    assert {node.id for node in hierarchy.nodes("locality")} == {WHITEFIELD, ITPL}
+    # only localities resolve as localities
+    assert hierarchy.locality(EAST) is None
+
+
+def test_rows_without_parent_are_dropped_with_their_subtree():
+    hierarchy = make_hierarchy()
+    assert hierarchy.get(ORPHAN_AREA) is None
+    assert hierarchy.get(ORPHAN_LOCALITY) is None
+    assert len(hierarchy) == 6
+
+
+def test_rebuild_replaces_the_tree():
+    hierarchy = make_hierarchy()
+    hierarchy.build({"country": [(INDIA, "India", None)]})
+    assert len(hierarchy) == 1
+    assert hierarchy.locality(WHITEFIELD) is None
+    assert hierarchy.loaded
@@ -0,0 +1,74 @@
+import math
+import random
+from uuid import uuid4
+import numpy as np
+import pytest
+from app.services.projects.search.geo_index import ProjectGeoIndex, haversine_km
+
+
+def make_points(count=500, seed=7):
+    rng = random.Random(seed)
+    ids = [uuid4() for _ in range(count)]
+    # around Bengaluru, with a few points sharing a locality's coordinates
+    lats = [12.8 + rng.random() * 0.4 for _ in range(count)]
+    lons = [77.4 + rng.random() * 0.4 for _ in range(count)]
+    for i in range(0, count, 50):
+        lats[i + 1], lons[i + 1] = lats[i], lons[i]
+    return ids, lats, lons
+
+
+def make_index(cell_degrees=0.05):
+    ids, lats, lons = make_points()
+    index = ProjectGeoIndex(cell_degrees)
+    index.build(ids, lats, lons)
+    return index, ids, np.array(lats), np.array(lons)
+
+
+def test_haversine_matches_known_distance():
+    # Bengaluru to Chennai, about 290 km
+    distance = haversine_km(12.9716, 77.5946, np.array([13.0827]), np.array([80.2707]))[0]
+    assert distance == pytest.approx(290.2, abs=0.5)
+    assert haversine_km(10, 20, np.array([10.0]), np.array([20.0]))[0] == 0
+
+
+@pytest.mark.parametrize("lat, lon, radius_km", [(13.0, 77.6, 5), (12.81, 77.41, 12), (13.0, 77.6, 60), (20.0, 70.0, 5)])
+def test_within_radius_matches_brute_force(lat, lon, radius_km):
+    index, ids, lats, lons = make_index()
+    distances = haversine_km(lat, lon, lats, lons)
+    expected = {ids[i] for i in np.flatnonzero(distances <= radius_km)}
+
+    found, found_distances = index.within_radius(lat, lon, radius_km)
+    assert set(found) == expected
+    assert len(found) == len(expected)
+    assert list(found_distances) == sorted(found_distances)
+    by_id = dict(zip(ids, distances))
+    assert found_distances == pytest.approx([by_id[i] for i in found])
+
+
+@pytest.mark.parametrize("box", [(12.9, 77.5, 13.0, 77.55), (12.0, 77.0, 14.0, 78.0), (12.95, 77.61, 12.95, 77.61)])
+def test_within_bbox_matches_brute_force(box):
+    index, ids, lats, lons = make_index()
+    min_lat, min_lon, max_lat, max_lon = box
+    inside = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+    found, distances = index.within_bbox(*box)
+    assert set(found) == {ids[i] for i in np.flatnonzero(inside)}
+    assert list(distances) == sorted(distances)
+
+    found, distances = index.within_bbox(*box, lat=min_lat, lon=min_lon)
+    assert list(distances) == sorted(distances)
+
+
+def test_box_edges_are_inclusive():
+    index = ProjectGeoIndex(0.1)
+    a, b = uuid4(), uuid4()
+    index.build([a, b], [12.5, 12.6], [77.5, 77.6])
+    assert set(index.within_bbox(12.5, 77.5, 12.6, 77.6)[0]) == {a, b}
+
+
+def test_build_bumps_version():
+    index = ProjectGeoIndex()
+    found, distances = index.within_radius(0, 0, 10)
+    assert found == [] and len(distances) == 0
+    index.build([], [], [])
+    index.build([uuid4()], [math.pi], [math.e])
+    assert index.version == 2 and len(index) == 1
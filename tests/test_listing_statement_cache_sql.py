@@ -0,0 +1,82 @@
+"""
+fetch_projects compiles one statement per filter shape: filter sets that
+differ only in values share it, and the SQL text sent to Postgres, while
+other shapes get statements of their own.
+"""
+import pytest
+from sqlalchemy import event, select
+from app.services.projects.models.project_models import Project
+from app.services.projects.repository.project_repo import fetch_projects, filter_project_ids, \
+    listing_statement_cache, listing_statement_lookups, project_count_cache
+from app.services.projects.schemas.project_schemas import ProjectListFilters
+
+pytestmark = pytest.mark.anyio
+
+SAME_SHAPE = [
+    {"development_stage": "launched", "min_price": 5e6, "unit_type": ["2BHK"]},
+    {"development_stage": "presale", "min_price": 8e6, "unit_type": ["studio"]},
+    {"development_stage": "completed", "min_price": 3e6, "unit_type": ["1BHK"]},
+]
+OTHER_SHAPES = [
+    {"development_stage": "launched", "max_price": 5e6, "unit_type": ["2BHK"]},
+    {"development_stage": "launched", "min_price": 5e6, "unit_type": ["2BHK"], "is_featured": True},
+    {"development_stage": "launched", "min_price": 5e6, "unit_type": ["2BHK"], "sort_by": "name"},
+]
+
+
+@pytest.fixture
+def listing_sql(listing_db):
+    """
+    Collects the SQL of every listing statement sent to Postgres.
+    """
+    listing_statement_cache.clear()
+    project_count_cache.clear()
+    engine = listing_db.kw["bind"].sync_engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "sort_value" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+    listing_statement_cache.clear()
+
+
+async def fetch_matches(session, filters):
+    filters = ProjectListFilters(**filters, limit=100)
+    projects, total, _ = await fetch_projects(session, filters)
+    project_ids = (await session.execute(select(Project.id))).scalars().all()
+    expected = await filter_project_ids(session, filters, project_ids)
+    assert {p.id for p in projects} == expected and total == len(expected)
+    return [p.id for p in projects]
+
+
+def lookups():
+    return listing_statement_lookups.value("hit"), listing_statement_lookups.value("miss")
+
+
+async def test_same_shape_reuses_one_statement(listing_db, listing_sql):
+    hits, misses = lookups()
+    async with listing_db() as session:
+        results = [await fetch_matches(session, filters) for filters in SAME_SHAPE]
+
+    assert len(listing_statement_cache) == 1
+    assert lookups() == (hits + 2, misses + 1)
+    assert len(set(listing_sql)) == 1
+    # the values still went in: each filter set got its own projects
+    assert len({tuple(ids) for ids in results}) == len(SAME_SHAPE)
+
+
+async def test_other_shapes_do_not_collide(listing_db, listing_sql):
+    hits, misses = lookups()
+    async with listing_db() as session:
+        for filters in SAME_SHAPE[:1] + OTHER_SHAPES:
+            await fetch_matches(session, filters)
+        # and back to the first shape, still correct
+        await fetch_matches(session, SAME_SHAPE[1])
+
+    assert len(listing_statement_cache) == 1 + len(OTHER_SHAPES)
+    assert lookups() == (hits + 1, misses + 1 + len(OTHER_SHAPES))
+    assert len(set(listing_sql)) == 1 + len(OTHER_SHAPES)
@@ -0,0 +1,31 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+# the seeded localities, all in East Bengaluru, Bengaluru
+LOCALITIES = ["Hoodi", "Lakeside", "Whitefield"]
+
+
+async def get_localities(api_client, **params):
+    response = await api_client.get("/api/v1/localities", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_lists_localities_by_name_and_pages(api_client):
+    body = await get_localities(api_client, city_name="bengaluru", area_name="East Bengaluru")
+    assert [r["name"] for r in body["results"]] == LOCALITIES and body["total"] == 3
+    assert body["results"][0]["full_address"] == "Hoodi, East Bengaluru, Bengaluru, Karnataka, India"
+
+    body = await get_localities(api_client, page=2, limit=2)
+    assert [r["name"] for r in body["results"]] == LOCALITIES[2:]
+    assert (body["total"], body["page"], body["limit"]) == (3, 2, 2)
+
+
+async def test_filters_by_locality_id_and_names(api_client):
+    whitefield = (await get_localities(api_client, page=3, limit=1))["results"][0]
+    body = await get_localities(api_client, locality_id=whitefield["id"])
+    assert [r["id"] for r in body["results"]] == [whitefield["id"]]
+
+    assert (await get_localities(api_client, city_name="Pune"))["total"] == 0
+    assert (await get_localities(api_client, area_name="East Bengaluru", locality_id=whitefield["id"]))["total"] == 1
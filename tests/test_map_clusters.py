@@ -0,0 +1,67 @@
+import random
+from uuid import uuid4
+import pytest
+from app.services.projects.search.geo_index import ProjectGeoIndex, tile_bbox, tile_range, MAX_TILE_LATITUDE
+
+
+def make_index(prices=None, count=500, seed=11):
+    rng = random.Random(seed)
+    ids = [uuid4() for _ in range(count)]
+    index = ProjectGeoIndex(0.05)
+    index.build(ids, [12.8 + rng.random() * 0.4 for _ in ids], [77.4 + rng.random() * 0.4 for _ in ids], prices)
+    return index, ids
+
+
+def test_world_tile():
+    min_lat, min_lon, max_lat, max_lon = tile_bbox(0, 0, 0)
+    assert (min_lon, max_lon) == (-180, 180)
+    assert max_lat == pytest.approx(MAX_TILE_LATITUDE) and min_lat == pytest.approx(-MAX_TILE_LATITUDE)
+    assert tile_range(-90, -180, 90, 180, 0) == (range(0, 1), range(0, 1))
+
+
+@pytest.mark.parametrize("zoom", [1, 5, 12])
+def test_tiles_cover_their_box_and_round_trip(zoom):
+    box = (12.9, 77.5, 13.05, 77.7)
+    xs, ys = tile_range(*box, zoom)
+    min_lat, min_lon, _, _ = tile_bbox(zoom, xs[0], ys[-1])
+    _, _, max_lat, max_lon = tile_bbox(zoom, xs[-1], ys[0])
+    assert min_lat <= box[0] and min_lon <= box[1] and max_lat >= box[2] and max_lon >= box[3]
+
+    for x in xs:
+        for y in ys:
+            tile_min_lat, tile_min_lon, tile_max_lat, tile_max_lon = tile_bbox(zoom, x, y)
+            center = ((tile_min_lat + tile_max_lat) / 2, (tile_min_lon + tile_max_lon) / 2)
+            assert tile_range(*center, *center, zoom) == (range(x, x + 1), range(y, y + 1))
+
+
+def test_neighbouring_tiles_share_edges():
+    _, _, _, east_edge = tile_bbox(10, 700, 400)
+    _, west_edge, _, _ = tile_bbox(10, 701, 400)
+    bottom, _, _, _ = tile_bbox(10, 700, 400)
+    _, _, top, _ = tile_bbox(10, 700, 401)
+    assert east_edge == west_edge and bottom == top
+
+
+def test_clusters_partition_points():
+    index, ids = make_index(prices=[float(i) for i in range(500)])
+    box = (12.8, 77.4, 13.2, 77.8)
+    halves = [(12.8, 77.4, 13.2, 77.6), (12.8, 77.6, 13.2, 77.8)]
+
+    clusters = index.clusters(*box, grid=4)
+    assert sum(c["count"] for c in clusters) == len(ids)
+    assert min(c["min_starting_price"] for c in clusters) == 0.0
+    # adjacent boxes never share a point
+    assert sum(c["count"] for half in halves for c in index.clusters(*half, grid=4)) == len(ids)
+    for cluster in clusters:
+        assert box[0] <= cluster["lat"] <= box[2] and box[1] <= cluster["lon"] <= box[3]
+        assert (cluster["project_id"] is not None) == (cluster["count"] == 1)
+
+
+def test_clusters_restricted_to_allowed():
+    index, ids = make_index()
+    allowed = set(ids[:3])
+    clusters = index.clusters(12.8, 77.4, 13.2, 77.8, grid=64, allowed=allowed)
+    assert sum(c["count"] for c in clusters) == 3
+    assert {c["project_id"] for c in clusters if c["count"] == 1} <= allowed
+    assert all(c["min_starting_price"] is None for c in clusters)
+    assert index.clusters(12.8, 77.4, 13.2, 77.8, allowed=set()) == []
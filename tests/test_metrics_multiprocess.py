@@ -0,0 +1,149 @@
+import asyncio
+import os
+import threading
+import pytest
+from app.config import config
+from app.utils import http_metrics
+from app.utils.metrics import MetricsRegistry, MultiprocessCollector
+
+pytestmark = pytest.mark.anyio
+
+STALE_SECONDS = 60
+
+
+class Worker:
+    """
+    One server process: its registry and collector, under a pid of its own.
+    """
+
+    def __init__(self, directory, pid):
+        self.registry = MetricsRegistry()
+        self.requests = self.registry.counter("requests", "Requests.", ["route"])
+        self.latency = self.registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        self.in_flight = self.registry.gauge("in_flight", "In flight.")
+        self.collector = MultiprocessCollector(str(directory), STALE_SECONDS)
+        self.collector.path = os.path.join(directory, f"{pid}.json")
+
+    def serve(self, count, seconds=0.05):
+        for _ in range(count):
+            self.requests.inc("/projects")
+            self.latency.observe(seconds)
+        self.in_flight.set(count)
+
+    def flush(self):
+        self.collector.flush(self.registry.snapshot())
+
+    def scrape(self):
+        metrics = {metric.name: metric for metric in self.collector.collect(self.registry.snapshot())}
+        return (
+            metrics["requests"].value("/projects"),
+            metrics["latency_seconds"].count(),
+            metrics["in_flight"].value() if "in_flight" in metrics else 0,
+        )
+
+    def go_stale(self):
+        past = os.path.getmtime(self.collector.path) - STALE_SECONDS - 1
+        os.utime(self.collector.path, (past, past))
+
+
+def test_scrapes_sum_every_worker(tmp_path):
+    a, b = Worker(tmp_path, 101), Worker(tmp_path, 102)
+    a.serve(3)
+    a.flush()
+    b.serve(2)
+    assert b.scrape() == (5, 5, 5)
+
+
+def test_stale_worker_is_folded_and_keeps_counting(tmp_path):
+    a, b = Worker(tmp_path, 101), Worker(tmp_path, 102)
+    a.serve(3)
+    a.flush()
+    b.serve(2)
+    a.go_stale()
+
+    # counters and histograms stay, the stale gauge goes
+    assert b.scrape() == (5, 5, 2)
+    assert not os.path.exists(a.collector.path)
+
+    # a was only slow: it writes what it counted since the fold
+    a.serve(4)
+    a.flush()
+    assert b.scrape() == (9, 9, 6)
+    assert a.scrape() == (9, 9, 6)
+
+
+def test_reused_pid_folds_the_dead_process_snapshot(tmp_path):
+    dead = Worker(tmp_path, 101)
+    dead.serve(7)
+    dead.flush()
+
+    # a new process under the same pid starts from zero
+    reborn = Worker(tmp_path, 101)
+    reborn.serve(1)
+    assert reborn.scrape() == (8, 8, 1)
+    reborn.serve(1)
+    assert reborn.scrape() == (9, 9, 1)
+
+
+def test_counters_never_decrease_across_restarts(tmp_path):
+    scraper = Worker(tmp_path, 100)
+    seen = []
+    for generation in range(4):
+        worker = Worker(tmp_path, 200 + generation % 2)
+        for _ in range(3):
+            worker.serve(2)
+            worker.flush()
+            seen.append(scraper.scrape()[:2])
+        if generation % 2:
+            worker.go_stale()
+        else:
+            worker.collector.retire(worker.registry.snapshot())
+        seen.append(scraper.scrape()[:2])
+    assert seen == sorted(seen)
+    assert seen[-1] == (24, 24)
+
+
+def test_flush_after_retire_counts_nothing(tmp_path):
+    a, b = Worker(tmp_path, 101), Worker(tmp_path, 102)
+    a.serve(3)
+    a.collector.retire(a.registry.snapshot())
+    a.serve(1)
+    a.flush()
+    assert b.scrape() == (3, 3, 0)
+
+
+@pytest.fixture
+def multiprocess(tmp_path, monkeypatch):
+    worker = Worker(tmp_path, 101)
+    monkeypatch.setattr(http_metrics, "registry", worker.registry)
+    monkeypatch.setattr(http_metrics, "multiprocess", worker.collector)
+    monkeypatch.setattr(config, "METRICS_FLUSH_SECONDS", 0.01)
+
+    threads = []
+    write = MultiprocessCollector._write
+    monkeypatch.setattr(
+        MultiprocessCollector, "_write",
+        staticmethod(lambda path, snapshot: (threads.append(threading.get_ident()), write(path, snapshot))),
+    )
+    worker.threads = threads
+    return worker
+
+
+async def test_periodic_flush_writes_from_a_thread(multiprocess):
+    multiprocess.serve(2)
+    flush = asyncio.create_task(http_metrics.flush_metrics_periodically())
+    while not multiprocess.threads:
+        await asyncio.sleep(0.01)
+    flush.cancel()
+
+    assert threading.get_ident() not in multiprocess.threads
+    assert Worker(os.path.dirname(multiprocess.collector.path), 102).scrape() == (2, 2, 2)
+
+
+async def test_collect_and_retire_run_in_a_thread(multiprocess):
+    multiprocess.serve(2)
+    metrics = {metric.name: metric for metric in await http_metrics.collect_metrics()}
+    assert metrics["requests"].value("/projects") == 2
+    await http_metrics.retire_metrics()
+    assert threading.get_ident() not in multiprocess.threads
+    assert not os.path.exists(multiprocess.collector.path)
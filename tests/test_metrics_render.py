@@ -0,0 +1,51 @@
+from app.utils.metrics import MetricsRegistry, OTHER, render_prometheus
+
+
+def test_renders_the_text_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("http_requests", "Requests by route.", ["method", "route"])
+    requests.inc("GET", "/projects/{id}")
+    requests.inc("GET", "/projects/{id}", amount=2)
+    requests.inc("POST", 'say "hi"\\now')
+    registry.gauge("in_flight", "Requests\nbeing served.").set(3)
+
+    assert render_prometheus(registry.collect()) == (
+        "# HELP http_requests Requests by route.\n"
+        "# TYPE http_requests counter\n"
+        'http_requests_total{method="GET",route="/projects/{id}"} 3\n'
+        'http_requests_total{method="POST",route="say \\"hi\\"\\\\now"} 1\n'
+        "# HELP in_flight Requests\\nbeing served.\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 3\n"
+    )
+
+
+def test_renders_cumulative_histogram_buckets_count_and_sum():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ["route"], buckets=(1.0, 0.1, 0.5))
+    for value in (0.05, 0.1, 0.3, 2.5, 7.0):
+        latency.observe(value, "/a")
+
+    assert render_prometheus(registry.collect()) == (
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{route="/a",le="0.1"} 2\n'
+        'latency_seconds_bucket{route="/a",le="0.5"} 3\n'
+        'latency_seconds_bucket{route="/a",le="1"} 3\n'
+        'latency_seconds_bucket{route="/a",le="+Inf"} 5\n'
+        'latency_seconds_count{route="/a"} 5\n'
+        'latency_seconds_sum{route="/a"} 9.95\n'
+    )
+    assert latency.count("/a") == 5
+    assert latency.quantile(0.5, "/a") == 0.5
+
+
+def test_label_sets_past_the_limit_share_one_series():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ["route"], buckets=(1.0,), max_series=2)
+    for route in ("/a", "/b", "/c", "/d"):
+        latency.observe(0.5, route)
+
+    rendered = render_prometheus(registry.collect())
+    assert f'latency_seconds_count{{route="{OTHER}"}} 2\n' in rendered
+    assert 'route="/c"' not in rendered and 'route="/d"' not in rendered
@@ -0,0 +1,41 @@
+import pytest
+from app.utils.ndjson_utils import iter_ndjson_lines
+
+pytestmark = pytest.mark.anyio
+
+
+async def split(chunks, max_line_bytes=64):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return [line async for line in iter_ndjson_lines(stream(), max_line_bytes)]
+
+
+def rechunk(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+DOCUMENT = b'{"a": 1}\n\n  \n{"b": 2}\r\n{"c": 3}'
+EXPECTED = [(1, b'{"a": 1}'), (4, b'{"b": 2}\r'), (5, b'{"c": 3}')]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(DOCUMENT)])
+async def test_lines_are_independent_of_chunking(size):
+    assert await split(rechunk(DOCUMENT, size)) == EXPECTED
+
+
+async def test_trailing_newline_and_empty_input():
+    assert await split([b'{"a": 1}\n']) == [(1, b'{"a": 1}')]
+    assert await split([]) == []
+    assert await split([b"", b"\n\n"]) == []
+
+
+@pytest.mark.parametrize("size", [1, 5, 100, 1000])
+async def test_overlong_lines_are_reported_and_skipped(size):
+    data = b'{"a": 1}\n' + b"x" * 100 + b'\n{"b": 2}\n' + b"y" * 65
+    assert await split(rechunk(data, size)) == [(1, b'{"a": 1}'), (2, None), (3, b'{"b": 2}'), (4, None)]
+
+
+async def test_line_at_the_limit_is_kept():
+    assert await split([b"z" * 64 + b"\n", b"w" * 64]) == [(1, b"z" * 64), (2, b"w" * 64)]
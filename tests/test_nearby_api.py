@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import select
+from app.services.projects.models.project_models import Project
+from app.services.projects.repository.project_repo import filter_project_ids
+from app.services.projects.schemas.project_schemas import ProjectListFilters
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("params", [
+    {"bedrooms": 2},
+    {"bedrooms": [2, 3], "balconies": 1},
+    {"balconies": 0, "unit_type": "2BHK"},
+])
+async def test_unit_filters_from_the_query_string(listing_db, api_client, params):
+    # every seeded locality is within a few km of this point
+    response = await api_client.get(
+        "/api/v1/projects/nearby", params={"lat": 12.91, "lon": 77.61, "radius_km": 20, "limit": 100, **params}
+    )
+    assert response.status_code == 200, response.text
+
+    filters = ProjectListFilters(**{
+        name: [str(v) for v in value] if isinstance(value, list) else [str(value)]
+        for name, value in params.items()
+    })
+    async with listing_db() as session:
+        project_ids = (await session.execute(select(Project.id))).scalars().all()
+        matched = await filter_project_ids(session, filters, project_ids)
+    body = response.json()
+    assert body["total"] == len(matched)
+    assert {p["id"] for p in body["projects"]} == {str(i) for i in matched}
+    distances = [p["distance_km"] for p in body["projects"]]
+    assert distances == sorted(distances)
@@ -0,0 +1,56 @@
+from app.services.projects.search.ngram_index import NgramIndex, trigrams
+
+
+def make_index():
+    index = NgramIndex()
+    index.add(1, ("Prestige Lakeside Habitat", "Whitefield"))
+    index.add(2, ("Sobha City", "Thanisandra"))
+    index.add(3, ("Brigade Lakefront", "Whitefield"))
+    index.add(4, ("Lake", None))
+    return index
+
+
+def test_trigrams_pad_like_pg_trgm():
+    # SELECT show_trgm('cat') -> {"  c"," ca","at ",cat}
+    assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("a b") == {"  a", " a ", "  b", " b "}
+
+
+def test_search_matches_substrings_of_any_field():
+    index = make_index()
+    assert {doc_id for doc_id, _ in index.search("lake")} == {1, 3, 4}
+    assert {doc_id for doc_id, _ in index.search("WHITEFIELD")} == {1, 3}
+    assert {doc_id for doc_id, _ in index.search("akesid")} == {1}
+    assert [doc_id for doc_id, _ in index.search("lakes")] == [1]
+    assert index.search("mumbai") == []
+    assert index.search("   ") == []
+
+
+def test_search_ranks_closest_field_first():
+    index = make_index()
+    results = index.search("lake")
+    assert results[0] == (4, 1.0)
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+    assert index.search("lake", limit=1) == [(4, 1.0)]
+
+
+def test_short_queries_scan_every_document():
+    index = make_index()
+    assert {doc_id for doc_id, _ in index.search("ob")} == {2}
+
+
+def test_add_replaces_and_remove_drops_postings():
+    index = make_index()
+    index.add(3, ("Brigade Orchards", "Devanahalli"))
+    assert {doc_id for doc_id, _ in index.search("lake")} == {1, 4}
+    assert {doc_id for doc_id, _ in index.search("orchard")} == {3}
+
+    index.remove(1)
+    index.remove(1)
+    assert 1 not in index
+    assert len(index) == 3
+    assert index.search("whitefield") == []
+    assert not any(1 in posting for posting in index._postings.values())
+
+    index.clear()
+    assert len(index) == 0 and index.search("lake") == []
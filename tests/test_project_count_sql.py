@@ -0,0 +1,105 @@
+"""
+Listing totals: the planner estimate behind count_mode=estimate, and the
+cached total that later pages, cursor pages included, reuse.
+"""
+import pytest
+from sqlalchemy import text
+from app.config import config
+from app.services.projects.repository import project_repo
+from app.services.projects.repository.project_repo import count_projects, estimate_project_count, fetch_projects, \
+    project_count_cache
+from app.services.projects.schemas.project_schemas import ProjectListFilters
+
+pytestmark = pytest.mark.anyio
+
+# lists and arrays expand to several positional parameters, ranges and
+# text to one each
+FILTERS = [
+    {},
+    {"development_stage": "launched"},
+    {"unit_type": ["2BHK", "studio", "penthouse"], "min_price": 5e6, "max_price": 1.5e7},
+    {"badges": ["Hot Deal", "New Project"], "bedrooms": ["2", "3"], "is_featured": False},
+    {"search": "alpha", "min_area": 800, "possession_date": 2027},
+]
+
+
+@pytest.fixture(scope="module")
+async def analyzed(listing_db):
+    async with listing_db() as session:
+        await session.execute(text("ANALYZE"))
+        await session.commit()
+    return listing_db
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+async def test_estimate_binds_every_parameter(analyzed, filters):
+    filters = ProjectListFilters(**filters)
+    async with analyzed() as session:
+        estimate = await estimate_project_count(session, filters)
+        exact = await count_projects(session, filters)
+    # the planner never estimates fewer than one row
+    assert isinstance(estimate, int) and estimate >= 1
+    assert estimate <= 120
+    if not filters.model_dump(exclude_defaults=True):
+        assert exact / 2 <= estimate <= exact * 2
+
+
+@pytest.fixture
+def count_calls(monkeypatch):
+    project_count_cache.clear()
+    calls = []
+    for name in ("count_projects", "estimate_project_count"):
+        counted = getattr(project_repo, name)
+
+        async def count(session, filters, name=name, counted=counted):
+            calls.append(name)
+            return await counted(session, filters)
+
+        monkeypatch.setattr(project_repo, name, count)
+    yield calls
+    project_count_cache.clear()
+
+
+@pytest.mark.parametrize("count_mode", ["exact", "estimate"])
+async def test_cursor_pages_reuse_the_first_page_total(analyzed, count_calls, count_mode):
+    filters = ProjectListFilters(development_stage="launched", limit=5, count_mode=count_mode)
+    async with analyzed() as session:
+        projects, total, cursor = await fetch_projects(session, filters)
+        pages = 1
+        while cursor:
+            projects, page_total, cursor = await fetch_projects(
+                session, filters.model_copy(update={"cursor": cursor})
+            )
+            assert page_total == total
+            pages += 1
+        later, page_total, _ = await fetch_projects(session, filters.model_copy(update={"page": 2}))
+        assert page_total == total
+
+    assert pages > 2
+    # exact totals come with the first page's rows; estimates take one EXPLAIN
+    assert count_calls == ([] if count_mode == "exact" else ["estimate_project_count"])
+
+
+async def test_exact_and_estimated_totals_are_cached_apart(analyzed, count_calls):
+    filters = ProjectListFilters(development_stage="presale", limit=5)
+    async with analyzed() as session:
+        _, exact, _ = await fetch_projects(session, filters)
+        _, estimate, _ = await fetch_projects(session, filters.model_copy(update={"count_mode": "estimate"}))
+        assert (await fetch_projects(session, filters))[1] == exact
+        assert exact == await count_projects(session, filters)
+    assert count_calls == ["estimate_project_count"]
+
+
+async def test_estimate_response_shape(analyzed, api_client, monkeypatch):
+    # the SQL listing, not the facet index
+    monkeypatch.setattr(config, "FACET_INDEX_ENABLED", False)
+    params = {"development_stage": "completed", "count_mode": "estimate", "limit": 4}
+    response = await api_client.get("/api/v1/projects/list", params=params)
+    assert response.status_code == 200, response.text
+
+    body = response.json()
+    assert set(body) == {"projects", "total", "page", "limit", "next_cursor"}
+    async with analyzed() as session:
+        assert body["total"] == await estimate_project_count(session, ProjectListFilters(**params))
+    assert (body["page"], body["limit"]) == (1, 4)
+    assert len(body["projects"]) == 4 and body["next_cursor"]
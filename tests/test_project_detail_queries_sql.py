@@ -0,0 +1,87 @@
+"""
+The detail loads every relationship it serializes with a fixed number of
+statements, however many child rows the project has.
+"""
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.sql_profiler import RequestSqlProfile, _profile
+from app.services.geolocation.service.geo_hierarchy_service import refresh_geo_hierarchy
+from app.services.projects.models.other_models import Amenity, NearbyLandmark, ParkingCharge, ProjectAmenity
+from app.services.projects.models.payment_plan_models import AdditionalCharge, PaymentPlan, PaymentPlanBreakup
+from app.services.projects.models.project_models import Project, ProjectMedia, ProjectUnit
+from app.services.projects.service.project_service import ProjectService
+
+pytestmark = pytest.mark.anyio
+
+# the project with its summary, then one per eager loaded relationship
+MAX_DETAIL_STATEMENTS = 10
+
+
+@pytest.fixture
+async def db(profiled_db):
+    """
+    Session on the profiled engine whose writes are rolled back after the test.
+    """
+    async with profiled_db.kw["bind"].connect() as connection:
+        transaction = await connection.begin()
+        async with AsyncSession(
+            bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        ) as session:
+            await refresh_geo_hierarchy(session)
+            yield session
+        await transaction.rollback()
+
+
+def add_children(session, project_id, count):
+    for i in range(count):
+        plan = PaymentPlan(project_id=project_id, plan_name=f"Plan {i}")
+        amenity = Amenity(name=f"Amenity {i}", icon_url="https://cdn.example.com/icon.png")
+        session.add_all([plan, amenity])
+        session.add_all(
+            PaymentPlanBreakup(payment_plan=plan, milestone=f"Milestone {j}", percentage=100 / count, due_days=30)
+            for j in range(count)
+        )
+        session.add_all([
+            ProjectAmenity(project_id=project_id, amenity=amenity),
+            ProjectMedia(project_id=project_id, type="image", content_type="default", sort_order=i,
+                         media_url="https://cdn.example.com/a.png", thumbnail_url="https://cdn.example.com/a_thumb.png"),
+            NearbyLandmark(project_id=project_id, name=f"Landmark {i}", type="school", distance_km=i,
+                           location_url="https://maps.example.com/landmark"),
+            AdditionalCharge(project_id=project_id, charge_name=f"Charge {i}", amount_type="fixed",
+                             amount_value=1e5),
+            ParkingCharge(project_id=project_id, parking_type="covered", amount_type="fixed", amount_value=3e5),
+        ])
+
+
+async def profiled_detail(session, project_id):
+    # a fresh identity map, so nothing loaded earlier is reused
+    session.expunge_all()
+    profile = RequestSqlProfile(slowest=0)
+    token = _profile.set(profile)
+    try:
+        detail = await ProjectService(session).get_project_details(project_id)
+    finally:
+        _profile.reset(token)
+    return detail, profile
+
+
+async def test_detail_statements_do_not_grow_with_child_rows(db):
+    unit_counts = (await db.execute(
+        select(Project.id, func.count(ProjectUnit.id))
+        .outerjoin(ProjectUnit, ProjectUnit.project_id == Project.id)
+        .group_by(Project.id).order_by(func.count(ProjectUnit.id), Project.id)
+    )).all()
+    (small, none), (large, most) = unit_counts[0], unit_counts[-1]
+    assert none == 0 and most >= 5
+    add_children(db, small, 1)
+    add_children(db, large, 4)
+    await db.flush()
+
+    small_detail, small_profile = await profiled_detail(db, small)
+    large_detail, large_profile = await profiled_detail(db, large)
+
+    assert len(small_detail.units) == 0 and len(large_detail.units) == most
+    assert len(large_detail.all_amenities) == 4
+    assert large_profile.count == small_profile.count <= MAX_DETAIL_STATEMENTS
+    assert not large_profile.repeated_shapes(2)
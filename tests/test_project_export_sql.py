@@ -0,0 +1,73 @@
+"""
+The export streams the same projects the listing filters select, in
+(updated_at, id) order and in bounded batches, as NDJSON the import reads back.
+"""
+import json
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import select
+from app.services.projects.models.project_models import Project
+from app.services.projects.repository.project_repo import stream_projects, filter_project_ids
+from app.services.projects.schemas.project_schemas import ProjectListFilters
+from app.services.projects.service.project_export_service import export_encoder
+from app.utils.json_utils import dumps
+from app.utils.ndjson_utils import iter_ndjson_lines
+
+pytestmark = pytest.mark.anyio
+
+FILTERS = [
+    {},
+    {"development_stage": "launched", "is_featured": False},
+    {"unit_type": ["2BHK"], "min_price": 5e6},
+    {"min_area": 1500, "badges": ["Hot Deal"]},
+]
+
+
+async def export(session, filters, updated_since=None, batch_size=8):
+    batches = []
+    async for projects in stream_projects(session, filters, updated_since, batch_size):
+        batches.append(list(projects))
+    return batches
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+async def test_streams_every_match_in_update_order(listing_db, filters):
+    filters = ProjectListFilters(**filters)
+    async with listing_db() as session:
+        batches = await export(session, filters)
+        project_ids = (await session.execute(select(Project.id))).scalars().all()
+        matched = await filter_project_ids(session, filters, project_ids)
+
+    projects = [p for batch in batches for p in batch]
+    assert {p.id for p in projects} == matched
+    assert len(projects) == len(matched)
+    assert all(0 < len(batch) <= 8 for batch in batches)
+    keys = [(p.updated_at, p.id) for p in projects]
+    assert keys == sorted(keys)
+
+
+async def test_updated_since_resumes_from_a_timestamp(listing_db):
+    filters = ProjectListFilters()
+    async with listing_db() as session:
+        everything = [p for batch in await export(session, filters) for p in batch]
+        since = everything[len(everything) // 2].updated_at
+        rest = [p for batch in await export(session, filters, since) for p in batch]
+        later = await export(session, filters, datetime(2100, 1, 1, tzinfo=timezone.utc))
+
+    assert [p.id for p in rest] == [p.id for p in everything if p.updated_at >= since]
+    assert later == []
+
+
+async def test_rows_round_trip_through_the_ndjson_reader(listing_db):
+    async with listing_db() as session:
+        batches = await export(session, ProjectListFilters(), batch_size=16)
+
+    async def chunks():
+        for batch in batches:
+            yield b"".join(dumps(export_encoder.encode(p, locality=None, full_address=None,
+                                                       starting_price=None)) + b"\n" for p in batch)
+
+    lines = [line async for line in iter_ndjson_lines(chunks())]
+    exported = [p.id for batch in batches for p in batch]
+    assert [line_no for line_no, _ in lines] == list(range(1, len(exported) + 1))
+    assert [json.loads(line)["id"] for _, line in lines] == [str(i) for i in exported]
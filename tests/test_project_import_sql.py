@@ -0,0 +1,133 @@
+"""
+The NDJSON import reports every row that isn't imported, by line, and keeps
+going: duplicates of existing projects or of earlier rows, rows that only
+conflict at INSERT, and rows that don't validate.
+"""
+import json
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.services.projects.models.project_models import Developer, Project, ProjectUnit
+from app.services.projects.service import project_import_service
+from app.services.projects.service.project_import_service import ProjectImportService
+
+pytestmark = pytest.mark.anyio
+
+DUPLICATE = "Project with this name already exists for this developer."
+
+
+@pytest.fixture
+async def db(listing_db):
+    """
+    Session whose commits only release savepoints of an outer transaction,
+    rolled back after the test, so imports leave the seeded data alone.
+    """
+    async with listing_db.kw["bind"].connect() as connection:
+        transaction = await connection.begin()
+        async with AsyncSession(
+            bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        ) as session:
+            yield session
+        await transaction.rollback()
+
+
+@pytest.fixture
+async def existing(db):
+    project = (await db.execute(select(Project).limit(1))).scalar_one()
+    developer_id = (await db.execute(select(Developer.id).order_by(Developer.name))).scalars().first()
+    return project, developer_id
+
+
+def row(developer_id, locality_id, name, **project):
+    return json.dumps({
+        "project": {
+            "developer_id": str(developer_id), "name": name, "description": None,
+            "locality_id": str(locality_id), "development_stage": "launched", "possession_date": None,
+            "rera_number": None, "project_type": "residential", "property_type": "apartment",
+            "project_size_unit": "acres", "project_size": 2, **project,
+        },
+        "units": [{
+            "locality_id": str(locality_id), "unit_type": "2BHK", "layout_name": None,
+            "carpet_area_value": 900, "super_area_value": 1100, "bedrooms": 2, "balconies": 1,
+            "total_units": 10, "available_units": 4, "base_price": 8.8e6, "total_price": 9.2e6,
+            "floor_plan_media_url": "https://cdn.example.com/plan.png",
+        }],
+        "additional_charges": {"charge_name": "Club", "amount_type": "fixed", "amount_value": 1e5,
+                               "applicable_on_unit_type": None},
+        "commission": {"commission_type": "percentage", "calculation_type": "flat", "range_min_value": None,
+                       "range_max_value": None, "amount": 2},
+        "parking": {"parking_type": "covered", "amount_type": "fixed", "amount_value": 3e5, "unit_type": None,
+                    "max_allowed_per_unit": 2},
+        "payment": {"plan_name": "Standard"},
+    })
+
+
+async def chunks(lines, size=64):
+    # uneven chunks, split mid-line
+    body = "\n".join(lines).encode()
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def import_lines(db, lines):
+    return await ProjectImportService(db).import_ndjson(chunks(lines))
+
+
+async def imported_names(db, names):
+    return set((await db.execute(select(Project.name).where(Project.name.in_(names)))).scalars())
+
+
+async def test_reports_duplicates_and_invalid_rows_by_line(db, existing, monkeypatch):
+    monkeypatch.setattr(config, "PROJECT_IMPORT_BATCH_SIZE", 3)
+    project, developer_id = existing
+    lines = [
+        row(developer_id, project.locality_id, "Imported One"),
+        row(project.developer_id, project.locality_id, project.name),
+        row(developer_id, project.locality_id, "Imported One"),
+        row(developer_id, project.locality_id, "Imported Two", property_type="office"),
+        "{not json",
+        row(developer_id, project.locality_id, "Imported Three"),
+    ]
+    report = await import_lines(db, lines)
+
+    assert (report.total_rows, report.imported, report.failed) == (6, 2, 4)
+    errors = [(e.line, e.stage, e.name) for e in report.errors]
+    assert errors == [
+        (2, "insert", project.name),
+        (3, "insert", "Imported One"),
+        (4, "validation", None),
+        (5, "validation", None),
+    ]
+    assert [e.error for e in report.errors[:2]] == [DUPLICATE, DUPLICATE]
+    assert "not valid for category" in report.errors[2].error
+    assert await imported_names(db, ["Imported One", "Imported Two", "Imported Three"]) == \
+        {"Imported One", "Imported Three"}
+
+
+async def test_rows_conflicting_at_insert_fail_alone(db, existing, monkeypatch):
+    # another import got there between the lookup and the INSERT
+    async def nothing_exists(keys, db):
+        return set()
+
+    monkeypatch.setattr(project_import_service, "find_existing_project_keys", nothing_exists)
+    project, developer_id = existing
+    lines = [
+        row(developer_id, project.locality_id, "Raced One"),
+        row(project.developer_id, project.locality_id, project.name),
+        row(developer_id, project.locality_id, "Raced Two"),
+    ]
+    report = await import_lines(db, lines)
+
+    assert (report.total_rows, report.imported, report.failed) == (3, 2, 1)
+    [error] = report.errors
+    assert (error.line, error.stage, error.name) == (2, "insert", project.name)
+    assert "uq_projects_developer_id_name" in error.error
+    assert await imported_names(db, ["Raced One", "Raced Two"]) == {"Raced One", "Raced Two"}
+
+    # the rows of the retried batch came with their units
+    units = (await db.execute(
+        select(ProjectUnit.super_area_sqft).join(Project, Project.id == ProjectUnit.project_id)
+        .where(Project.name.in_(["Raced One", "Raced Two"]))
+    )).scalars().all()
+    assert units == [1100, 1100]
@@ -0,0 +1,53 @@
+"""
+The detail ETag changes with everything the detail body shows, including
+the locality's address, which is served from the worker's geo hierarchy.
+"""
+import pytest
+from sqlalchemy import select, update
+from app.services.geolocation.models.geolocation_models import Locality, Area, City
+from app.services.geolocation.service.geo_hierarchy_service import refresh_geo_hierarchy
+from app.services.projects.models.project_models import Project
+from app.services.projects.service.project_service import ProjectService
+
+pytestmark = pytest.mark.anyio
+
+
+async def any_project(session):
+    return (await session.execute(
+        select(Project.id, Project.locality_id).where(Project.locality_id.is_not(None)).limit(1)
+    )).first()
+
+
+@pytest.mark.parametrize("model, parent_of", [
+    (Locality, lambda locality_id: Locality.id == locality_id),
+    # a level further up only reaches the detail through full_address
+    (City, lambda locality_id: City.id == select(Area.city_id).join(Locality, Locality.area_id == Area.id)
+        .where(Locality.id == locality_id).scalar_subquery()),
+])
+async def test_renaming_the_address_changes_the_etag(listing_db, model, parent_of):
+    async with listing_db() as session:
+        project_id, locality_id = await any_project(session)
+        service = ProjectService(session)
+        etag, last_modified = await service.get_project_version(project_id)
+        assert (await service.get_project_version(project_id))[0] == etag
+
+        try:
+            await session.execute(update(model).where(parent_of(locality_id)).values(name="Renamed"))
+            # before the worker's hierarchy sees it, then after
+            renamed, renamed_at = await service.get_project_version(project_id)
+            await refresh_geo_hierarchy(session, force=True)
+            served = (await service.get_project_version(project_id))[0]
+        finally:
+            await session.rollback()
+            await refresh_geo_hierarchy(session, force=True)
+
+    assert len({etag, renamed, served}) == 3
+    assert renamed_at > last_modified
+
+
+async def test_detail_without_request_headers_has_a_body(listing_db):
+    async with listing_db() as session:
+        project_id, _ = await any_project(session)
+        response, _ = await ProjectService(session).get_project_detail_response(project_id)
+    assert response.body
+    assert response.headers["ETag"]
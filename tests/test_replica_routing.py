@@ -0,0 +1,193 @@
+import time
+from types import SimpleNamespace
+import pytest
+from starlette.requests import Request
+from app.config import config
+from app.db import connection as connection_module
+from app.db.connection import DBConnection, PRIMARY_COOKIE, ReadYourWritesMiddleware, get_read_db, \
+    reads_own_writes, reads_replica
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeReplica:
+    """
+    Stands in for the replica engine in lag checks: reports `lag`, or fails
+    when it is an exception.
+    """
+
+    def __init__(self, lag):
+        self.lag = lag
+        self.checks = 0
+
+    def connect(self):
+        replica = self
+
+        class Connection:
+            async def __aenter__(self):
+                replica.checks += 1
+                if isinstance(replica.lag, Exception):
+                    raise replica.lag
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, query):
+                return SimpleNamespace(scalar=lambda: replica.lag)
+
+        return Connection()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(connection_module.time, "monotonic", lambda: clock.now)
+    return clock
+
+
+@pytest.fixture
+async def db(monkeypatch, clock):
+    """
+    DBConnection with a replica configured; nothing connects until a session
+    runs a statement. `db.replica` sets the lag the replica reports.
+    """
+    monkeypatch.setattr(config, "DB_REPLICA_URL", config.DB_URL)
+    db = DBConnection()
+    db.read_engine = db._read_engine
+
+    def replica(lag):
+        db._read_engine = FakeReplica(lag)
+        db._replica_lag_checked_at = float("-inf")
+        return db._read_engine
+
+    db.replica = replica
+    db.replica(0.0)
+    monkeypatch.setattr(connection_module, "db_connection", db)
+    yield db
+    db._read_engine = db.read_engine
+    await db.dispose()
+
+
+async def read_side(db, primary=False):
+    async with db.get_read_session(primary=primary) as session:
+        return session.bind, reads_replica(session)
+
+
+async def test_reads_use_the_replica_while_its_lag_is_allowed(db):
+    db.replica(config.REPLICA_MAX_LAG_SECONDS - 1)
+    assert await read_side(db) == (db.read_engine, True)
+
+
+@pytest.mark.parametrize("lag", [config.REPLICA_MAX_LAG_SECONDS + 1, ConnectionError("replica down")])
+async def test_lagging_or_unreachable_replica_falls_back_to_the_primary(db, lag):
+    db.replica(lag)
+    assert await read_side(db) == (db._engine, False)
+
+
+async def test_primary_reads_skip_the_lag_check(db):
+    replica = db.replica(0.0)
+    assert await read_side(db, primary=True) == (db._engine, False)
+    assert replica.checks == 0
+
+
+async def test_lag_is_checked_at_most_every_interval(db, clock):
+    replica = db.replica(config.REPLICA_MAX_LAG_SECONDS + 1)
+    assert await read_side(db) == (db._engine, False)
+    # caught up, but the last check still counts until the interval passes
+    replica.lag = 0.0
+    clock.now += config.REPLICA_LAG_CHECK_SECONDS / 2
+    assert await read_side(db) == (db._engine, False)
+    clock.now += config.REPLICA_LAG_CHECK_SECONDS
+    assert await read_side(db) == (db.read_engine, True)
+    assert replica.checks == 2
+
+
+async def test_without_a_replica_reads_use_the_primary():
+    db = DBConnection()
+    assert not db.has_replica and await db.replica_lag() == 0.0
+    assert await read_side(db) == (db._engine, False)
+    await db.dispose()
+
+
+def request_with(cookies=None):
+    headers = [(b"cookie", f"{PRIMARY_COOKIE}={value}".encode()) for value in [cookies] if value is not None]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "state": {}})
+
+
+@pytest.mark.parametrize("cookie, read_your_writes", [
+    (None, False),
+    (int(time.time()) + 60, True),
+    (int(time.time()) - 60, False),
+    ("garbage", False),
+])
+async def test_primary_cookie_routes_reads_to_the_primary(db, cookie, read_your_writes):
+    dependency = get_read_db(request_with(cookie))
+    session = await anext(dependency)
+    try:
+        assert reads_own_writes(session) is read_your_writes
+        assert reads_replica(session) is not read_your_writes
+        assert (session.bind is db._engine) is read_your_writes
+    finally:
+        await dependency.aclose()
+
+
+@pytest.mark.parametrize("committed", [False, True])
+async def test_middleware_sets_the_cookie_after_a_commit(db, committed):
+    async def app(scope, receive, send):
+        if committed:
+            # what the after_commit listener does for the request's session
+            connection_module._mark_primary_write(SimpleNamespace(info={"request_state": Request(scope).state}))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": [], "state": {}}
+    await ReadYourWritesMiddleware(app)(scope, None, send)
+    cookies = [value.decode() for name, value in sent[0]["headers"] if name == b"set-cookie"]
+    assert len(cookies) == committed
+    if committed:
+        until = int(cookies[0].split(";")[0].split("=")[1])
+        assert 0 < until - time.time() <= config.READ_YOUR_WRITES_SECONDS
+        assert f"Max-Age={config.READ_YOUR_WRITES_SECONDS}" in cookies[0]
+
+
+async def test_read_your_writes_bypasses_caches_loads_and_indexes(listing_db, monkeypatch):
+    from app.services.projects.service import project_service
+    from app.services.projects.schemas.project_schemas import ProjectListFilters
+    from app.services.projects.models.project_models import Project
+    from app.utils.cache_utils import canonical_key
+    from app.utils.response_cache import CachedResponse, invalidate_tags
+    from sqlalchemy import select
+
+    def shared(*args, **kwargs):
+        raise AssertionError("read past the write")
+
+    for name in ("refresh_facet_index", "refresh_unit_catalog"):
+        monkeypatch.setattr(project_service, name, shared)
+    monkeypatch.setattr(project_service.project_detail_loads, "do", shared)
+
+    filters = ProjectListFilters(unit_type=["2BHK"], min_price=5e6)
+    async with listing_db() as session:
+        project_id = (await session.execute(select(Project.id).limit(1))).scalar()
+        stale = CachedResponse(b"stale", {"ETag": '"stale"'})
+        await project_service.project_list_cache.set(canonical_key(filters), stale, [project_service.PROJECTS_TAG])
+        await project_service.project_detail_cache.set(
+            str(project_id), stale, [project_service.project_tag(project_id)]
+        )
+
+        session.info["read_your_writes"] = True
+        service = project_service.ProjectService(session)
+        body, cached = await service.list_projects_response(filters)
+        assert not cached and body != b"stale"
+        detail, cached = await service.get_project_detail_response(project_id)
+        assert not cached and detail.body != b"stale"
+
+    # and nothing read this way was stored
+    assert await project_service.project_list_cache.get(canonical_key(filters), [project_service.PROJECTS_TAG]) \
+        == stale
+    await invalidate_tags([project_service.PROJECTS_TAG, project_service.project_tag(project_id)])
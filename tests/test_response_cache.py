@@ -0,0 +1,216 @@
+import sys
+from types import SimpleNamespace
+import pytest
+from app.utils import response_cache
+from app.utils.response_cache import CacheBackend, CachedResponse, RedisCacheBackend, ResponseCache, \
+    invalidate_tags, invalidate_tags_nowait, register_cache, set_shared_backend
+
+pytestmark = pytest.mark.anyio
+
+TAGS = ["project:1", "projects"]
+
+
+class MemoryBackend(CacheBackend):
+    """
+    The shared backend contract, kept in a dict; entries never expire.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl):
+        self.values[key] = value
+
+    async def get_counters(self, keys):
+        return [self.values.get(key, 0) for key in keys]
+
+    async def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+class FakeRedis:
+    # the part of redis.asyncio.Redis RedisCacheBackend uses; replies are bytes
+    def __init__(self):
+        self.values = {}
+        self.closed = False
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, px):
+        assert isinstance(px, int) and px > 0
+        self.values[key] = value
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def incr(self, key):
+        value = int(self.values.get(key, b"0")) + 1
+        self.values[key] = str(value).encode()
+        return value
+
+    async def aclose(self):
+        self.closed = True
+
+
+def redis_backend():
+    backend = RedisCacheBackend.__new__(RedisCacheBackend)
+    backend._client = FakeRedis()
+    return backend
+
+
+@pytest.fixture
+def shared_backend():
+    backend = MemoryBackend()
+    set_shared_backend(backend)
+    yield backend
+    set_shared_backend(None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: clock.now)
+    return clock
+
+
+@pytest.fixture
+def registered():
+    caches = []
+
+    def register(cache):
+        caches.append(register_cache(cache))
+        return cache
+
+    yield register
+    for cache in caches:
+        response_cache._caches.remove(cache)
+
+
+@pytest.mark.parametrize("make_backend", [MemoryBackend, redis_backend])
+async def test_backend_contract(make_backend):
+    backend = make_backend()
+    assert await backend.get("missing") is None
+    await backend.set("key", b"body\n{}", ttl=1.5)
+    assert await backend.get("key") == b"body\n{}"
+
+    assert await backend.get_counters(["tag:a", "tag:b"]) == [0, 0]
+    assert await backend.incr("tag:a") == 1
+    assert await backend.incr("tag:a") == 2
+    assert await backend.get_counters(["tag:a", "tag:b"]) == [2, 0]
+    await backend.close()
+
+
+def test_redis_backend_needs_the_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+    with pytest.raises(RuntimeError, match="redis"):
+        RedisCacheBackend("redis://localhost")
+
+
+async def test_invalidating_a_tag_misses_every_entry_under_it():
+    cache = ResponseCache("test")
+    await cache.set("a", CachedResponse(b"a"), TAGS)
+    await cache.set("b", CachedResponse(b"b"), ["projects"])
+    await cache.set("c", CachedResponse(b"c"), ["project:2"])
+    assert await cache.get("a", TAGS) == CachedResponse(b"a")
+
+    cache.invalidate_local(["projects"])
+    assert await cache.get("a", TAGS) is None
+    assert await cache.get("b", ["projects"]) is None
+    assert await cache.get("c", ["project:2"]) == CachedResponse(b"c")
+
+
+async def test_entry_built_across_an_invalidation_is_not_served():
+    cache = ResponseCache("test")
+    versions = await cache.tag_versions(TAGS)
+    # a write lands while the response is being built
+    cache.invalidate_local(["project:1"])
+    await cache.set("a", CachedResponse(b"stale"), TAGS, versions)
+    assert await cache.get("a", TAGS) is None
+
+    await cache.set("a", CachedResponse(b"fresh"), TAGS)
+    assert await cache.get("a", TAGS) == CachedResponse(b"fresh")
+
+
+async def test_invalidate_tags_reaches_every_registered_cache(registered):
+    detail, listing = registered(ResponseCache("detail")), registered(ResponseCache("listing"))
+    await detail.set("a", CachedResponse(b"a"), TAGS)
+    await listing.set("a", CachedResponse(b"a"), ["projects"])
+    await invalidate_tags(["projects"])
+    assert await detail.get("a", TAGS) is None
+    assert await listing.get("a", ["projects"]) is None
+
+
+async def test_workers_share_entries_and_invalidations(shared_backend, registered):
+    worker_a, worker_b = ResponseCache("detail"), registered(ResponseCache("detail"))
+    response = CachedResponse(b'{"id": 1}', {"ETag": '"v1"'})
+    await worker_a.set("1", response, TAGS)
+    assert await worker_b.get("1", TAGS) == response
+
+    # worker b invalidates; worker a's local copy sees the shared version move
+    await invalidate_tags(["project:1"])
+    assert shared_backend.values["tag:project:1"] == 1
+    assert await worker_a.get("1", TAGS) is None
+    assert await worker_b.get("1", TAGS) is None
+
+
+async def test_invalidate_tags_nowait_bumps_the_shared_versions(shared_backend, registered):
+    cache = registered(ResponseCache("detail"))
+    await cache.set("1", CachedResponse(b"1"), TAGS)
+    invalidate_tags_nowait(TAGS)
+    for task in list(response_cache._pending_invalidations):
+        await task
+    assert await shared_backend.get_counters(["tag:project:1", "tag:projects"]) == [1, 1]
+    assert await cache.get("1", TAGS) is None
+
+
+async def test_changed_within_local_invalidations(clock):
+    cache = ResponseCache("test")
+    assert not cache.changed_within(TAGS, 5)
+    cache.invalidate_local(["project:1"])
+    clock.now += 4
+    assert cache.changed_within(TAGS, 5)
+    assert not cache.changed_within(["projects"], 5)
+    clock.now += 2
+    assert not cache.changed_within(TAGS, 5)
+
+
+async def test_changed_within_shared_versions(shared_backend, clock):
+    cache = ResponseCache("test")
+    # a tag seen for the first time may have changed just before
+    await cache.tag_versions(TAGS)
+    assert cache.changed_within(TAGS, 5)
+    clock.now += 10
+    await cache.tag_versions(TAGS)
+    assert not cache.changed_within(TAGS, 5)
+
+    # another worker's bump is noticed at the next read
+    await shared_backend.incr("tag:projects")
+    assert not cache.changed_within(TAGS, 5)
+    await cache.tag_versions(TAGS)
+    assert cache.changed_within(["projects"], 5)
+    assert not cache.changed_within(["project:1"], 5)
+
+
+@pytest.mark.parametrize("replica, read_your_writes, changed_ago, may_fill", [
+    (False, False, 0, True),
+    (True, False, 0, False),
+    (True, False, 1000, True),
+    (False, True, 1000, False),
+])
+async def test_may_fill_skips_fresh_changes_read_from_a_replica(clock, replica, read_your_writes, changed_ago,
+                                                                 may_fill):
+    from app.db.connection import db_connection
+    from app.services.projects.service.project_service import ProjectService
+
+    cache = ResponseCache("test")
+    cache.invalidate_local(["project:1"])
+    clock.now += changed_ago
+    assert changed_ago == 0 or changed_ago > db_connection.replica_max_staleness
+
+    session = SimpleNamespace(info={"replica": replica, "read_your_writes": read_your_writes})
+    assert ProjectService(session)._may_fill(cache, TAGS) is may_fill
@@ -0,0 +1,96 @@
+"""
+RowEncoder output, once dumped, must be the JSON the response models would
+produce with model_dump(mode="json").
+"""
+import json
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID
+import pytest
+# every model, so the ORM mappers configure
+from app.services.user.models import user_models, otp_models, sms_models  # noqa: F401
+from app.services.projects.models import other_models, payment_plan_models  # noqa: F401
+from app.services.geolocation.models.geolocation_models import Locality
+from app.services.projects.models.project_models import Project, ProjectListingSummary, ProjectMedia, ProjectUnit
+from app.services.projects.schemas.project_schemas import FullProjectResponse, NearbyProjectResponse, \
+    ProjectExportResponse
+from app.services.projects.service.project_export_service import export_encoder
+from app.services.projects.service.project_service import listing_encoder, nearby_encoder
+from app.utils.json_utils import dumps
+
+CREATED_AT = datetime(2026, 1, 1, 23, 30, tzinfo=timezone.utc)
+UPDATED_AT = datetime(2026, 2, 3, 4, 5, 6, 789000, tzinfo=timezone.utc)
+FULL_ADDRESS = "Whitefield, East Bengaluru, Bengaluru"
+
+
+def make_project(locality=None, badges=("Hot Deal", "5% Commission")):
+    project_id = UUID("7f9c2ba4-e88f-4c6e-9a2b-0c1d2e3f4a5b")
+    return Project(
+        id=project_id,
+        name="Éclat Towers",
+        project_type="residential",
+        property_type="apartment",
+        development_stage="under_construction",
+        possession_date=date(2027, 3, 31),
+        is_featured=True,
+        badges=list(badges) if badges is not None else None,
+        created_at=CREATED_AT,
+        updated_at=UPDATED_AT,
+        locality=locality,
+        locality_id=locality.id if locality else None,
+        listing_summary=ProjectListingSummary(project_id=project_id, starting_price=4250000.0),
+        units=[
+            ProjectUnit(id=UUID(int=i + 1, version=4), unit_type=unit_type, super_area_value=1100.0, base_price=8.8e6)
+            for i, unit_type in enumerate(["2BHK", "3BHK"])
+        ],
+        media=[
+            ProjectMedia(
+                id=UUID(int=10 + i, version=4), type="image", content_type="floor_plan",
+                media_url=f"https://cdn.example.com/{i}.png", thumbnail_url=f"https://cdn.example.com/{i}_t.png",
+                meta_json={"alt": "Plan", "size": [640, 480]} if i else None, sort_order=i, is_featured=not i,
+            )
+            for i in range(2)
+        ],
+    )
+
+
+def validated(model, project, **overrides):
+    # what from_orm sees once the service has set the computed attributes
+    project.starting_price = project.listing_summary.starting_price
+    for name, value in overrides.items():
+        setattr(project, name, value)
+    return model.model_validate(project).model_dump(mode="json")
+
+
+def encoded(encoder, project, **overrides):
+    return json.loads(dumps(encoder.encode(
+        project,
+        locality=project.locality.name if project.locality else None,
+        full_address=FULL_ADDRESS if project.locality else None,
+        starting_price=project.listing_summary.starting_price,
+        **overrides,
+    )))
+
+
+@pytest.mark.parametrize("encoder, model, overrides", [
+    (listing_encoder, FullProjectResponse, {}),
+    (nearby_encoder, NearbyProjectResponse, {"distance_km": 1.25}),
+    (export_encoder, ProjectExportResponse, {}),
+])
+@pytest.mark.parametrize("locality", [None, Locality(id=UUID(int=99, version=4), name="Whitefield")])
+@pytest.mark.parametrize("badges", [("Hot Deal", "5% Commission"), (), None])
+def test_encoded_rows_match_model_dump(encoder, model, overrides, locality, badges):
+    project = make_project(locality, badges)
+    full_address = FULL_ADDRESS if locality else None
+    assert encoded(encoder, project, **overrides) == validated(model, project, full_address=full_address, **overrides)
+
+
+@pytest.mark.parametrize("updated_at", [
+    datetime(2026, 2, 3, 4, 5, 6, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    datetime(2026, 2, 3, 4, 5, 6),
+    None,
+])
+def test_export_timestamps_match_model_dump(updated_at):
+    project = make_project()
+    project.updated_at = updated_at
+    assert encoded(export_encoder, project)["updated_at"] == \
+        validated(ProjectExportResponse, project, full_address=None)["updated_at"]
@@ -0,0 +1,88 @@
+import asyncio
+import gc
+import pytest
+from app.utils.cache_utils import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+def make_load(release: asyncio.Event, calls: list, result="loaded", error: Exception = None):
+    async def load():
+        calls.append(1)
+        await release.wait()
+        if error is not None:
+            raise error
+        return result
+    return load
+
+
+async def test_concurrent_callers_share_one_load():
+    flight, release, calls = SingleFlight(), asyncio.Event(), []
+    callers = [asyncio.create_task(flight.do("key", make_load(release, calls))) for _ in range(5)]
+    other = asyncio.create_task(flight.do("other", make_load(release, calls, "other")))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*callers) == ["loaded"] * 5
+    assert await other == "other"
+    assert len(calls) == 2
+    assert flight.coalesced == 4
+
+
+async def test_cancelled_leader_does_not_cancel_waiters():
+    flight, release, calls = SingleFlight(), asyncio.Event(), []
+    leader = asyncio.create_task(flight.do("key", make_load(release, calls)))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flight.do("key", make_load(release, calls)))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    release.set()
+    assert await waiter == "loaded"
+    assert len(calls) == 1
+
+
+async def test_key_is_released_after_an_exception():
+    flight, release, calls = SingleFlight(), asyncio.Event(), []
+    release.set()
+    callers = [asyncio.create_task(flight.do("key", make_load(release, calls, error=ValueError("boom"))))
+               for _ in range(3)]
+    for caller in callers:
+        with pytest.raises(ValueError, match="boom"):
+            await caller
+    assert len(calls) == 1
+    assert "key" not in flight._inflight
+
+    # the next call loads again rather than replaying the failure
+    assert await flight.do("key", make_load(release, calls, "retried")) == "retried"
+    assert len(calls) == 2
+
+
+async def test_no_unretrieved_exception_when_every_caller_is_cancelled():
+    loop = asyncio.get_running_loop()
+    reported = []
+    previous = loop.get_exception_handler()
+    loop.set_exception_handler(lambda _, context: reported.append(context))
+    try:
+        flight, release, calls = SingleFlight(), asyncio.Event(), []
+        callers = [asyncio.create_task(flight.do("key", make_load(release, calls, error=ValueError("boom"))))
+                   for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+
+        # the load outlives its callers and fails with nobody awaiting it
+        release.set()
+        while flight._inflight:
+            await asyncio.sleep(0)
+        del callers
+        gc.collect()
+        await asyncio.sleep(0)
+    finally:
+        loop.set_exception_handler(previous)
+
+    assert len(calls) == 1
+    assert not [c for c in reported if "never retrieved" in c.get("message", "")]
@@ -0,0 +1,28 @@
+from app.db.sql_profiler import RequestSqlProfile, statement_shape
+
+
+def test_shapes_ignore_values_whitespace_and_in_list_length():
+    assert statement_shape("SELECT *\n  FROM units WHERE id = $1") == "SELECT * FROM units WHERE id = ?"
+    assert statement_shape("SELECT * FROM units WHERE id IN ($1, $2, $3)") == \
+        statement_shape("SELECT * FROM units WHERE id IN ($4,$5)") == "SELECT * FROM units WHERE id IN (?...)"
+    assert statement_shape("SELECT * FROM units WHERE id = %(id_1)s") == "SELECT * FROM units WHERE id = ?"
+
+
+def test_repeated_shapes_and_slowest():
+    profile = RequestSqlProfile(slowest=2)
+    profile.record("SELECT * FROM projects LIMIT $1", 0.030)
+    for i in range(6):
+        profile.record(f"SELECT * FROM units WHERE project_id = ${i % 2 + 1}", 0.001 * (i + 1))
+
+    assert profile.count == 7
+    assert profile.repeated_shapes(5) == [("SELECT * FROM units WHERE project_id = ?", 6)]
+    assert profile.repeated_shapes(7) == []
+    assert [seconds for seconds, _ in profile.slowest] == [0.030, 0.006]
+    assert profile.server_timing() == f'db;dur={profile.seconds * 1000:.1f};desc="7 queries"'
+
+
+def test_keeping_no_slowest_statements():
+    # SQL_PROFILE_SLOWEST=0 only counts
+    profile = RequestSqlProfile(slowest=0)
+    profile.record("SELECT 1", 0.001)
+    assert (profile.count, profile.slowest) == (1, [])
@@ -0,0 +1,52 @@
+import logging
+import pytest
+from sqlalchemy import select
+from app.db.sql_profiler import SqlProfilingMiddleware
+from app.services.projects.models.project_models import Project, ProjectUnit
+
+pytestmark = pytest.mark.anyio
+
+
+async def profiled_request(app):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/projects", "headers": []}
+    await SqlProfilingMiddleware(app)(scope, None, send)
+    return dict(sent[0]["headers"])
+
+
+async def test_query_per_row_is_flagged(profiled_db, caplog):
+    async def app(scope, receive, send):
+        async with profiled_db() as session:
+            project_ids = (await session.execute(select(Project.id).limit(8))).scalars().all()
+            # the units of each project, one statement per project
+            for project_id in project_ids:
+                await session.execute(select(ProjectUnit.id).where(ProjectUnit.project_id == project_id))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    with caplog.at_level(logging.WARNING, logger="app.db.sql_profiler"):
+        headers = await profiled_request(app)
+
+    assert b'desc="9 queries"' in headers[b"server-timing"]
+    warnings = [r.getMessage() for r in caplog.records if "Possible N+1" in r.getMessage()]
+    assert len(warnings) == 1
+    assert warnings[0].startswith("Possible N+1 in GET /projects: 8 x SELECT project_units.id")
+
+
+async def test_one_statement_per_table_is_not_flagged(profiled_db, caplog):
+    async def app(scope, receive, send):
+        async with profiled_db() as session:
+            project_ids = (await session.execute(select(Project.id).limit(8))).scalars().all()
+            await session.execute(select(ProjectUnit.id).where(ProjectUnit.project_id.in_(project_ids)))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    with caplog.at_level(logging.WARNING, logger="app.db.sql_profiler"):
+        headers = await profiled_request(app)
+
+    assert b'desc="2 queries"' in headers[b"server-timing"]
+    assert not [r for r in caplog.records if "Possible N+1" in r.getMessage()]
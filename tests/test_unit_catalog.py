@@ -0,0 +1,116 @@
+import math
+import random
+from uuid import uuid4
+import pytest
+from app.services.projects.schemas.project_schemas import ProjectListFilters
+from app.services.projects.search.unit_catalog import ProjectUnitCatalog, UnitCatalogRow
+
+PROJECTS = [uuid4() for _ in range(40)]
+
+
+def make_rows(count=1500, seed=5):
+    # more than the initial capacity, so the columns grow on upsert
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        area = rng.choice([None, rng.uniform(400, 3000)])
+        price = rng.uniform(2e6, 2e7)
+        rows.append(UnitCatalogRow(
+            id=uuid4(), project_id=rng.choice(PROJECTS), unit_type=rng.choice(["1BHK", "2BHK", "3BHK", "studio"]),
+            bedrooms=rng.choice([None, 1, 2, 3]), balconies=rng.choice([None, 0, 1, 2]),
+            base_price=price, total_price=price * 1.1, super_area_sqft=area,
+            carpet_area_sqft=area * 0.8 if area else None, price_per_sqft=price / area if area else None,
+            is_active=rng.random() < 0.9, is_deleted=rng.random() < 0.05,
+        ))
+    return rows
+
+
+def make_catalog(rows):
+    catalog = ProjectUnitCatalog()
+    for i in range(0, len(rows), 500):
+        catalog.upsert(rows[i:i + 500])
+    return catalog
+
+
+def live(row):
+    return row.is_active and not row.is_deleted
+
+
+def unit_matches(row, filters: ProjectListFilters):
+    if filters.unit_type and row.unit_type not in {t.value for t in filters.unit_type}:
+        return False
+    if filters.bedrooms and row.bedrooms not in {int(b) for b in filters.bedrooms}:
+        return False
+    if filters.balconies and row.balconies not in {int(b) for b in filters.balconies}:
+        return False
+    if filters.min_price and row.base_price < filters.min_price:
+        return False
+    if filters.max_price and row.base_price > filters.max_price:
+        return False
+    return True
+
+
+def expected_projects(rows, filters: ProjectListFilters):
+    # the listing's unit subquery plus the summary range overlap
+    projects = {row.project_id for row in rows if live(row) and unit_matches(row, filters)}
+    for project_id in list(projects):
+        units = [row for row in rows if row.project_id == project_id and live(row)]
+        for column, low, high in [
+            ("super_area_sqft", filters.min_area, filters.max_area),
+            ("price_per_sqft", filters.min_price_per_sqft, filters.max_price_per_sqft),
+        ]:
+            values = [getattr(row, column) for row in units if getattr(row, column) is not None]
+            if (low is not None and (not values or max(values) < low)) or \
+                    (high is not None and (not values or min(values) > high)):
+                projects.discard(project_id)
+    return projects
+
+
+FILTERS = [
+    {},
+    {"unit_type": ["2BHK"], "bedrooms": ["2", "3"]},
+    {"balconies": ["0"], "min_price": 5e6, "max_price": 9e6},
+    {"min_area": 2500},
+    {"max_area": 500, "unit_type": ["studio"]},
+    {"min_price_per_sqft": 4000, "max_price_per_sqft": 6000},
+    {"bedrooms": ["7"]},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_matching_projects_match_brute_force(filters):
+    rows = make_rows()
+    catalog = make_catalog(rows)
+    filters = ProjectListFilters(**filters)
+    assert catalog.matching_projects(filters) == expected_projects(rows, filters)
+
+
+def test_aggregates_skip_dead_units_and_unknown_areas():
+    rows = make_rows()
+    catalog = make_catalog(rows)
+    aggregates = catalog.aggregates()
+    for slot, project_id in enumerate(catalog._project_ids):
+        units = [row for row in rows if row.project_id == project_id and live(row)]
+        prices = [row.base_price for row in units]
+        areas = [row.super_area_sqft for row in units if row.super_area_sqft is not None]
+        assert aggregates.min_price[slot] == (min(prices) if prices else pytest.approx(math.nan, nan_ok=True))
+        assert aggregates.max_area[slot] == (max(areas) if areas else pytest.approx(math.nan, nan_ok=True))
+    assert len(catalog) == sum(live(row) for row in rows)
+
+
+def test_upsert_updates_rows_in_place():
+    rows = make_rows(200)
+    catalog = make_catalog(rows)
+    filters = ProjectListFilters(min_price=1)
+    before = catalog.matching_projects(filters)
+
+    # retire every unit of one project, and reprice another's
+    retired = next(iter(before))
+    changed = [row._replace(is_active=False) for row in rows if row.project_id == retired]
+    target = next(row for row in rows if live(row) and row.project_id != retired)
+    changed.append(target._replace(base_price=1e9))
+    catalog.upsert(changed)
+
+    assert retired not in catalog.matching_projects(filters)
+    assert catalog.matching_projects(ProjectListFilters(min_price=5e8)) == {target.project_id}
+    assert len(catalog._row_of) == 200
@@ -0,0 +1,68 @@
+"""
+Unit level filters the facet index can't answer alone resolve through the
+unit catalog; the pages served that way must match the SQL listing.
+"""
+import pytest
+from app.services.projects.repository.project_repo import fetch_projects, fetch_unit_catalog_rows, \
+    filter_project_ids, resolve_sort_key
+from app.services.projects.schemas.project_schemas import ProjectListFilters
+from app.services.projects.search import ProjectUnitCatalog
+
+pytestmark = pytest.mark.anyio
+
+PAGE_SIZE = 6
+FILTERS = [
+    {"min_price": 6e6},
+    {"max_price": 5e6, "development_stage": "launched"},
+    {"min_price": 4e6, "max_price": 9e6, "unit_type": ["2BHK", "3BHK"]},
+    {"unit_type": ["2BHK"], "bedrooms": ["2", "3"]},
+    {"bedrooms": ["1"], "balconies": ["0"]},
+    {"min_area": 2000},
+    {"max_area": 1000, "is_featured": False},
+    {"min_area": 800, "max_area": 1500},
+    {"min_price_per_sqft": 8000},
+    {"max_price_per_sqft": 6000, "badges": ["Hot Deal"]},
+    {"min_price_per_sqft": 5000, "max_price_per_sqft": 9000, "min_price": 5e6},
+    {"min_price": 1e9},
+]
+
+
+@pytest.fixture(scope="module")
+async def unit_catalog(listing_db):
+    catalog = ProjectUnitCatalog()
+    async with listing_db() as session:
+        rows, catalog.watermark = await fetch_unit_catalog_rows(session)
+    catalog.upsert(rows)
+    return catalog
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("sort_by, sort_order", [("created_at", "desc"), ("starting_price", "asc"),
+                                                 ("super_area", "desc"), ("name", "asc")])
+async def test_pages_match_sql(listing_db, facet_index, unit_catalog, filters, sort_by, sort_order):
+    async with listing_db() as session:
+        page = 1
+        while True:
+            filters_page = ProjectListFilters(**filters, sort_by=sort_by, sort_order=sort_order, page=page,
+                                              limit=PAGE_SIZE)
+            assert not facet_index.supports(filters_page)
+            assert facet_index.supports(filters_page, unit_matches=True)
+
+            unit_matches = unit_catalog.matching_projects(filters_page)
+            ids, total, _ = facet_index.select(filters_page, resolve_sort_key(filters_page),
+                                               (page - 1) * PAGE_SIZE, PAGE_SIZE, unit_matches=unit_matches)
+            projects, sql_total, _ = await fetch_projects(session, filters_page)
+            assert (ids, total) == ([p.id for p in projects], sql_total), (filters, page)
+            if len(projects) < PAGE_SIZE:
+                break
+            page += 1
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+async def test_matching_projects_match_sql(listing_db, facet_index, unit_catalog, filters):
+    filters = ProjectListFilters(**filters)
+    async with listing_db() as session:
+        ids, _, _ = facet_index.select(ProjectListFilters(), "created_at", 0, 1000)
+        matched = await filter_project_ids(session, filters, ids)
+    unit_matches = unit_catalog.matching_projects(filters)
+    assert set(facet_index.matching(filters, ids, unit_matches=unit_matches)) == matched